@@ -4,52 +4,61 @@ import json
 import re
 import requests
 from urllib.parse import unquote
-from utils.nlp import get_skill_extractor
 from flask import Flask, jsonify, g, request
 from flask_cors import CORS
 from dotenv import load_dotenv
+
+# Load .env before importing modules that read their settings at import time
+load_dotenv()
+
 from utils.tts_service import generate_speech_bytes
 from utils.stt_service import transcribe_audio
 from flask import Response
-from utils.scheduler import start_scheduler
+from utils.scheduler import start_job_fetch, start_scheduler
 import cloudinary
 from database import get_db
 from bson.objectid import ObjectId
 from bson.errors import InvalidId
-import cloudinary.uploader
-from pdfminer.high_level import extract_text
-from auth import require_auth
+from auth import require_auth, require_role
 from models.user import (
     upsert_user,
     get_user_by_clerk_id,
     update_user_profile,
     ensure_indexes,
-    update_user_resume,
-    get_user_resume_public_id,
     update_user_skills,
 )
-from utils.embedding import generate_embedding
+from models.job import ensure_job_indexes, get_jobs_by_ids
+from models.resume_job import ensure_resume_job_indexes, get_resume_job
+from models.job_run import ensure_job_run_indexes, list_job_runs
+from utils.resume_pipeline import submit_resume
+from utils.resume_cache import ensure_resume_cache_indexes
 from utils.qdrant_store import (
-    upsert_resume_vector,
     ensure_collections,
+    get_job_payloads,
     get_resume_embedding,
     search_similar_jobs,
 )
-
-load_dotenv()
+from utils.skill_index import get_skill_index
+from utils.job_versions import active_job_state
+from utils.ingest_plan import country_for_location, ingest_countries, normalize_country
+from utils.match_cache import (
+    MATCH_LIST_SIZE,
+    get_ranked_matches,
+    encode_cursor,
+    decode_cursor,
+)
 
 app = Flask(__name__)
 
+# Where /api/jobs reads listing fields: "mongo" hydrates each page from
+# MongoDB; "payload" uses the Qdrant payloads (no MongoDB round trip)
+JOBS_READ_MODE = os.getenv("JOBS_READ_MODE", "mongo").lower()
+
 # CORS
 cors_origins = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
 CORS(app, origins=cors_origins, supports_credentials=True)
 
-# ── Resume uploads folder ────────────────────────────────────────────────────
-UPLOAD_FOLDER = os.path.join(
-    os.path.dirname(os.path.abspath(__file__)), "..", "resumes"
-)
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+# ── Resume uploads (kept in memory, never written to disk) ───────────────────
 app.config["MAX_CONTENT_LENGTH"] = 5 * 1024 * 1024  # 5 MB max upload size
 ALLOWED_EXTENSIONS = {".pdf"}
 
@@ -61,23 +70,28 @@ cloudinary.config(
     secure=True,
 )
 
-# SkillNer is lazy-loaded on first use
-_skill_extractor = None
-
-
-def get_extractor():
-    global _skill_extractor
-    if _skill_extractor is None:
-        _skill_extractor = get_skill_extractor()
-    return _skill_extractor
-
-
 # Create MongoDB indexes and Qdrant collections on startup
 with app.app_context():
     try:
         ensure_indexes()
     except Exception:
         pass
+    try:
+        ensure_job_indexes()
+    except Exception:
+        pass
+    try:
+        ensure_resume_job_indexes()
+    except Exception:
+        pass
+    try:
+        ensure_resume_cache_indexes()
+    except Exception:
+        pass
+    try:
+        ensure_job_run_indexes()
+    except Exception:
+        pass
     try:
         ensure_collections()
     except Exception:
@@ -96,7 +110,17 @@ def hello_world():
 @require_auth
 def get_matched_jobs():
     """Return top 10 jobs matched to the user's resume embedding.
-    If the user hasn't uploaded a resume yet, return has_resume=false."""
+    If the user hasn't uploaded a resume yet, return has_resume=false.
+
+    Pages can be requested with ``page`` or with the opaque ``cursor``
+    returned as ``next_cursor`` by the previous page. A cursor from a list
+    that has since been re-ranked gets 409; start again from page 1.
+    Only the top MATCH_LIST_SIZE matches can be paged through.
+
+    Jobs are limited to the country in the user's profile location, or to
+    ``country`` (a code or name; ``all`` for no filter). An explicit
+    ``country`` the ingest plan doesn't fetch gets 400. When the profile's
+    country has no jobs the search falls back to every country."""
     clerk_id = g.user.get("sub")
     user = get_user_by_clerk_id(clerk_id)
 
@@ -109,72 +133,135 @@ def get_matched_jobs():
 
     offset = (page - 1) * limit
 
+    cursor_list_id = None
+    cursor = request.args.get("cursor")
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            return jsonify({"error": "Invalid cursor"}), 400
+        cursor_list_id, offset = position
+        page = offset // limit + 1 if limit > 0 else 1
+
     if not user or not user.get("resume_url"):
         return jsonify(
             {"has_resume": False, "jobs": [], "page": page, "has_more": False}
         )
 
-    # Retrieve the resume embedding from Qdrant
-    embedding = get_resume_embedding(clerk_id)
-    if not embedding:
-        return jsonify(
-            {"has_resume": True, "jobs": [], "page": page, "has_more": False}
+    # Rank and hydrate from one job version, even if a rebuild switches
+    # versions mid-request
+    job_version, job_revision = active_job_state()
+
+    requested_country = request.args.get("country")
+    if requested_country and requested_country.lower() == "all":
+        country = None
+    elif requested_country:
+        country = normalize_country(requested_country)
+        if country not in ingest_countries():
+            # Never silently drop an explicit filter
+            return jsonify(
+                {
+                    "error": f"Unknown country {requested_country!r}",
+                    "countries": sorted(ingest_countries()),
+                }
+            ), 400
+    else:
+        country = country_for_location(user.get("location"))
+
+    # Payloads of a fresh search, so its first page needs no lookup at all
+    searched = {}
+
+    def rank_jobs():
+        # Retrieve the resume embedding from Qdrant
+        embedding = get_resume_embedding(clerk_id)
+        if not embedding:
+            return None
+        # Rank the whole list once; every later page is sliced from the cache.
+        # Always searching from the top avoids Qdrant's offset capping issue.
+        matches = search_similar_jobs(
+            embedding, limit=MATCH_LIST_SIZE, version=job_version, country=country
         )
-
-    # Find similar jobs in Qdrant.
-    # Fetch up to (offset + limit + 1) from the top, then slice the page.
-    # This avoids Qdrant's offset capping issue where it silently returns fewer results.
-    fetch_count = offset + limit + 1
-    all_matches = search_similar_jobs(embedding, limit=fetch_count)
-
-    page_matches = all_matches[offset : offset + limit]
-    has_more = len(all_matches) > offset + limit
-    matches = page_matches
-
-    jobs_col = get_db()["jobs"]
+        if country and not matches:
+            matches = search_similar_jobs(
+                embedding, limit=MATCH_LIST_SIZE, version=job_version
+            )
+        if JOBS_READ_MODE == "payload":
+            searched.update((m.payload.get("job_id"), m.payload) for m in matches)
+        return [
+            (m.payload.get("job_id"), m.score)
+            for m in matches
+            if m.payload.get("job_id")
+        ]
+
+    # A list ranked against another version or revision of the job set
+    # (a sync in any process) is stale
+    list_id, ranked = get_ranked_matches(
+        clerk_id, (user.get("resume_url"), job_version, job_revision, country), rank_jobs
+    )
+    if cursor_list_id is not None and list_id is not None and cursor_list_id != list_id:
+        # The offset would index into a different ranking
+        return jsonify(
+            {"error": "Job matches changed, reload from the first page", "restart": True}
+        ), 409
+
+    matches = ranked[offset : offset + limit]
+    has_more = len(ranked) > offset + limit
+    next_cursor = encode_cursor(list_id, offset + limit) if has_more else None
+
+    scores = dict(matches)
+    page_ids = [job_id for job_id, _ in matches]
+    if JOBS_READ_MODE == "payload":
+        # Listings from the vector payloads; points written before payloads
+        # carried listings (no description) are hydrated from MongoDB
+        payloads = {job_id: searched[job_id] for job_id in page_ids if job_id in searched}
+        payloads.update(get_job_payloads(
+            [job_id for job_id in page_ids if job_id not in payloads], version=job_version
+        ))
+        stale = [job_id for job_id in page_ids if "description" not in payloads.get(job_id, {})]
+        if stale:
+            payloads.update(
+                (doc["job_id"], doc) for doc in get_jobs_by_ids(stale, version=job_version)
+            )
+        job_docs = [
+            payloads[job_id] for job_id in page_ids if "description" in payloads.get(job_id, {})
+        ]
+    else:
+        # Hydrate the whole page from MongoDB in one query (rank order kept)
+        job_docs = get_jobs_by_ids(page_ids, version=job_version)
 
     results = []
 
     # User's current skills to compute missing skills
-    user_skills_set = set(user.get("skills", []))
-
-    for match in matches:
-        job_id = match.payload.get("job_id")
-        if not job_id:
-            continue
-        job_doc = jobs_col.find_one({"job_id": job_id})
-        if not job_doc:
-            continue
+    user_skills = user.get("skills", [])
+    user_skills_set = set(user_skills)
+
+    # Missing skills + overlap for the whole page in one vectorised pass
+    # (until the skill index is first built, stored skills are compared below)
+    skill_index = get_skill_index()
+    skill_comparison = {}
+    if skill_index is not None:
+        skill_comparison = skill_index.compare(
+            [doc["job_id"] for doc in job_docs], user_skills, limit=7
+        )
 
-        full_desc = job_doc.get("description", "")
+    for job_doc in job_docs:
+        job_id = job_doc["job_id"]
 
         # Calculate missing skills
         missing_skills = []
+        skill_match = None
         job_skills = job_doc.get("skills")
-
-        if job_skills is not None:
-            # New format: skills are pre-computed in MongoDB
+        # Skills for old jobs are extracted by the background backfill;
+        # never run NLP on the request path. The skill index may already
+        # have skills a local-index payload doesn't.
+        skills_pending = job_skills is None and job_id not in skill_comparison
+
+        if job_id in skill_comparison:
+            missing_skills, overlap = skill_comparison[job_id]
+            skill_match = round(overlap * 100, 1)
+        elif job_skills is not None:
+            # Job stored after the skill index was built, or no index yet
             job_skills_set = set(job_skills)
             missing_skills = sorted(list(job_skills_set - user_skills_set))
-        elif full_desc:
-            # Fallback for old jobs without 'skills' field
-            try:
-                extractor = get_extractor()
-                if extractor:
-                    annotations = extractor.annotate(full_desc)
-                    full_matches = annotations.get("results", {}).get(
-                        "full_matches", []
-                    )
-                    ngram_matches = annotations.get("results", {}).get(
-                        "ngram_scored", []
-                    )
-                    job_skills_set = set(
-                        [s["doc_node_value"] for s in full_matches]
-                        + [s["doc_node_value"] for s in ngram_matches]
-                    )
-                    missing_skills = sorted(list(job_skills_set - user_skills_set))
-            except Exception:
-                pass
 
         results.append(
             {
@@ -183,12 +270,14 @@ def get_matched_jobs():
                 "company": job_doc.get("company"),
                 "location": job_doc.get("location"),
                 "country": job_doc.get("country"),
-                "description": full_desc[:300],
+                "description": job_doc.get("description") or "",
                 "apply_link": job_doc.get("apply_link"),
                 "employment_type": job_doc.get("employment_type"),
                 "posted_at": job_doc.get("posted_at"),
-                "match_score": round(match.score * 100, 1),
+                "match_score": round(scores[job_id] * 100, 1),
                 "missing_skills": missing_skills[:7],  # Suggest up to 7 missing skills
+                "skill_match": skill_match,
+                "skills_pending": skills_pending,
             }
         )
 
@@ -198,6 +287,7 @@ def get_matched_jobs():
             "jobs": results,
             "page": page,
             "has_more": has_more,
+            "next_cursor": next_cursor,
         }
     )
 
@@ -278,15 +368,10 @@ def update_skills():
 @app.route("/api/parse-resume", methods=["POST"])
 @require_auth
 def parse_resume():
-    """Accept a PDF resume, extract skills, upload to Cloudinary, and persist."""
-    skill_extractor = get_extractor()
-    if skill_extractor is None:
-        return jsonify(
-            {
-                "error": "Resume parsing is not available. Run setup_dependencies.py first."
-            }
-        ), 503
+    """Accept a PDF resume and queue it for parsing.
 
+    Returns 202 with a job ID; poll /api/parse-resume/<job_id> for the
+    extracted skills and the Cloudinary URL."""
     if "resume" not in request.files:
         return jsonify({"error": "No file uploaded"}), 400
 
@@ -303,66 +388,68 @@ def parse_resume():
 
     clerk_id = g.user.get("sub")
 
-    # Save temporarily for parsing
-    filename = f"{uuid.uuid4()}.pdf"
-    filepath = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-    file.save(filepath)
+    # Hand the bytes to the background worker; the disk never sees the file
+    pdf_bytes = file.read()
 
     try:
-        # ── Extract skills ──────────────────────────────────────────────
-        text = extract_text(filepath)
-        annotations = skill_extractor.annotate(text)
-        full_matches = annotations["results"]["full_matches"]
-        ngram_matches = annotations["results"]["ngram_scored"]
-        skills = sorted(
-            set(
-                [s["doc_node_value"] for s in full_matches]
-                + [s["doc_node_value"] for s in ngram_matches]
-            )
-        )
+        job_id = submit_resume(clerk_id, pdf_bytes)
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
 
-        # ── Delete old resume from Cloudinary (if any) ──────────────────
-        old_public_id = get_user_resume_public_id(clerk_id)
-        if old_public_id:
-            try:
-                cloudinary.uploader.destroy(old_public_id, resource_type="raw")
-            except Exception:
-                pass
-
-        # ── Upload new resume to Cloudinary ─────────────────────────────
-        upload_result = cloudinary.uploader.upload(
-            filepath,
-            resource_type="raw",
-            folder="skillsbridge/resumes",
-            public_id=filename.replace(".pdf", ""),
-            format="pdf",
-            access_mode="public",
-            type="upload",
+    if job_id is None:
+        return (
+            jsonify({"error": "Too many resumes are being processed. Try again shortly."}),
+            503,
+            {"Retry-After": "5"},
         )
-        resume_url = upload_result["secure_url"]
-        resume_public_id = upload_result["public_id"]
 
-        # ── Save to user profile ────────────────────────────────────────
-        resume_embedding = generate_embedding(text)
-        update_user_resume(clerk_id, resume_url, resume_public_id, skills)
+    return jsonify(
+        {
+            "status": "queued",
+            "job_id": job_id,
+            "status_url": f"/api/parse-resume/{job_id}",
+        }
+    ), 202
 
-        # Store vector in Qdrant for similarity search
-        upsert_resume_vector(clerk_id, resume_embedding)
 
-        return jsonify(
-            {
-                "status": "success",
-                "resume_url": resume_url,
-                "skills": skills,
-            }
-        )
+@app.route("/api/parse-resume/<job_id>", methods=["GET"])
+@require_auth
+def parse_resume_status(job_id):
+    """Report the progress of a queued resume-processing job."""
+    job = get_resume_job(job_id, g.user.get("sub"))
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
 
-    except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
 
-    finally:
-        if os.path.exists(filepath):
-            os.remove(filepath)
+# ── Admin: job fetch ─────────────────────────────────────────────────────────
+@app.route("/api/admin/jobs/fetch", methods=["POST"])
+@require_auth
+@require_role("admin")
+def trigger_job_fetch():
+    """Start a job fetch now (optional body {"mode": "incremental" |
+    "bluegreen"}). Returns 409 if one is already running anywhere."""
+    body = request.get_json(silent=True) or {}
+    mode = body.get("mode")
+    if mode not in (None, "incremental", "bluegreen"):
+        return jsonify({"error": "mode must be incremental or bluegreen"}), 400
+
+    run_id = start_job_fetch("manual", mode=mode, requested_by=g.user.get("sub"))
+    if run_id is None:
+        return jsonify({"error": "A job fetch is already running"}), 409
+    return jsonify({"run_id": run_id, "status": "running"}), 202
+
+
+@app.route("/api/admin/jobs/runs", methods=["GET"])
+@require_auth
+@require_role("admin")
+def job_fetch_runs():
+    """Recent job-fetch runs, newest first."""
+    try:
+        limit = min(int(request.args.get("limit", 20)), 100)
+    except ValueError:
+        limit = 20
+    return jsonify({"runs": list_job_runs(limit)})
 
 
 # ── Text-to-Speech ───────────────────────────────────────────────────────────
@@ -4,6 +4,8 @@ import functools
 import jwt
 from flask import request, jsonify, g
 
+from models.user import get_user_by_clerk_id
+
 
 # ── Fetch Clerk JWKS public keys ────────────────────────────────────────────
 
@@ -67,3 +69,24 @@ def require_auth(f):
         return f(*args, **kwargs)
 
     return decorated
+
+
+def require_role(role: str):
+    """Decorator (below ``require_auth``) that only lets users whose
+    MongoDB ``role`` is ``role`` through; others get a 403."""
+
+    def decorator(f):
+        @functools.wraps(f)
+        def decorated(*args, **kwargs):
+            if request.method == "OPTIONS":
+                return f(*args, **kwargs)
+
+            user = get_user_by_clerk_id(g.user.get("sub"))
+            if not user or user.get("role") != role:
+                return jsonify({"error": "Forbidden"}), 403
+
+            return f(*args, **kwargs)
+
+        return decorated
+
+    return decorator
@@ -0,0 +1,76 @@
+"""
+Micro-benchmark: embedding throughput on CPU.
+
+Measures utils.embedding.generate_embeddings at several batch sizes, then
+the micro-batcher behind generate_embedding with many concurrent
+single-text callers (the resume-upload path).
+
+    python bench_embedding.py --texts 512 --batch-sizes 1 8 32 128 --callers 16
+
+Texts are synthetic job descriptions of roughly --words words each.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")  # force CPU
+os.environ["EMBED_CACHE_PATH"] = ""  # measure the model, not the cache
+
+from utils.embedding import generate_embedding, generate_embeddings
+
+_WORDS = (
+    "python java flask react docker kubernetes sql mongodb api backend "
+    "frontend design build maintain services team agile testing cloud aws "
+    "linux git data pipeline deploy scale performance review mentor"
+).split()
+
+
+def _texts(n, words):
+    rng = random.Random(0)
+    return [" ".join(rng.choices(_WORDS, k=words)) for _ in range(n)]
+
+
+def _bulk(texts, batch_size):
+    start = time.perf_counter()
+    for i in range(0, len(texts), batch_size):
+        generate_embeddings(texts[i : i + batch_size], batch_size=batch_size)
+    return time.perf_counter() - start
+
+
+def _concurrent_singles(texts, callers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        list(pool.map(generate_embedding, texts))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--words", type=int, default=120)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--callers", type=int, default=16)
+    args = parser.parse_args()
+
+    texts = _texts(args.texts, args.words)
+    generate_embeddings(texts[:8])  # load the model outside the timings
+
+    print(f"{args.texts} texts x ~{args.words} words")
+    print(f"{'mode':<28}{'seconds':>10}{'texts/s':>10}")
+    for batch_size in args.batch_sizes:
+        elapsed = _bulk(texts, batch_size)
+        print(f"{f'bulk batch={batch_size}':<28}{elapsed:>10.2f}{len(texts) / elapsed:>10.1f}")
+
+    elapsed = _concurrent_singles(texts, args.callers)
+    label = f"batcher, {args.callers} callers"
+    print(f"{label:<28}{elapsed:>10.2f}{len(texts) / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
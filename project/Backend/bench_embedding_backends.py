@@ -0,0 +1,157 @@
+"""
+Parity check and benchmark: PyTorch vs ONNX embedding backends.
+
+Each backend runs in its own subprocess (EMBEDDING_BACKEND=...) so import
+time and peak RSS are measured from a clean interpreter. The ONNX vectors
+are compared against the fp32 PyTorch vectors for the same texts, and the
+script exits non-zero if any pair's cosine similarity falls below
+--min-cosine. The ONNX backend also runs a smaller parity check against
+the fp32 export every time it loads (EMBEDDING_ONNX_MIN_COSINE in
+utils/embedding.py), so a bad EMBEDDING_ONNX_FILE fails at startup.
+
+    python bench_embedding_backends.py --backends torch onnx --texts 256
+    EMBEDDING_ONNX_FILE=onnx/model.onnx python bench_embedding_backends.py
+
+The first backend listed is the reference for the parity check.
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import numpy as np
+
+_WORDS = (
+    "python java flask react docker kubernetes sql mongodb api backend "
+    "frontend design build maintain services team agile testing cloud aws "
+    "linux git data pipeline deploy scale performance review mentor"
+).split()
+
+
+def _texts(n, words):
+    rng = random.Random(0)
+    return [" ".join(rng.choices(_WORDS, k=rng.randint(8, words))) for _ in range(n)]
+
+
+def _worker(args):
+    """Runs inside the subprocess for one backend and prints a JSON report."""
+    texts = _texts(args.texts, args.words)
+
+    start = time.perf_counter()
+    from utils import embedding
+
+    import_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    embedding.generate_embeddings(texts[:1])
+    load_s = time.perf_counter() - start
+
+    latencies = []
+    for text in texts[: args.latency_samples]:
+        start = time.perf_counter()
+        embedding.generate_embeddings([text], batch_size=1)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    start = time.perf_counter()
+    vectors = embedding.generate_embeddings(texts, batch_size=args.batch_size)
+    throughput = len(texts) / (time.perf_counter() - start)
+
+    np.save(args.out, vectors)
+    print(
+        json.dumps(
+            {
+                "import_s": import_s,
+                "load_s": load_s,
+                "p50_ms": statistics.median(latencies),
+                "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+                "texts_per_s": throughput,
+                # ru_maxrss is KiB on Linux
+                "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                "torch_imported": "torch" in sys.modules,
+            }
+        )
+    )
+
+
+def _run_backend(backend, args, out):
+    cmd = [
+        sys.executable,
+        os.path.abspath(__file__),
+        "--worker",
+        "--out", out,
+        "--texts", str(args.texts),
+        "--words", str(args.words),
+        "--batch-size", str(args.batch_size),
+        "--latency-samples", str(args.latency_samples),
+    ]
+    env = dict(
+        os.environ, EMBEDDING_BACKEND=backend, CUDA_VISIBLE_DEVICES="", EMBED_CACHE_PATH=""
+    )
+    result = subprocess.run(cmd, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f"{backend} backend failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx"])
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--words", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--latency-samples", type=int, default=50)
+    parser.add_argument("--min-cosine", type=float, default=0.97)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args)
+        return
+
+    reports, vectors = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends:
+            out = os.path.join(tmp, f"{backend}.npy")
+            reports[backend] = _run_backend(backend, args, out)
+            vectors[backend] = np.load(out)
+
+    print(f"{args.texts} texts, batch size {args.batch_size}, CPU only")
+    print(
+        f"{'backend':<10}{'import s':>10}{'load s':>10}{'p50 ms':>10}{'p99 ms':>10}"
+        f"{'texts/s':>10}{'RSS MB':>10}{'torch':>8}"
+    )
+    for backend, r in reports.items():
+        print(
+            f"{backend:<10}{r['import_s']:>10.2f}{r['load_s']:>10.2f}{r['p50_ms']:>10.2f}"
+            f"{r['p99_ms']:>10.2f}{r['texts_per_s']:>10.1f}{r['peak_rss_mb']:>10.0f}"
+            f"{'yes' if r['torch_imported'] else 'no':>8}"
+        )
+
+    reference = args.backends[0]
+    failed = False
+    for backend in args.backends[1:]:
+        # Both sides are L2-normalised, so the row-wise dot product is the cosine
+        cosines = (vectors[reference] * vectors[backend]).sum(axis=1)
+        ok = cosines.min() >= args.min_cosine
+        failed |= not ok
+        print(
+            f"parity {backend} vs {reference}: min cosine {cosines.min():.4f}, "
+            f"mean {cosines.mean():.4f} – {'OK' if ok else 'BELOW'} {args.min_cosine}"
+        )
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark: ingest writes, one round trip per job vs batched.
+
+Writes synthetic jobs to MongoDB (insert_one per job vs models.job
+upsert_jobs bulk batches) and to Qdrant (single-point upserts vs
+qdrant_store.upsert_job_vectors). Throwaway collections are created and
+dropped afterwards.
+
+    python bench_ingest_writes.py --jobs 2000 --rtt-ms 20
+    python bench_ingest_writes.py --qdrant-url http://localhost:6333
+
+--rtt-ms adds an artificial delay per round trip so a local MongoDB and
+an in-memory Qdrant approximate remote clusters.
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import numpy as np
+from pymongo import MongoClient
+from qdrant_client import QdrantClient
+
+import models.job as job_model
+import utils.qdrant_store as qdrant_store
+from utils.embedding import EMBEDDING_DIM
+
+
+class _Delayed:
+    """Proxy that sleeps once per call of the named methods."""
+
+    def __init__(self, target, rtt_s, methods):
+        self._target = target
+        self._rtt_s = rtt_s
+        self._methods = methods
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name not in self._methods:
+            return attr
+
+        def delayed(*args, **kwargs):
+            time.sleep(self._rtt_s)
+            return attr(*args, **kwargs)
+
+        return delayed
+
+
+def _jobs(n):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((n, EMBEDDING_DIM)).astype(np.float32)
+    docs = [
+        {
+            "job_id": f"bench-{i}",
+            "title": f"Software Engineer {i}",
+            "company": "Acme",
+            "description": "Build and maintain services. " * 100,
+        }
+        for i in range(n)
+    ]
+    return docs, vectors
+
+
+def _rate(n, seconds):
+    return f"{seconds:>9.2f}{n / seconds if seconds else 0:>12.0f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--uri",
+        default=os.getenv("BENCH_MONGODB_URI", "mongodb://localhost:27017"),
+    )
+    parser.add_argument("--qdrant-url", default=":memory:")
+    parser.add_argument("--jobs", type=int, default=1000)
+    parser.add_argument("--rtt-ms", type=float, default=10.0)
+    parser.add_argument("--mongo-batch", type=int, default=500)
+    parser.add_argument("--qdrant-batch", type=int, default=256)
+    args = parser.parse_args()
+
+    docs, vectors = _jobs(args.jobs)
+    rtt_s = args.rtt_ms / 1000
+    name = f"bench_ingest_{uuid.uuid4().hex[:8]}"
+
+    mongo = MongoClient(args.uri, serverSelectionTimeoutMS=3000)
+    qdrant = (
+        QdrantClient(":memory:") if args.qdrant_url == ":memory:" else QdrantClient(url=args.qdrant_url)
+    )
+    qdrant_store._client = _Delayed(qdrant, rtt_s, {"upsert"})
+
+    print(f"{args.jobs} jobs, +{args.rtt_ms} ms/round trip")
+    print(f"{'writer':<28}{'seconds':>9}{'jobs/s':>12}")
+    try:
+        col = _Delayed(mongo[name]["per_job"], rtt_s, {"insert_one"})
+        start = time.perf_counter()
+        for doc in docs:
+            col.insert_one(dict(doc))
+        print(f"{'mongo insert_one x N':<28}{_rate(args.jobs, time.perf_counter() - start)}")
+
+        bulk_col = _Delayed(mongo[name]["bulk"], rtt_s, {"bulk_write"})
+        job_model._collection = lambda version=None: bulk_col
+        start = time.perf_counter()
+        job_model.upsert_jobs(
+            docs, seen_at=datetime.now(timezone.utc), batch_size=args.mongo_batch
+        )
+        print(f"{'mongo bulk_write batches':<28}{_rate(args.jobs, time.perf_counter() - start)}")
+
+        for collection in (f"{name}_single", f"{name}_batched"):
+            qdrant_store.create_job_collection(collection)
+
+        start = time.perf_counter()
+        for doc, vector in zip(docs, vectors):
+            qdrant_store.upsert_job_vector(
+                doc["job_id"], vector, title=doc["title"], version=f"{name}_single"
+            )
+        print(f"{'qdrant upsert x N':<28}{_rate(args.jobs, time.perf_counter() - start)}")
+
+        for wait in (True, False):
+            collection = f"{name}_batched"
+            start = time.perf_counter()
+            qdrant_store.upsert_job_vectors(
+                [(doc["job_id"], vector, {"title": doc["title"]}) for doc, vector in zip(docs, vectors)],
+                version=collection,
+                batch_size=args.qdrant_batch,
+                wait=wait,
+            )
+            label = f"qdrant batches, wait={wait}"
+            print(f"{label:<28}{_rate(args.jobs, time.perf_counter() - start)}")
+            assert qdrant.count(collection, exact=True).count == args.jobs
+    finally:
+        mongo.drop_database(name)
+        for collection in (f"{name}_single", f"{name}_batched"):
+            if qdrant.collection_exists(collection):
+                qdrant.delete_collection(collection)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Micro-benchmark: hydrating a page of /api/jobs matches from MongoDB.
+
+Compares the old strategy (one find_one per Qdrant hit) with the bulk
+$in query in models.job.get_jobs_by_ids, against a local MongoDB
+(e.g. `docker run -p 27017:27017 mongo`). A throwaway database is seeded
+with synthetic jobs and dropped afterwards.
+
+    python bench_job_hydration.py --jobs 250 --page-size 10 --rtt-ms 2
+
+--rtt-ms adds an artificial delay per round trip to approximate a remote
+cluster (Atlas) from a local server.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from pymongo import MongoClient
+
+import models.job as job_model
+
+
+class _DelayedCollection:
+    """Wrap a collection and sleep once per round trip."""
+
+    def __init__(self, col, rtt_s):
+        self._col = col
+        self._rtt_s = rtt_s
+
+    def find_one(self, *args, **kwargs):
+        time.sleep(self._rtt_s)
+        return self._col.find_one(*args, **kwargs)
+
+    def find(self, *args, **kwargs):
+        time.sleep(self._rtt_s)
+        return self._col.find(*args, **kwargs)
+
+
+def _seed(col, n_jobs):
+    col.create_index("job_id", unique=True)
+    docs = []
+    for i in range(n_jobs):
+        docs.append(
+            {
+                "job_id": f"bench-{i}",
+                "title": f"Software Engineer {i}",
+                "company": "Acme",
+                "location": "Pune",
+                "country": "IN",
+                "description": "Build and maintain services. " * 150,  # ~4 KB
+                "apply_link": "https://example.com/apply",
+                "employment_type": "FULLTIME",
+                "posted_at": "2026-01-01T00:00:00.000Z",
+                "skills": ["python", "flask", "mongodb", "docker", "git"],
+            }
+        )
+    col.insert_many(docs)
+    return [d["job_id"] for d in docs]
+
+
+def _per_hit(col, page_ids):
+    results = []
+    for job_id in page_ids:
+        doc = col.find_one({"job_id": job_id})
+        if doc:
+            doc["description"] = doc.get("description", "")[:300]
+            results.append(doc)
+    return results
+
+
+def _timed(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50": statistics.median(samples),
+        "p99": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+        "mean": statistics.fmean(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--uri",
+        default=os.getenv("BENCH_MONGODB_URI", "mongodb://localhost:27017"),
+    )
+    parser.add_argument("--jobs", type=int, default=250)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    client = MongoClient(args.uri, serverSelectionTimeoutMS=3000)
+    db_name = f"bench_hydration_{uuid.uuid4().hex[:8]}"
+    col = client[db_name]["jobs"]
+
+    try:
+        job_ids = _seed(col, args.jobs)
+        wrapped = _DelayedCollection(col, args.rtt_ms / 1000)
+        job_model._collection = lambda version=None: wrapped
+
+        def page():
+            return random.sample(job_ids, args.page_size)
+
+        per_hit = _timed(lambda: _per_hit(wrapped, page()), args.iterations)
+        bulk = _timed(lambda: job_model.get_jobs_by_ids(page()), args.iterations)
+
+        print(
+            f"{args.jobs} jobs, page size {args.page_size}, "
+            f"{args.iterations} iterations, +{args.rtt_ms} ms/round trip"
+        )
+        print(f"{'strategy':<16}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+        for name, stats in (("find_one x N", per_hit), ("bulk $in", bulk)):
+            print(
+                f"{name:<16}{stats['p50']:>10.2f}{stats['p99']:>10.2f}"
+                f"{stats['mean']:>10.2f}"
+            )
+    finally:
+        client.drop_database(db_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Benchmark: job search latency as the corpus grows.
+
+Builds synthetic job sets of 1k, 10k and 100k normalised 384-dim vectors
+spread over several countries (skewed, like a real multi-country plan)
+and times top-k searches – over every job and restricted to one country
+– with the in-process index (utils/vector_index.py) and with Qdrant.
+
+    python bench_job_search_scale.py                       # local index only
+    python bench_job_search_scale.py --qdrant              # + in-memory Qdrant
+    python bench_job_search_scale.py --qdrant-url http://localhost:6333
+
+The in-memory Qdrant client searches by brute force and is much slower
+than a server; point --qdrant-url at a real instance to measure HNSW with
+the country payload index.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import numpy as np
+
+from utils.embedding import EMBEDDING_DIM
+from utils.vector_index import JobVectorIndex
+
+COUNTRIES = ["IN", "US", "GB", "CA", "AU", "DE", "SG", "AE"]
+
+
+def _corpus(n, rng):
+    vectors = rng.standard_normal((n, EMBEDDING_DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    # Zipf-like share per country: IN largest, AE smallest
+    weights = 1 / np.arange(1, len(COUNTRIES) + 1)
+    countries = rng.choice(COUNTRIES, size=n, p=weights / weights.sum())
+    payloads = [
+        {"job_id": f"job-{i}", "title": f"Engineer {i}", "country": str(c)}
+        for i, c in enumerate(countries)
+    ]
+    return vectors, payloads
+
+
+def _timed(fn, queries):
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        fn(q)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def _qdrant_rows(client, vectors, payloads, queries, limit, country):
+    from qdrant_client.models import (
+        Distance,
+        KeywordIndexParams,
+        KeywordIndexType,
+        PointStruct,
+        VectorParams,
+    )
+
+    import utils.qdrant_store as qdrant_store
+
+    name = f"bench_scale_{uuid.uuid4().hex[:8]}"
+    client.create_collection(
+        collection_name=name,
+        vectors_config=VectorParams(size=EMBEDDING_DIM, distance=Distance.COSINE),
+    )
+    try:
+        client.create_payload_index(
+            collection_name=name,
+            field_name="country",
+            field_schema=KeywordIndexParams(type=KeywordIndexType.KEYWORD, is_tenant=True),
+        )
+        start = time.perf_counter()
+        for offset in range(0, len(vectors), 1000):
+            client.upsert(
+                collection_name=name,
+                points=[
+                    PointStruct(id=i, vector=vectors[i].tolist(), payload=payloads[i])
+                    for i in range(offset, min(offset + 1000, len(vectors)))
+                ],
+            )
+        load_s = time.perf_counter() - start
+
+        def search(q, country=None):
+            return client.query_points(
+                collection_name=name,
+                query=q.tolist(),
+                query_filter=qdrant_store._country_filter(country),
+                limit=limit,
+            )
+
+        all_p50, all_p99 = _timed(search, queries)
+        one_p50, one_p99 = _timed(lambda q: search(q, country), queries)
+        return load_s, all_p50, all_p99, one_p50, one_p99
+    finally:
+        client.delete_collection(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=500, help="top-k (MATCH_LIST_SIZE)")
+    parser.add_argument("--country", default="GB", help="country for filtered searches")
+    parser.add_argument("--qdrant", action="store_true", help="also time in-memory Qdrant")
+    parser.add_argument("--qdrant-url", help="time a Qdrant server instead")
+    args = parser.parse_args()
+
+    client = None
+    if args.qdrant_url:
+        from qdrant_client import QdrantClient
+
+        client = QdrantClient(url=args.qdrant_url)
+    elif args.qdrant:
+        from qdrant_client import QdrantClient
+
+        client = QdrantClient(":memory:")
+
+    rng = np.random.default_rng(0)
+    print(
+        f"top-{args.limit}, {args.queries} queries, filtered searches on {args.country}; "
+        "times in ms (p50/p99)"
+    )
+    print(
+        f"{'backend':<8}{'jobs':>8}{'in country':>12}{'build s':>9}"
+        f"{'all p50':>9}{'all p99':>9}{'ctry p50':>10}{'ctry p99':>10}"
+    )
+    for n in [int(size) for size in args.sizes.split(",")]:
+        vectors, payloads = _corpus(n, rng)
+        queries = rng.standard_normal((args.queries, EMBEDDING_DIM)).astype(np.float32)
+        in_country = sum(p["country"] == args.country for p in payloads)
+
+        start = time.perf_counter()
+        index = JobVectorIndex([p["job_id"] for p in payloads], vectors, payloads, normalized=True)
+        build_s = time.perf_counter() - start
+        all_p50, all_p99 = _timed(lambda q: index.search(q, args.limit), queries)
+        one_p50, one_p99 = _timed(lambda q: index.search(q, args.limit, args.country), queries)
+        print(
+            f"{'local':<8}{n:>8}{in_country:>12}{build_s:>9.2f}"
+            f"{all_p50:>9.2f}{all_p99:>9.2f}{one_p50:>10.2f}{one_p99:>10.2f}"
+        )
+
+        if client is not None:
+            load_s, all_p50, all_p99, one_p50, one_p99 = _qdrant_rows(
+                client, vectors, payloads, queries, args.limit, args.country
+            )
+            print(
+                f"{'qdrant':<8}{n:>8}{in_country:>12}{load_s:>9.2f}"
+                f"{all_p50:>9.2f}{all_p99:>9.2f}{one_p50:>10.2f}{one_p99:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
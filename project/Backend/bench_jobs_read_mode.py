@@ -0,0 +1,189 @@
+"""
+Benchmark: /api/jobs listing reads from MongoDB vs from Qdrant payloads.
+
+Seeds a throwaway MongoDB database and Qdrant collection with synthetic
+jobs (listing payloads as ingest writes them), then runs concurrent
+requests shaped like /api/jobs for each JOBS_READ_MODE:
+
+  first page – vector search, then the page's listings
+  next page  – listings of a page from the cached ranking
+
+In "mongo" mode listings come from models.job.get_jobs_by_ids; in
+"payload" mode from the search results and qdrant_store.get_job_payloads
+(one Qdrant retrieve, or a lookup in the local index with
+--backend local).
+
+    python bench_jobs_read_mode.py --jobs 5000 --concurrency 16 --rtt-ms 5
+    python bench_jobs_read_mode.py --qdrant-url http://localhost:6333 --rtt-ms 0
+
+--rtt-ms adds an artificial delay per MongoDB and Qdrant round trip so
+local servers approximate remote ones.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import numpy as np
+from pymongo import MongoClient
+from qdrant_client import QdrantClient
+
+import models.job as job_model
+import utils.qdrant_store as qdrant_store
+from utils.embedding import EMBEDDING_DIM
+from utils.vector_index import JobVectorIndex
+
+
+class _Delayed:
+    """Proxy that sleeps once per call of the named methods."""
+
+    def __init__(self, target, rtt_s, methods):
+        self._target = target
+        self._rtt_s = rtt_s
+        self._methods = methods
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name not in self._methods:
+            return attr
+
+        def delayed(*args, **kwargs):
+            time.sleep(self._rtt_s)
+            return attr(*args, **kwargs)
+
+        return delayed
+
+
+def _jobs(n):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((n, EMBEDDING_DIM)).astype(np.float32)
+    docs = [
+        {
+            "job_id": f"bench-{i}",
+            "title": f"Software Engineer {i}",
+            "company": "Acme",
+            "location": "Pune",
+            "country": "IN",
+            "description": "Build and maintain services. " * 100,
+            "apply_link": f"https://example.com/jobs/{i}",
+            "employment_type": "FULLTIME",
+            "posted_at": "2025-01-01T00:00:00.000Z",
+            "skills": ["python", "sql", "docker"],
+        }
+        for i in range(n)
+    ]
+    return docs, vectors
+
+
+def _first_page(mode, version, query, list_size, page_size):
+    matches = qdrant_store.search_similar_jobs(query, limit=list_size, version=version)
+    page_ids = [m.payload["job_id"] for m in matches[:page_size]]
+    if mode == "payload":
+        return [m.payload for m in matches[:page_size]]
+    return job_model.get_jobs_by_ids(page_ids, version=version)
+
+
+def _next_page(mode, version, page_ids):
+    if mode == "payload":
+        payloads = qdrant_store.get_job_payloads(page_ids, version=version)
+        return [payloads[job_id] for job_id in page_ids if job_id in payloads]
+    return job_model.get_jobs_by_ids(page_ids, version=version)
+
+
+def _load(fn, requests, concurrency):
+    def timed(args):
+        start = time.perf_counter()
+        listings = fn(*args)
+        assert listings, "empty page"
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = sorted(pool.map(timed, requests))
+    wall = time.perf_counter() - start
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return statistics.median(samples), p99, len(samples) / wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--uri",
+        default=os.getenv("BENCH_MONGODB_URI", "mongodb://localhost:27017"),
+    )
+    parser.add_argument("--qdrant-url", default=":memory:")
+    parser.add_argument("--backend", choices=("qdrant", "local"), default="qdrant")
+    parser.add_argument("--jobs", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--list-size", type=int, default=500, help="MATCH_LIST_SIZE")
+    parser.add_argument("--rtt-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    docs, vectors = _jobs(args.jobs)
+    rtt_s = args.rtt_ms / 1000
+    version = f"bench_read_{uuid.uuid4().hex[:8]}"
+
+    mongo = MongoClient(args.uri, serverSelectionTimeoutMS=3000)
+    qdrant = (
+        QdrantClient(":memory:") if args.qdrant_url == ":memory:" else QdrantClient(url=args.qdrant_url)
+    )
+    qdrant_store._client = _Delayed(qdrant, rtt_s, {"query_points", "retrieve"})
+    qdrant_store.VECTOR_BACKEND = args.backend
+    col = _Delayed(mongo[version]["jobs"], rtt_s, {"find"})
+
+    try:
+        mongo[version]["jobs"].insert_many([dict(doc) for doc in docs])
+        job_model._collection = lambda version=None: col
+        qdrant_store.create_job_collection(version)
+        qdrant_store.upsert_job_vectors(
+            [(doc["job_id"], vector, job_model.listing_payload(doc)) for doc, vector in zip(docs, vectors)],
+            version=version,
+        )
+        if args.backend == "local":
+            # Not published, so the app's JOB_INDEX_DIR is left alone
+            index = JobVectorIndex(
+                [doc["job_id"] for doc in docs], vectors,
+                [{"job_id": doc["job_id"], **job_model.listing_payload(doc)} for doc in docs],
+                version=version,
+            )
+            qdrant_store._local_job_index = lambda version: index
+
+        rng = random.Random(0)
+        queries = np.random.default_rng(1).standard_normal((args.requests, EMBEDDING_DIM))
+        pages = []
+        for _ in range(args.requests):
+            pages.append([f"bench-{rng.randrange(args.jobs)}" for _ in range(args.page_size)])
+
+        print(
+            f"{args.jobs} jobs, {args.requests} requests x {args.concurrency} threads, "
+            f"backend {args.backend}, +{args.rtt_ms} ms/round trip"
+        )
+        print(f"{'mode':<9}{'request':<12}{'p50 ms':>9}{'p99 ms':>9}{'req/s':>9}")
+        for mode in ("mongo", "payload"):
+            first = _load(
+                _first_page,
+                [(mode, version, q, args.list_size, args.page_size) for q in queries],
+                args.concurrency,
+            )
+            following = _load(
+                _next_page, [(mode, version, ids) for ids in pages], args.concurrency
+            )
+            for name, (p50, p99, rate) in (("first page", first), ("next page", following)):
+                print(f"{mode:<9}{name:<12}{p50:>9.2f}{p99:>9.2f}{rate:>9.0f}")
+    finally:
+        mongo.drop_database(version)
+        if qdrant.collection_exists(version):
+            qdrant.delete_collection(version)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Benchmark: JSearch page fetching, sequential vs concurrent.
+
+Starts a local fake JSearch server that answers /search with synthetic
+postings after an injected latency, throttles clients above its own
+request rate with 429 + Retry-After, and fails a share of requests with
+503. utils/jsearch_client.fetch_search_pages is then run against it at
+each concurrency level, reporting wall time, request/retry counts and
+whether the collected jobs match the sequential run.
+
+    python bench_jsearch_fetch.py --latency-ms 400 --concurrency 1,4,8
+    python bench_jsearch_fetch.py --server-rate 3 --error-rate 0.1
+
+No API key or network access is needed.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+import utils.jsearch_client as jsearch_client
+
+QUERIES = [
+    "software engineer fresher",
+    "junior software engineer",
+    "entry level software engineer",
+    "graduate software engineer",
+    "associate software engineer",
+]
+
+
+def _fake_server(latency_s, jitter_s, server_rate, error_rate, page_size, pages_per_query):
+    """A ThreadingHTTPServer imitating the JSearch /search endpoint."""
+    lock = threading.Lock()
+    window = []  # request times within the last second
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, body, headers=()):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            params = parse_qs(urlparse(self.path).query)
+            query = params.get("query", [""])[0]
+            page = int(params.get("page", ["1"])[0])
+
+            if server_rate > 0:
+                now = time.monotonic()
+                with lock:
+                    window[:] = [t for t in window if now - t < 1.0]
+                    throttled = len(window) >= server_rate
+                    if not throttled:
+                        window.append(now)
+                if throttled:
+                    return self._send(429, {"message": "Too many requests"}, [("Retry-After", "1")])
+
+            time.sleep(latency_s + random.uniform(0, jitter_s))
+            if random.random() < error_rate:
+                return self._send(503, {"message": "Service unavailable"})
+
+            q = QUERIES.index(query) if query in QUERIES else 0
+            data = []
+            if page <= pages_per_query:
+                for i in range(page_size):
+                    # Every fifth posting is also returned by the first query
+                    n = (page - 1) * page_size + i
+                    job_id = f"job-0-{n}" if n % 5 == 4 else f"job-{q}-{n}"
+                    data.append({
+                        "job_id": job_id,
+                        "job_title": f"Engineer {job_id}",
+                        "employer_name": "Acme",
+                        "job_description": "Build services in Python.",
+                    })
+            self._send(200, {"status": "OK", "data": data})
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _unique_ids(jobs, max_jobs):
+    ids = []
+    for job in jobs:
+        if job["job_id"] not in ids:
+            ids.append(job["job_id"])
+        if len(ids) >= max_jobs:
+            break
+    return ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", default="1,4,8", help="comma-separated levels")
+    parser.add_argument("--latency-ms", type=float, default=400)
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    parser.add_argument("--server-rate", type=float, default=10,
+                        help="requests/s the fake server allows before 429 (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="share of 503 responses")
+    parser.add_argument("--rate-per-sec", type=float, default=jsearch_client.JSEARCH_RATE_PER_SEC,
+                        help="client token-bucket rate")
+    parser.add_argument("--burst", type=int, default=jsearch_client.JSEARCH_BURST)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--pages-per-query", type=int, default=4,
+                        help="pages with results; later pages come back empty")
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--max-jobs", type=int, default=250)
+    parser.add_argument("--backoff-secs", type=float, default=0.25)
+    args = parser.parse_args()
+
+    jsearch_client.JSEARCH_BACKOFF_SECS = args.backoff_secs
+    server = _fake_server(
+        args.latency_ms / 1000, args.jitter_ms / 1000, args.server_rate,
+        args.error_rate, args.page_size, args.pages_per_query,
+    )
+    url = f"http://127.0.0.1:{server.server_address[1]}/search"
+    print(
+        f"fake JSearch: {args.latency_ms:.0f}+{args.jitter_ms:.0f} ms latency, "
+        f"{args.server_rate or 'unlimited'} req/s, {args.error_rate:.0%} errors; "
+        f"client rate {args.rate_per_sec}/s burst {args.burst}"
+    )
+    print(
+        f"{'workers':>8}{'wall s':>9}{'requests':>10}{'retries':>9}"
+        f"{'429s':>7}{'failed':>8}{'jobs':>7}  same as sequential"
+    )
+
+    reference = None
+    try:
+        for level in [int(c) for c in args.concurrency.split(",")]:
+            started = time.perf_counter()
+            jobs, stats = jsearch_client.fetch_search_pages(
+                QUERIES,
+                pages=args.pages,
+                params={"country": "in", "date_posted": "month"},
+                max_jobs=args.max_jobs,
+                url=url,
+                api_key="bench",
+                concurrency=level,
+                rate_per_sec=args.rate_per_sec,
+                burst=args.burst,
+            )
+            wall = time.perf_counter() - started
+            ids = _unique_ids(jobs, args.max_jobs)
+            if reference is None:
+                reference = ids
+            same = "yes" if ids == reference else "no"
+            if stats.failed_pages:
+                same += " (pages failed)"
+            print(
+                f"{level:>8}{wall:>9.2f}{stats.requests:>10}{stats.retries:>9}"
+                f"{stats.rate_limited:>7}{stats.failed_pages:>8}{len(ids):>7}  {same}"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
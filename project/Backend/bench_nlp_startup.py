@@ -0,0 +1,101 @@
+"""
+Startup benchmark: cold NLP build vs loading the NLP snapshot.
+
+Each case runs in a fresh interpreter and times get_skill_extractor()
+(spaCy load + matcher construction) and the first annotate call, for
+both skill engines. The annotations of the cold and snapshot runs are
+compared so a snapshot that changes results is caught.
+
+    python setup_dependencies.py      # writes the snapshot first
+    python bench_nlp_startup.py
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+SAMPLE = (
+    "We are hiring a junior software engineer with Python, SQL and machine "
+    "learning experience. Knowledge of Docker, Kubernetes and AWS is a plus; "
+    "good communication and team leadership skills are required."
+)
+
+
+def _worker(engine):
+    start = time.perf_counter()
+    import utils.nlp as nlp_module
+
+    import_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    extractor = nlp_module.get_skill_extractor("resume")
+    load_s = time.perf_counter() - start
+    if extractor is None:
+        sys.exit("No skill extractor available")
+
+    start = time.perf_counter()
+    annotations = extractor.annotate(SAMPLE)
+    first_s = time.perf_counter() - start
+
+    print(
+        json.dumps(
+            {
+                "import_s": import_s,
+                "load_s": load_s,
+                "first_annotate_s": first_s,
+                "snapshot": nlp_module._snapshot is not None,
+                "skills": sorted(nlp_module.skills_from_annotations(annotations)),
+            }
+        )
+    )
+
+
+def _run(engine, snapshot_dir):
+    env = dict(os.environ, SKILL_ENGINE_RESUME=engine, SKILL_SNAPSHOT_DIR=snapshot_dir)
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", engine],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.exit(f"{engine} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    from utils.nlp_snapshot import SKILL_SNAPSHOT_DIR
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--snapshot-dir", default=SKILL_SNAPSHOT_DIR)
+    parser.add_argument("--engines", nargs="+", default=["skillner", "trie"])
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.worker)
+        return
+
+    print(f"{'engine':<10}{'start':<10}{'import s':>10}{'load s':>10}{'1st call s':>12}{'total s':>10}")
+    for engine in args.engines:
+        cold = _run(engine, "")
+        warm = _run(engine, args.snapshot_dir)
+        for label, r in (("cold", cold), ("snapshot", warm)):
+            total = r["import_s"] + r["load_s"] + r["first_annotate_s"]
+            print(
+                f"{engine:<10}{label:<10}{r['import_s']:>10.2f}{r['load_s']:>10.2f}"
+                f"{r['first_annotate_s']:>12.2f}{total:>10.2f}"
+            )
+        if not warm["snapshot"]:
+            print(f"  {engine}: no usable snapshot at {args.snapshot_dir} – run setup_dependencies.py")
+        elif warm["skills"] != cold["skills"]:
+            print(f"  {engine}: snapshot results differ: {cold['skills']} vs {warm['skills']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Benchmark: recall and latency of Qdrant collection profiles against
+exact search on our own embeddings.
+
+Loads job vectors (and resume vectors as queries) from the live Qdrant
+collections, or from the published local index, loads them into one
+throwaway collection per profile (utils/qdrant_profiles.py) on a target
+Qdrant server, and compares each profile's top-k with exact brute-force
+top-k:
+
+    python bench_qdrant_profiles.py --target-url http://localhost:6333
+    python bench_qdrant_profiles.py --source index --corpus-size 100000 --ef 32,64,128
+    python bench_qdrant_profiles.py --profiles default,int8 --k 50
+
+Reported per profile (and per search ef with --ef): recall@k, p50/p99
+query latency, sequential queries/s, build time (upload + indexing) and
+an estimate of resident memory.
+
+--corpus-size grows the corpus past the real job count with jittered
+copies of real job vectors, to see how the trade-off moves as the job
+set grows. By default every collection is indexed, whatever its size;
+Qdrant normally leaves small segments unindexed and brute-forces them.
+Pass --no-force-index to measure that behaviour instead. The in-memory
+client (--target-url :memory:) ignores HNSW and quantization, so only
+a server gives meaningful numbers.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from dotenv import load_dotenv
+
+load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    CollectionStatus,
+    OptimizersConfigDiff,
+    PointStruct,
+    SearchParams,
+)
+
+from utils.embedding import EMBEDDING_DIM
+from utils.qdrant_profiles import (
+    PROFILES,
+    collection_params,
+    estimated_ram_mb,
+    get_profile,
+    search_params,
+)
+
+
+# ── Embeddings ───────────────────────────────────────────────────────────────
+
+def _scroll_vectors(client, collection, limit=None):
+    vectors, offset = [], None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection, limit=512, offset=offset, with_vectors=True
+        )
+        vectors.extend(point.vector for point in points)
+        if offset is None or (limit and len(vectors) >= limit):
+            break
+    return np.asarray(vectors[:limit] if limit else vectors, dtype=np.float32).reshape(-1, EMBEDDING_DIM)
+
+
+def _load_embeddings(source, source_url, queries):
+    """``(jobs, queries)`` float32 matrices from our own data."""
+    if source == "index":
+        from utils.vector_index import load_job_index
+
+        index, _ = load_job_index()
+        if index is None:
+            raise SystemExit("No local job index published (JOB_INDEX_DIR)")
+        jobs, resumes = np.asarray(index.vectors, dtype=np.float32), np.empty((0, EMBEDDING_DIM))
+    else:
+        from utils.job_versions import active_job_version
+
+        client = QdrantClient(url=source_url, api_key=os.getenv("QDRANT_API_KEY"))
+        jobs = _scroll_vectors(client, active_job_version())
+        resumes = _scroll_vectors(client, "resumes", limit=queries)
+
+    # Too few resumes: hold some jobs out and use them as queries too
+    missing = max(0, queries - len(resumes))
+    if missing:
+        rng = np.random.default_rng(0)
+        held_out = rng.choice(len(jobs), size=min(missing, len(jobs) // 10), replace=False)
+        resumes = np.vstack([resumes, jobs[held_out]]) if len(resumes) else jobs[held_out]
+        jobs = np.delete(jobs, held_out, axis=0)
+    print(f"Embeddings: {len(jobs)} jobs, {len(resumes)} queries ({source})")
+    return jobs, resumes
+
+
+def _grow(jobs, size, jitter, rng):
+    """Pad the corpus to ``size`` with jittered copies of real vectors."""
+    if size <= len(jobs):
+        return jobs
+    base = jobs[rng.integers(0, len(jobs), size - len(jobs))]
+    noise = rng.standard_normal(base.shape).astype(np.float32) * jitter / np.sqrt(EMBEDDING_DIM)
+    return np.vstack([jobs, base + noise])
+
+
+def _normalize(matrix):
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+
+# ── Benchmark ────────────────────────────────────────────────────────────────
+
+def _build(client, name, profile, vectors, force_index, local):
+    start = time.perf_counter()
+    client.create_collection(
+        collection_name=name,
+        optimizers_config=OptimizersConfigDiff(indexing_threshold=1) if force_index else None,
+        **collection_params(profile),
+    )
+    for offset in range(0, len(vectors), 512):
+        client.upsert(
+            collection_name=name,
+            points=[
+                PointStruct(id=i, vector=vectors[i].tolist())
+                for i in range(offset, min(offset + 512, len(vectors)))
+            ],
+            wait=False,
+        )
+    # Wait for the optimizer to finish indexing / quantizing
+    while not local:
+        info = client.get_collection(name)
+        indexed = info.indexed_vectors_count or 0
+        if info.status == CollectionStatus.GREEN and (not force_index or indexed >= len(vectors)):
+            break
+        time.sleep(0.5)
+    return time.perf_counter() - start
+
+
+def _measure(client, name, queries, truth, k, params):
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        points = client.query_points(
+            collection_name=name, query=query.tolist(), limit=k, search_params=params
+        ).points
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len({point.id for point in points} & expected)
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return hits / (len(queries) * k), statistics.median(latencies), p99, 1000 / statistics.mean(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--source", choices=("qdrant", "index"), default="qdrant",
+                        help="live Qdrant collections or the published local index")
+    parser.add_argument("--source-url", default=os.getenv("QDRANT_URL"))
+    parser.add_argument("--target-url", default="http://localhost:6333",
+                        help="Qdrant server for the throwaway collections")
+    parser.add_argument("--profiles", default=",".join(PROFILES), help="comma-separated names")
+    parser.add_argument("--custom", help='extra profile as JSON, e.g. \'{"quantization": "int8", "m": 24}\'')
+    parser.add_argument("--ef", default="", help="search ef values to sweep, e.g. 32,64,128")
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--corpus-size", type=int, default=0)
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--no-force-index", action="store_true")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    jobs, queries = _load_embeddings(args.source, args.source_url, args.queries)
+    jobs = _normalize(_grow(jobs, args.corpus_size, args.jitter, rng)).astype(np.float32)
+    queries = _normalize(queries[: args.queries]).astype(np.float32)
+    k = min(args.k, len(jobs))
+
+    # Exact top-k (cosine = dot product of normalised vectors)
+    start = time.perf_counter()
+    scores = queries @ jobs.T
+    truth = [set(np.argpartition(-row, k - 1)[:k].tolist()) for row in scores]
+    numpy_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    local = args.target_url == ":memory:"
+    client = QdrantClient(":memory:") if local else QdrantClient(url=args.target_url)
+    if local:
+        print("In-memory client: HNSW and quantization are ignored (every search is exact)")
+
+    specs = [spec for spec in args.profiles.split(",") if spec]
+    if args.custom:
+        specs.append(args.custom)
+    efs = [int(ef) for ef in args.ef.split(",") if ef]
+
+    print(f"{len(jobs)} jobs, {len(queries)} queries, recall@{k}; NumPy exact search {numpy_ms:.2f} ms/query")
+    print(
+        f"{'profile':<12}{'ef':>6}{'recall':>8}{'p50 ms':>9}{'p99 ms':>9}{'qps':>8}"
+        f"{'build s':>9}{'RAM MB':>9}"
+    )
+    for spec in specs:
+        profile = get_profile(spec)
+        label = spec if spec in PROFILES else "custom"
+        name = f"bench_profile_{uuid.uuid4().hex[:8]}"
+        try:
+            build_s = _build(client, name, profile, jobs, not args.no_force_index, local)
+            ram = estimated_ram_mb(profile, len(jobs))
+            runs = [(profile["ef"], search_params(profile))]
+            if efs:
+                runs = [(ef, search_params({**profile, "ef": ef})) for ef in efs]
+            if spec == specs[0]:
+                # Qdrant's own brute force on the same collection, for reference
+                runs.append(("exact", SearchParams(exact=True)))
+            for ef, params in runs:
+                recall, p50, p99, qps = _measure(client, name, queries, truth, k, params)
+                row = "exact" if ef == "exact" else label
+                ef = "-" if ef in (None, "exact") else ef
+                print(
+                    f"{row:<12}{ef:>6}{recall:>8.3f}{p50:>9.2f}{p99:>9.2f}"
+                    f"{qps:>8.0f}{build_s:>9.1f}{ram:>9.1f}"
+                )
+        finally:
+            if client.collection_exists(name):
+                client.delete_collection(name)
+
+
+if __name__ == "__main__":
+    main()
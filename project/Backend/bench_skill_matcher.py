@@ -0,0 +1,132 @@
+"""
+Agreement benchmark: trie skill matcher vs SkillNer.
+
+Runs both engines over the same job descriptions and reports, with
+SkillNer as the reference, how many extracted skills agree (precision,
+recall, Jaccard – micro-averaged over the corpus) and how long each
+engine takes per document. The most frequent disagreements are listed so
+rule differences are easy to spot.
+
+    python bench_skill_matcher.py                      # descriptions from MongoDB
+    python bench_skill_matcher.py --corpus jobs.jsonl  # one JSON object per line
+
+Corpus files hold one description per line, either as plain text or as a
+JSON object with a "description" (or "job_description") field.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+
+sys.path.append(os.path.abspath(os.path.dirname(__file__)))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import utils.nlp as nlp_module
+from utils.nlp import skills_from_annotations
+
+
+def _load_corpus(path, limit):
+    texts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                doc = json.loads(line)
+                line = doc.get("description") or doc.get("job_description") or ""
+            if line:
+                texts.append(line)
+            if len(texts) >= limit:
+                break
+    return texts
+
+
+def _mongo_corpus(limit):
+    from database import get_db
+    from utils.job_versions import active_job_version
+
+    cursor = get_db()[active_job_version()].find(
+        {"description": {"$nin": [None, ""]}}, {"description": 1}
+    ).limit(limit)
+    return [doc["description"] for doc in cursor]
+
+
+def _run(engine, texts):
+    skills, timings = [], []
+    for text in texts:
+        start = time.perf_counter()
+        annotations = engine.annotate(text)
+        timings.append((time.perf_counter() - start) * 1000)
+        skills.append(skills_from_annotations(annotations))
+    return skills, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--corpus", help="JSONL/text file (default: MongoDB jobs)")
+    parser.add_argument("--limit", type=int, default=250)
+    parser.add_argument("--spacy-model", default=nlp_module.SPACY_MODEL)
+    parser.add_argument("--show", type=int, default=15, help="disagreements to list")
+    args = parser.parse_args()
+
+    texts = _load_corpus(args.corpus, args.limit) if args.corpus else _mongo_corpus(args.limit)
+    if not texts:
+        sys.exit("No job descriptions found")
+
+    nlp_module.SPACY_MODEL = args.spacy_model
+    start = time.perf_counter()
+    skillner = nlp_module._get_skillner()
+    skillner_build = time.perf_counter() - start
+    start = time.perf_counter()
+    matcher = nlp_module._get_skill_matcher()
+    matcher_build = time.perf_counter() - start
+    if skillner is None or matcher is None:
+        sys.exit("Could not build both engines")
+
+    reference, reference_ms = _run(skillner, texts)
+    candidate, candidate_ms = _run(matcher, texts)
+
+    both = only_reference = only_candidate = 0
+    missed, extra = Counter(), Counter()
+    exact = 0
+    for ref, cand in zip(reference, candidate):
+        both += len(ref & cand)
+        only_reference += len(ref - cand)
+        only_candidate += len(cand - ref)
+        missed.update(ref - cand)
+        extra.update(cand - ref)
+        exact += ref == cand
+
+    precision = both / max(1, both + only_candidate)
+    recall = both / max(1, both + only_reference)
+    jaccard = both / max(1, both + only_reference + only_candidate)
+
+    print(f"{len(texts)} documents, spaCy model {args.spacy_model}")
+    print(f"{'engine':<10}{'build s':>10}{'p50 ms':>10}{'mean ms':>10}{'total s':>10}")
+    for name, build, ms in (
+        ("skillner", skillner_build, reference_ms),
+        ("trie", matcher_build, candidate_ms),
+    ):
+        print(
+            f"{name:<10}{build:>10.2f}{statistics.median(ms):>10.2f}"
+            f"{statistics.fmean(ms):>10.2f}{sum(ms) / 1000:>10.2f}"
+        )
+    print(
+        f"agreement: precision {precision:.3f}, recall {recall:.3f}, "
+        f"jaccard {jaccard:.3f}, identical documents {exact}/{len(texts)}"
+    )
+    if args.show:
+        print(f"most missed by trie:   {missed.most_common(args.show)}")
+        print(f"most extra from trie:  {extra.most_common(args.show)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -22,7 +22,7 @@ try:
     collections = client.get_collections()
     print(f"Collections: {[c.name for c in collections.collections]}")
 
-    for col_name in ["jobs", "resumes"]:
+    for col_name in [os.getenv("QDRANT_JOBS_ALIAS", "jobs_current"), "jobs", "resumes"]:
         try:
             info = client.get_collection(col_name)
             print(f"  '{col_name}' -> points_count={info.points_count}, vectors_count={info.vectors_count}")
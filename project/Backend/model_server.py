@@ -0,0 +1,152 @@
+"""
+Model server – hosts the heavy models once per box so web workers don't
+each load their own copy of spaCy en_core_web_lg + SkillNer, the
+SentenceTransformer and Faster-Whisper.
+
+Run it next to the web app and point the app at it:
+
+    python model_server.py                      # listens on 127.0.0.1:8765
+    MODEL_SERVER_URL=http://127.0.0.1:8765 gunicorn -w 4 app:app
+
+``python model_server.py`` uses Flask's development server. In
+production serve it with a WSGI server instead – one process (the point
+is a single copy of the models) with threads for concurrent requests,
+and a worker timeout long enough to load the models:
+
+    gunicorn -w 1 --threads 16 --timeout 300 -b 127.0.0.1:8765 model_server:app
+    waitress-serve --listen=127.0.0.1:8765 --threads=16 model_server:app
+
+Models are preloaded when the module is imported, so either way the
+first request doesn't pay for loading them (MODEL_SERVER_PRELOAD=0 to
+load lazily instead).
+
+Endpoints (used by utils/model_client.py):
+  POST /embed        {"texts": [...], "batch_size": n} -> float32 bytes,
+                     row count in the X-Embedding-Rows header, model
+                     identity in X-Embedding-Model
+  POST /annotate     {"texts": [...], "site": ...}     -> {"results": [...]}
+  GET  /skill-forms                                    -> {"forms": [...]}
+  POST /transcribe   raw audio body, ?suffix=.webm     -> {"text": "..."}
+  GET  /health                                        -> {"status": "ok",
+                                                          "embedding_model": ...}
+
+Single-text /embed calls from concurrent requests go through the
+embedding micro-batcher, so many workers' resume uploads share one
+model call.
+"""
+
+import json
+import os
+
+from dotenv import load_dotenv
+
+# The server runs the models itself – never forward to another server
+os.environ["MODEL_SERVER_URL"] = ""
+load_dotenv()
+
+from flask import Flask, Response, jsonify, request
+
+import numpy as np
+
+from utils.embedding import embedding_model_id, generate_embedding, generate_embeddings
+from utils.nlp import annotate_batch, get_skill_extractor
+from utils.skill_index import skill_db_surface_forms
+from utils.stt_service import transcribe_audio
+
+MODEL_SERVER_HOST = os.getenv("MODEL_SERVER_HOST", "127.0.0.1")
+MODEL_SERVER_PORT = int(os.getenv("MODEL_SERVER_PORT", "8765"))
+MODEL_SERVER_PRELOAD = os.getenv("MODEL_SERVER_PRELOAD", "1") == "1"
+
+app = Flask(__name__)
+app.config["MAX_CONTENT_LENGTH"] = 25 * 1024 * 1024  # audio clips
+
+
+def _json_default(value):
+    # SkillNer results contain NumPy scalars
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+@app.route("/health")
+def health():
+    return jsonify({"status": "ok", "embedding_model": embedding_model_id()})
+
+
+@app.route("/embed", methods=["POST"])
+def embed():
+    body = request.get_json(silent=True) or {}
+    texts = body.get("texts")
+    if not isinstance(texts, list):
+        return jsonify({"error": "texts must be a list"}), 400
+
+    try:
+        if len(texts) == 1:
+            vectors = generate_embedding(texts[0])[None, :]
+        else:
+            vectors = generate_embeddings(texts, batch_size=int(body.get("batch_size", 32)))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    return Response(
+        np.ascontiguousarray(vectors, dtype=np.float32).tobytes(),
+        mimetype="application/octet-stream",
+        headers={
+            "X-Embedding-Rows": str(len(vectors)),
+            "X-Embedding-Model": embedding_model_id(),
+        },
+    )
+
+
+@app.route("/annotate", methods=["POST"])
+def annotate():
+    body = request.get_json(silent=True) or {}
+    texts = body.get("texts")
+    if not isinstance(texts, list):
+        return jsonify({"error": "texts must be a list"}), 400
+
+    if get_skill_extractor(body.get("site")) is None:
+        return jsonify({"error": "Skill extraction is not available"}), 503
+
+    try:
+        results = annotate_batch(texts, body.get("site"))
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return Response(
+        json.dumps({"results": results}, default=_json_default),
+        mimetype="application/json",
+    )
+
+
+@app.route("/skill-forms")
+def skill_forms():
+    try:
+        return jsonify({"forms": sorted(skill_db_surface_forms())})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/transcribe", methods=["POST"])
+def transcribe():
+    suffix = request.args.get("suffix", ".webm")
+    try:
+        return jsonify({"text": transcribe_audio(request.get_data(), suffix=suffix)})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def _preload():
+    """Load the models before accepting traffic so no request pays for it."""
+    get_skill_extractor("resume")
+    get_skill_extractor("ingest")
+    generate_embeddings(["warm up"])
+    print("Model server ready")
+
+
+# At import, so gunicorn/waitress workers are warm before serving too
+if MODEL_SERVER_PRELOAD:
+    _preload()
+
+
+if __name__ == "__main__":
+    app.run(host=MODEL_SERVER_HOST, port=MODEL_SERVER_PORT, threaded=True)
@@ -0,0 +1,239 @@
+"""
+Job model – job postings fetched from JSearch and stored in MongoDB.
+
+Schema (jobs collection):
+─────────────────────────────────────────────────────────
+Field               Type        Description
+─────────────────────────────────────────────────────────
+job_id              str         JSearch job ID (unique)
+title               str | None  Job title
+company             str | None  Employer name
+location            str | None  City
+country             str | None  Country code, upper case (e.g. "IN")
+description         str         Full job description
+apply_link          str | None  Application URL
+employment_type     str | None  FULLTIME, INTERN, ...
+posted_at           str | None  Posting datetime (UTC, ISO string)
+skills              list[str]   Skills extracted from the description
+content_hash        str         SHA-256 of the fields above except skills
+first_seen_at       datetime    When ingest first stored the posting
+last_seen_at        datetime    Last ingest run whose feed contained it
+─────────────────────────────────────────────────────────
+
+The collection name is the active job version (utils/job_versions.py):
+``jobs`` until the first blue/green rebuild, ``jobs_<timestamp>`` after.
+Functions take an optional ``version`` so one request or ingest run can
+pin a single snapshot; None means the active one.
+"""
+
+import hashlib
+import json
+from datetime import datetime
+
+from pymongo import UpdateOne
+
+from database import get_db
+from utils.bulk_writes import MONGO_WRITE_BATCH, chunked, mongo_bulk_write
+from utils.job_versions import active_job_version
+
+
+# Fields that make up a posting's content (everything ingest copies from JSearch)
+CONTENT_FIELDS = (
+    "title",
+    "company",
+    "location",
+    "country",
+    "description",
+    "apply_link",
+    "employment_type",
+    "posted_at",
+)
+
+# Length of the description preview returned by the listing endpoint
+DESCRIPTION_PREVIEW_CHARS = 300
+
+# Fields the /api/jobs listing needs – everything except the full
+# description, of which only a preview is shown. Ingest copies the same
+# fields into each job's Qdrant payload (listing_payload).
+LISTING_FIELDS = (
+    "title",
+    "company",
+    "location",
+    "country",
+    "apply_link",
+    "employment_type",
+    "posted_at",
+    "skills",
+)
+
+_LISTING_PROJECTION = {
+    "_id": 0,
+    "job_id": 1,
+    **{field: 1 for field in LISTING_FIELDS},
+    # Let MongoDB cut the preview so the full text never crosses the wire
+    "description": {"$substrCP": ["$description", 0, DESCRIPTION_PREVIEW_CHARS]},
+}
+
+
+def _collection(version: str | None = None):
+    return get_db()[version or active_job_version()]
+
+
+def ensure_job_indexes(version: str | None = None):
+    """Create indexes on first startup (and on every new version)."""
+    col = _collection(version)
+    col.create_index("job_id", unique=True)
+    col.create_index("last_seen_at")
+    col.create_index("country")
+
+
+def get_jobs_by_ids(job_ids: list[str], version: str | None = None) -> list[dict]:
+    """Fetch listing fields for a page of jobs in a single round trip.
+
+    Results keep the order of ``job_ids`` (i.e. the vector-search rank)
+    and silently skip IDs that no longer exist in MongoDB. The
+    ``description`` field holds only the first DESCRIPTION_PREVIEW_CHARS
+    characters.
+    """
+    if not job_ids:
+        return []
+
+    cursor = _collection(version).find(
+        {"job_id": {"$in": list(job_ids)}}, _LISTING_PROJECTION
+    )
+    by_id = {doc["job_id"]: doc for doc in cursor}
+
+    return [by_id[job_id] for job_id in job_ids if job_id in by_id]
+
+
+def listing_payload(doc: dict) -> dict:
+    """The listing fields of a job document as a Qdrant payload, with the
+    description cut to DESCRIPTION_PREVIEW_CHARS (what get_jobs_by_ids
+    returns, without the job_id)."""
+    payload = {field: doc[field] for field in LISTING_FIELDS if field in doc}
+    payload["description"] = (doc.get("description") or "")[:DESCRIPTION_PREVIEW_CHARS]
+    return payload
+
+
+def iter_job_listings(version: str | None = None, batch_size: int = 500):
+    """Iterate the listing payload of every job that has a vector (a
+    non-empty description), as ``(job_id, payload)``."""
+    cursor = _collection(version).find(
+        {"description": {"$nin": ["", None]}},
+        {"_id": 0, "job_id": 1, "description": 1, **{field: 1 for field in LISTING_FIELDS}},
+        batch_size=batch_size,
+    )
+    for doc in cursor:
+        yield doc["job_id"], listing_payload(doc)
+
+
+def get_all_job_skills():
+    """Iterate ``{job_id, skills}`` for every job that has extracted skills."""
+    return _collection().find(
+        {"skills": {"$exists": True}}, {"_id": 0, "job_id": 1, "skills": 1}
+    )
+
+
+def get_jobs_without_skills(after_id=None, limit: int = 20) -> list[dict]:
+    """Next batch (by _id) of jobs whose skills were never extracted."""
+    query = {"skills": {"$exists": False}}
+    if after_id is not None:
+        query["_id"] = {"$gt": after_id}
+    cursor = (
+        _collection()
+        .find(query, {"_id": 1, "job_id": 1, "description": 1})
+        .sort("_id", 1)
+        .limit(limit)
+    )
+    return list(cursor)
+
+
+def set_job_skills(skills_by_id: dict) -> int:
+    """Store extracted skills for several jobs (keyed by _id) in one bulk write."""
+    if not skills_by_id:
+        return 0
+    return mongo_bulk_write(
+        _collection(),
+        [UpdateOne({"_id": _id}, {"$set": {"skills": skills}}) for _id, skills in skills_by_id.items()],
+        "Skill update",
+    )
+
+
+def job_content_hash(doc: dict) -> str:
+    """Stable hash of a posting's content, used to skip unchanged jobs."""
+    content = {field: doc.get(field) for field in CONTENT_FIELDS}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+def get_job_hashes(job_ids: list[str], version: str | None = None) -> dict:
+    """``{job_id: content_hash}`` for the stored jobs among ``job_ids``."""
+    if not job_ids:
+        return {}
+    cursor = _collection(version).find(
+        {"job_id": {"$in": list(job_ids)}}, {"_id": 0, "job_id": 1, "content_hash": 1}
+    )
+    return {doc["job_id"]: doc.get("content_hash") for doc in cursor}
+
+
+def upsert_jobs(docs: list[dict], seen_at: datetime, version: str | None = None,
+                batch_size: int = MONGO_WRITE_BATCH) -> int:
+    """Insert new or overwrite changed postings in bulk writes of
+    ``batch_size`` (failed operations are retried).
+
+    A doc without a ``skills`` key has any stored skills removed, so the
+    skill backfill annotates it again.
+    """
+    if not docs:
+        return 0
+    ops = []
+    for doc in docs:
+        fields = {key: value for key, value in doc.items() if key != "_id"}
+        fields["last_seen_at"] = seen_at
+        update = {"$set": fields, "$setOnInsert": {"first_seen_at": seen_at}}
+        if "skills" not in doc:
+            update["$unset"] = {"skills": ""}
+        ops.append(UpdateOne({"job_id": doc["job_id"]}, update, upsert=True))
+    col = _collection(version)
+    return sum(
+        mongo_bulk_write(col, batch, "Job upsert") for batch in chunked(ops, batch_size)
+    )
+
+
+def touch_jobs(job_ids: list[str], seen_at: datetime, version: str | None = None) -> int:
+    """Mark unchanged postings as still present in the feed."""
+    if not job_ids:
+        return 0
+    result = _collection(version).update_many(
+        {"job_id": {"$in": list(job_ids)}}, {"$set": {"last_seen_at": seen_at}}
+    )
+    return result.modified_count
+
+
+def expire_jobs(unseen_since: datetime, posted_before: str,
+                version: str | None = None) -> list[str]:
+    """Delete postings that dropped out of the feed before ``unseen_since``
+    or were posted before ``posted_before`` (ISO-8601 UTC string).
+    Call only after the run's upsert/touch, which sets last_seen_at on
+    every posting still in the feed. Returns the deleted job IDs."""
+    query = {
+        "$or": [
+            {"last_seen_at": {"$lt": unseen_since}},
+            # Stored before incremental sync, and absent from this run's feed
+            {"last_seen_at": {"$exists": False}},
+            {"posted_at": {"$lt": posted_before}},
+        ]
+    }
+    col = _collection(version)
+    job_ids = [doc["job_id"] for doc in col.find(query, {"_id": 0, "job_id": 1})]
+    if job_ids:
+        col.delete_many({"job_id": {"$in": job_ids}})
+    return job_ids
+
+
+def count_jobs(version: str | None = None) -> int:
+    return _collection(version).count_documents({})
+
+
+def drop_job_version(version: str):
+    """Drop a retired (or failed) version's collection."""
+    get_db().drop_collection(version)
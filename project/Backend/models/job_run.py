@@ -0,0 +1,109 @@
+"""
+Job run model – history of background job-fetch runs.
+
+Schema (job_runs collection):
+─────────────────────────────────────────────────────────
+Field               Type        Description
+─────────────────────────────────────────────────────────
+_id                 str         Run ID
+trigger             str         schedule | manual | cli
+requested_by        str | None  Clerk ID of the admin (manual runs)
+slot                datetime    Scheduled fire time (scheduled runs
+                                only; unique, so each slot runs once)
+owner               str         host:pid of the process that ran it
+mode                str         incremental | bluegreen
+status              str         running | success | error
+counts              dict        fetched / new / changed / unchanged /
+                                expired (incremental) or fetched /
+                                stored / vectors / version (bluegreen)
+error               str | None  Error message (on error)
+started_at          datetime    When the run took the lock
+finished_at         datetime    When it ended
+duration_secs       float       finished_at - started_at
+─────────────────────────────────────────────────────────
+Records expire JOB_RUN_HISTORY_DAYS after they start.
+A second scheduled run for the same slot fails start_job_run() with
+DuplicateKeyError.
+"""
+
+import os
+import uuid
+from datetime import datetime, timezone
+
+from database import get_db
+
+
+COLLECTION = "job_runs"
+JOB_RUN_HISTORY_DAYS = int(os.getenv("JOB_RUN_HISTORY_DAYS", "90"))
+
+
+def _collection():
+    return get_db()[COLLECTION]
+
+
+def _serialize(doc: dict | None) -> dict | None:
+    """Rename _id to run_id and make datetimes JSON-friendly."""
+    if doc is None:
+        return None
+    doc["run_id"] = doc.pop("_id")
+    for key in ("slot", "started_at", "finished_at"):
+        if isinstance(doc.get(key), datetime):
+            doc[key] = doc[key].isoformat()
+    return doc
+
+
+def ensure_job_run_indexes():
+    """Create indexes on first startup."""
+    col = _collection()
+    col.create_index("started_at", expireAfterSeconds=JOB_RUN_HISTORY_DAYS * 86400)
+    col.create_index("slot", unique=True, sparse=True)
+
+
+def start_job_run(trigger: str, mode: str, owner: str, requested_by: str | None = None,
+                  slot: datetime | None = None) -> str:
+    """Record a run that has just taken the lock and return its ID.
+    Raises DuplicateKeyError if ``slot`` has already been run."""
+    run_id = uuid.uuid4().hex
+    doc = {
+        "_id": run_id,
+        "trigger": trigger,
+        "requested_by": requested_by,
+        "owner": owner,
+        "mode": mode,
+        "status": "running",
+        "counts": {},
+        "error": None,
+        "started_at": datetime.now(timezone.utc),
+    }
+    if slot is not None:
+        doc["slot"] = slot  # absent otherwise: the sparse index skips it
+    _collection().insert_one(doc)
+    return run_id
+
+
+def finish_job_run(run_id: str, counts: dict | None = None, error: str | None = None):
+    """Mark a run finished (``error`` set means it failed)."""
+    col = _collection()
+    run = col.find_one({"_id": run_id}, {"started_at": 1}) or {}
+    now = datetime.now(timezone.utc)
+    started_at = run.get("started_at")
+    if isinstance(started_at, datetime) and started_at.tzinfo is None:
+        started_at = started_at.replace(tzinfo=timezone.utc)  # pymongo returns naive UTC
+    col.update_one(
+        {"_id": run_id},
+        {
+            "$set": {
+                "status": "error" if error else "success",
+                "counts": counts or {},
+                "error": error,
+                "finished_at": now,
+                "duration_secs": round((now - started_at).total_seconds(), 1) if started_at else None,
+            }
+        },
+    )
+
+
+def list_job_runs(limit: int = 20) -> list[dict]:
+    """Most recent runs first."""
+    cursor = _collection().find().sort("started_at", -1).limit(limit)
+    return [_serialize(doc) for doc in cursor]
@@ -0,0 +1,108 @@
+"""
+Resume job model – tracks background resume-processing jobs in MongoDB so
+any worker process can answer status polls.
+
+Schema (resume_jobs collection):
+─────────────────────────────────────────────────────────
+Field               Type        Description
+─────────────────────────────────────────────────────────
+_id                 str         Job ID returned to the client
+clerk_id            str         Owner of the upload
+status              str         queued | running | success | error
+stages              dict        stage name -> {finished_at, seconds}
+resume_url          str | None  Cloudinary URL (on success)
+skills              list[str]   Extracted skills (on success)
+message             str | None  Error message (on error)
+created_at          datetime    When the upload was accepted
+updated_at          datetime    Last status change
+─────────────────────────────────────────────────────────
+Records expire RESUME_JOB_TTL seconds after creation.
+"""
+
+import os
+import uuid
+from datetime import datetime, timezone
+
+from database import get_db
+
+
+COLLECTION = "resume_jobs"
+RESUME_JOB_TTL = int(os.getenv("RESUME_JOB_TTL", "86400"))  # 1 day
+
+
+def _collection():
+    return get_db()[COLLECTION]
+
+
+def _serialize(doc: dict | None) -> dict | None:
+    """Rename _id to job_id and make datetimes JSON-friendly."""
+    if doc is None:
+        return None
+    doc["job_id"] = doc.pop("_id")
+    for key in ("created_at", "updated_at"):
+        if isinstance(doc.get(key), datetime):
+            doc[key] = doc[key].isoformat()
+    for stage in doc.get("stages", {}).values():
+        if isinstance(stage.get("finished_at"), datetime):
+            stage["finished_at"] = stage["finished_at"].isoformat()
+    return doc
+
+
+def ensure_resume_job_indexes():
+    """Create indexes on first startup."""
+    col = _collection()
+    col.create_index("created_at", expireAfterSeconds=RESUME_JOB_TTL)
+    col.create_index("clerk_id")
+
+
+def create_resume_job(clerk_id: str) -> str:
+    """Record a newly accepted upload and return its job ID."""
+    now = datetime.now(timezone.utc)
+    job_id = uuid.uuid4().hex
+    _collection().insert_one(
+        {
+            "_id": job_id,
+            "clerk_id": clerk_id,
+            "status": "queued",
+            "stages": {},
+            "created_at": now,
+            "updated_at": now,
+        }
+    )
+    return job_id
+
+
+def _update(job_id: str, fields: dict):
+    fields["updated_at"] = datetime.now(timezone.utc)
+    _collection().update_one({"_id": job_id}, {"$set": fields})
+
+
+def mark_resume_job_running(job_id: str):
+    _update(job_id, {"status": "running"})
+
+
+def mark_resume_stage_done(job_id: str, stage: str, seconds: float):
+    """Record that one pipeline stage finished and how long it took."""
+    _update(
+        job_id,
+        {
+            f"stages.{stage}": {
+                "finished_at": datetime.now(timezone.utc),
+                "seconds": round(seconds, 3),
+            }
+        },
+    )
+
+
+def complete_resume_job(job_id: str, resume_url: str, skills: list[str]):
+    _update(job_id, {"status": "success", "resume_url": resume_url, "skills": skills})
+
+
+def fail_resume_job(job_id: str, message: str):
+    _update(job_id, {"status": "error", "message": message})
+
+
+def get_resume_job(job_id: str, clerk_id: str) -> dict | None:
+    """Fetch a job record, only if it belongs to the given user."""
+    doc = _collection().find_one({"_id": job_id, "clerk_id": clerk_id}, {"clerk_id": 0})
+    return _serialize(doc)
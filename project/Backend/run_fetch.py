@@ -6,11 +6,31 @@ sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 from dotenv import load_dotenv
 load_dotenv(os.path.join(os.path.dirname(__file__), ".env"))
 
+if "--rollback" in sys.argv:
+    from utils.job_fetcher import rollback_jobs
+    rollback_jobs()
+    sys.exit(0)
+
+if "--apply-profile" in sys.argv:
+    from utils.job_versions import active_job_version
+    from utils.qdrant_profiles import JOB_PROFILE, RESUME_PROFILE
+    from utils.qdrant_store import apply_collection_profile
+    apply_collection_profile(active_job_version(), JOB_PROFILE)
+    apply_collection_profile("resumes", RESUME_PROFILE)
+    sys.exit(0)
+
+if "--sync-payloads" in sys.argv:
+    from utils.job_fetcher import sync_job_payloads
+    sync_job_payloads()
+    sys.exit(0)
+
 print("Starting job fetch...")
 try:
-    from utils.job_fetcher import fetch_jobs
-    fetch_jobs()
-    print("Job fetch completed successfully.")
+    # Same lock as the scheduler, so this never overlaps a scheduled run
+    from utils.scheduler import run_job_fetch
+    run_id = run_job_fetch("cli", mode="bluegreen" if "--bluegreen" in sys.argv else None)
+    if run_id is None:
+        sys.exit(1)
 except Exception as e:
     import traceback
     traceback.print_exc()
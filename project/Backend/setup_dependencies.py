@@ -1,12 +1,18 @@
 """
 Setup NLP dependencies required by the resume parser.
-Run this once after `pip install -r requirements.txt`:
+Run this once after `pip install -r requirements.txt` (and again after
+upgrading spaCy, the model or SkillNer):
     python setup_dependencies.py
+
+The last step writes the NLP snapshot (utils/nlp_snapshot.py) so the app
+doesn't rebuild the SkillNer matchers on every start.
 """
 
 import spacy
 from spacy.cli import download
 
+from utils.nlp import build_nlp_snapshot
+
 SPACY_MODEL = "en_core_web_lg"
 
 print(f"Checking SpaCy model '{SPACY_MODEL}'...")
@@ -19,4 +25,7 @@ except OSError:
     download(SPACY_MODEL)
     print(f"'{SPACY_MODEL}' installed successfully")
 
+print("Building NLP snapshot...")
+build_nlp_snapshot()
+
 print("\nAll NLP dependencies ready!")
\ No newline at end of file
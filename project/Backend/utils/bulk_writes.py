@@ -0,0 +1,74 @@
+"""
+Bulk writes – batching and retry helpers for the ingest writers.
+
+Ingest sends MongoDB bulk_write batches of up to MONGO_WRITE_BATCH
+operations and Qdrant upserts of up to QDRANT_UPSERT_BATCH points
+(models/job.py, utils/qdrant_store.py), so write time grows with the
+number of batches rather than the number of jobs.
+
+Batches are retried up to WRITE_MAX_RETRIES times with exponential
+backoff. For an unordered MongoDB bulk_write only the operations that
+failed are sent again; every ingest write is an idempotent upsert or
+$set, so retrying is safe.
+"""
+
+import os
+import time
+
+from pymongo.errors import AutoReconnect, BulkWriteError, NetworkTimeout
+
+MONGO_WRITE_BATCH = int(os.getenv("MONGO_WRITE_BATCH", "500"))
+QDRANT_UPSERT_BATCH = int(os.getenv("QDRANT_UPSERT_BATCH", "256"))
+# Don't wait for Qdrant to apply each batch; the last one waits for all
+QDRANT_UPSERT_WAIT = os.getenv("QDRANT_UPSERT_WAIT", "0") == "1"
+WRITE_MAX_RETRIES = int(os.getenv("WRITE_MAX_RETRIES", "3"))
+WRITE_BACKOFF_SECS = float(os.getenv("WRITE_BACKOFF_SECS", "0.5"))
+
+
+def chunked(items: list, size: int):
+    """Yield consecutive slices of at most ``size`` items."""
+    size = max(1, size)
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _sleep_before_retry(what: str, attempt: int, error):
+    delay = WRITE_BACKOFF_SECS * (2 ** attempt)
+    print(f"{what} failed ({error}); retrying in {delay:.1f}s")
+    time.sleep(delay)
+
+
+def with_retries(fn, what: str, retry_on=(Exception,)):
+    """Call ``fn()``, retrying ``retry_on`` errors with backoff."""
+    for attempt in range(WRITE_MAX_RETRIES + 1):
+        try:
+            return fn()
+        except retry_on as e:
+            if attempt == WRITE_MAX_RETRIES:
+                raise
+            _sleep_before_retry(what, attempt, e)
+
+
+def mongo_bulk_write(col, ops: list, what: str = "MongoDB bulk write") -> int:
+    """Unordered bulk_write of ``ops`` that re-sends only the operations
+    that failed. Returns the number of upserted + modified documents."""
+    written = 0
+    pending = list(ops)
+    for attempt in range(WRITE_MAX_RETRIES + 1):
+        try:
+            result = col.bulk_write(pending, ordered=False)
+            return written + result.upserted_count + result.modified_count
+        except BulkWriteError as e:
+            details = e.details
+            written += details.get("nUpserted", 0) + details.get("nModified", 0)
+            failed = [pending[error["index"]] for error in details.get("writeErrors", [])]
+            if not failed or attempt == WRITE_MAX_RETRIES:
+                raise
+            pending = failed
+            _sleep_before_retry(f"{what} ({len(failed)} operations)", attempt, e)
+        except (AutoReconnect, NetworkTimeout) as e:
+            if attempt == WRITE_MAX_RETRIES:
+                raise
+            _sleep_before_retry(what, attempt, e)
+    return written
+
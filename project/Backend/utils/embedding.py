@@ -1,21 +1,336 @@
 """
-Embedding utility – generates text embeddings using SentenceTransformers.
+Embedding utility – generates text embeddings with all-MiniLM-L6-v2.
 The model is loaded lazily on first call and cached for subsequent use.
+
+When MODEL_SERVER_URL is set the model runs in the model server sidecar
+(model_server.py) and this process only sends texts over HTTP; the
+server also owns the embedding cache. Otherwise EMBEDDING_BACKEND picks
+the in-process runtime:
+  torch  SentenceTransformers on PyTorch, fp32 (default)
+  onnx   ONNX Runtime on the exported model from the same Hugging Face
+         repo – EMBEDDING_ONNX_FILE selects the file, by default the
+         int8-quantised onnx/model_quint8_avx2.onnx. Needs onnxruntime and
+         tokenizers, and never imports torch.
+
+On load the ONNX model embeds a few probe sentences and compares them
+with the fp32 export (onnx/model.onnx, numerically the torch model); if
+any cosine similarity is below EMBEDDING_ONNX_MIN_COSINE the load fails
+rather than serving drifted vectors. If onnxruntime is missing or the
+files can't be fetched, the torch backend is used instead, with a
+message saying so.
+
+Embeddings are returned as L2-normalised float32 NumPy arrays. Texts
+that were embedded before are served from the on-disk cache in
+utils/embedding_cache.py instead of running the model again.
+
+Single-text calls from concurrent threads (resume uploads, request
+handlers) are queued and encoded together in micro-batches: a batch is
+flushed once it holds EMBED_MAX_BATCH texts or the oldest text has waited
+EMBED_MAX_WAIT_MS. Bulk callers (job ingest) use generate_embeddings()
+directly.
 """
 
-from sentence_transformers import SentenceTransformer
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from utils import model_client
+from utils.embedding_cache import (
+    EMBED_CACHE_PATH,
+    EMBED_CACHE_MAX_ENTRIES,
+    EMBED_CACHE_DTYPE,
+    EmbeddingCache,
+)
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+MODEL_REPO = f"sentence-transformers/{MODEL_NAME}"
+EMBEDDING_DIM = 384  # all-MiniLM-L6-v2 output size
+MAX_SEQ_LENGTH = 256  # same truncation as the SentenceTransformer config
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+EMBEDDING_ONNX_REFERENCE = "onnx/model.onnx"  # fp32 export, the parity reference
+EMBEDDING_ONNX_MIN_COSINE = float(os.getenv("EMBEDDING_ONNX_MIN_COSINE", "0.97"))
+EMBED_MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", "32"))
+EMBED_MAX_WAIT_MS = float(os.getenv("EMBED_MAX_WAIT_MS", "10"))
 
 _model = None
+_model_lock = threading.Lock()
+_cache = None
+_cache_lock = threading.Lock()
+
+
+# Parity probes: short and long, skill lists and prose, like our real inputs
+_PARITY_TEXTS = [
+    "Python developer",
+    "Senior backend engineer with Flask, MongoDB, Docker and Kubernetes experience.",
+    "skills: java, spring boot, sql, aws, react, typescript, git, ci/cd",
+    "We are looking for a data analyst to build dashboards, clean datasets and "
+    "present insights to stakeholders. Experience with Excel, Power BI and SQL "
+    "is required; Python is a plus. " * 4,
+]
+
+
+class _TorchModel:
+    model_id = f"{MODEL_NAME}|torch"
+
+    def __init__(self):
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(MODEL_NAME)
+        print("SentenceTransformer loaded")
+
+    def encode(self, texts: list[str], batch_size: int) -> np.ndarray:
+        return self._model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+
+
+class _OnnxModel:
+    model_id = f"{MODEL_NAME}|onnx|{EMBEDDING_ONNX_FILE}"
+
+    def __init__(self):
+        from huggingface_hub import hf_hub_download
+        from tokenizers import Tokenizer
+
+        self._tokenizer = Tokenizer.from_file(hf_hub_download(MODEL_REPO, "tokenizer.json"))
+        self._tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self._tokenizer.enable_padding()
+
+        self._session = self._load(EMBEDDING_ONNX_FILE)
+        if EMBEDDING_ONNX_FILE != EMBEDDING_ONNX_REFERENCE:
+            self._check_parity()
+        print(f"ONNX embedding model loaded ({EMBEDDING_ONNX_FILE})")
+
+    @staticmethod
+    def _load(filename: str):
+        import onnxruntime as ort
+        from huggingface_hub import hf_hub_download
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        return ort.InferenceSession(
+            hf_hub_download(MODEL_REPO, filename),
+            sess_options=options,
+            providers=["CPUExecutionProvider"],
+        )
+
+    def _check_parity(self):
+        """Fail the load if the ONNX vectors drift from the fp32 model."""
+        vectors = self.encode(_PARITY_TEXTS, len(_PARITY_TEXTS))
+        reference = self.encode(
+            _PARITY_TEXTS, len(_PARITY_TEXTS), session=self._load(EMBEDDING_ONNX_REFERENCE)
+        )
+        # Both sides are L2-normalised, so the row-wise dot product is the cosine
+        cosine = float((vectors * reference).sum(axis=1).min())
+        if cosine < EMBEDDING_ONNX_MIN_COSINE:
+            raise RuntimeError(
+                f"ONNX embedding parity check failed: {EMBEDDING_ONNX_FILE} vs "
+                f"{EMBEDDING_ONNX_REFERENCE} min cosine {cosine:.4f} < "
+                f"EMBEDDING_ONNX_MIN_COSINE={EMBEDDING_ONNX_MIN_COSINE}"
+            )
+        print(f"ONNX embedding parity OK (min cosine {cosine:.4f} vs fp32)")
+
+    def encode(self, texts: list[str], batch_size: int, session=None) -> np.ndarray:
+        session = session or self._session
+        input_names = {i.name for i in session.get_inputs()}
+        out = np.empty((len(texts), EMBEDDING_DIM), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            encodings = self._tokenizer.encode_batch(texts[start : start + batch_size])
+            input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+            if "token_type_ids" in input_names:
+                feeds["token_type_ids"] = np.zeros_like(input_ids)
+            token_embeddings = session.run(None, feeds)[0]
+
+            # Mean pooling over real tokens, as the SentenceTransformer does
+            mask = attention_mask[..., None].astype(np.float32)
+            summed = (token_embeddings * mask).sum(axis=1)
+            pooled = summed / np.clip(mask.sum(axis=1), 1e-9, None)
+            norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+            out[start : start + len(encodings)] = pooled / np.clip(norms, 1e-12, None)
+        return out
+
+
+class _RemoteModel:
+    @property
+    def model_id(self) -> str:
+        # Whatever the server loaded, after its own fallbacks
+        return model_client.embedding_model_id()
+
+    def encode(self, texts: list[str], batch_size: int) -> np.ndarray:
+        return model_client.embed(texts, batch_size)
+
+
+_BACKENDS = {
+    "torch": _TorchModel,
+    "onnx": _OnnxModel,
+}
 
 
 def _get_model():
     global _model
     if _model is None:
-        _model = SentenceTransformer("all-MiniLM-L6-v2")
-        print("SentenceTransformer loaded")
+        with _model_lock:
+            if _model is None:
+                if model_client.model_server_enabled():
+                    _model = _RemoteModel()
+                    return _model
+                if EMBEDDING_BACKEND not in _BACKENDS:
+                    raise RuntimeError(
+                        f"Unknown EMBEDDING_BACKEND {EMBEDDING_BACKEND!r} "
+                        f"(expected one of {', '.join(_BACKENDS)})"
+                    )
+                try:
+                    _model = _BACKENDS[EMBEDDING_BACKEND]()
+                except (ImportError, OSError) as e:
+                    if EMBEDDING_BACKEND != "onnx":
+                        raise
+                    # Missing onnxruntime/tokenizers, or the files couldn't be
+                    # fetched; a failed parity check is a RuntimeError and
+                    # is not caught here
+                    print(
+                        f"ONNX embedding backend unavailable ({type(e).__name__}: {e}); "
+                        f"falling back to the torch backend"
+                    )
+                    _model = _TorchModel()
     return _model
 
 
-def generate_embedding(text: str) -> list[float]:
+def _get_cache() -> EmbeddingCache | None:
+    global _cache
+    if model_client.model_server_enabled():
+        return None  # the model server checks its own cache
+    if _cache is None and EMBED_CACHE_PATH:
+        # Keyed by the backend actually loaded, after any fallback
+        model_id = _get_model().model_id
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = EmbeddingCache(
+                        EMBED_CACHE_PATH, model_id, EMBED_CACHE_MAX_ENTRIES, EMBED_CACHE_DTYPE
+                    )
+                except Exception as e:
+                    print(f"Embedding cache unavailable: {e}")
+                    return None
+    return _cache
+
+
+def embedding_model_id() -> str:
+    """Identity (name and backend) of the model that actually produces
+    this process's embeddings – the model server's when one is used."""
+    return _get_model().model_id
+
+
+def embedding_cache_stats() -> dict:
+    """Hit/miss counters for this process plus the cache's entry count."""
+    cache = _get_cache()
+    if cache is None:
+        return {"hits": 0, "misses": 0, "entries": 0}
+    return cache.stats()
+
+
+def _encode(texts: list[str], batch_size: int) -> np.ndarray:
+    vectors = _get_model().encode(list(texts), batch_size)
+    vectors = np.asarray(vectors, dtype=np.float32)
+
+    cache = _get_cache()
+    if cache is not None:
+        # The cache is an optimisation – never fail an embedding because of it
+        try:
+            cache.put_many(texts, vectors)
+        except Exception as e:
+            print(f"Embedding cache store failed: {e}")
+    return vectors
+
+
+def _cache_lookup(texts: list[str]) -> list[np.ndarray | None]:
+    cache = _get_cache()
+    if cache is not None:
+        try:
+            return cache.get_many(texts)
+        except Exception as e:
+            print(f"Embedding cache lookup failed: {e}")
+    return [None] * len(texts)
+
+
+def generate_embeddings(texts: list[str], batch_size: int = EMBED_MAX_BATCH) -> np.ndarray:
+    """Embed many texts at once. Returns a (len(texts), 384) float32 array."""
+    texts = list(texts)
+    if not texts:
+        return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+
+    out = np.empty((len(texts), EMBEDDING_DIM), dtype=np.float32)
+    missing = []
+    for i, vector in enumerate(_cache_lookup(texts)):
+        if vector is None:
+            missing.append(i)
+        else:
+            out[i] = vector
+    if missing:
+        out[missing] = _encode([texts[i] for i in missing], batch_size)
+    return out
+
+
+def generate_embedding(text: str) -> np.ndarray:
     """Generate a 384-dimensional embedding vector from the given text."""
-    return _get_model().encode(text).tolist()
+    (cached,) = _cache_lookup([text])
+    if cached is not None:
+        return cached
+    return _batcher.submit(text).result()
+
+
+class _MicroBatcher:
+    """Collects single-text requests from many threads into batches."""
+
+    def __init__(self, max_batch: int, max_wait_s: float):
+        self.max_batch = max_batch
+        self.max_wait_s = max_wait_s
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, text: str) -> Future:
+        future = Future()
+        self._queue.put((text, future))
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(
+                        target=self._loop, name="embedding-batcher", daemon=True
+                    )
+                    self._thread.start()
+        return future
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait_s
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                vectors = _encode(texts, self.max_batch)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), vector in zip(batch, vectors):
+                future.set_result(vector)
+
+
+_batcher = _MicroBatcher(EMBED_MAX_BATCH, EMBED_MAX_WAIT_MS / 1000)
@@ -0,0 +1,137 @@
+"""
+Embedding cache – persistent text -> vector store in SQLite.
+
+Job descriptions come back on every ingest run and resumes are often
+re-uploaded unchanged, so utils/embedding.py checks this cache before
+running the model. Keys are a SHA-256 of the model identity and the
+whitespace-normalised text; vectors are stored as raw float16 (default)
+or float32 blobs. Once EMBED_CACHE_MAX_ENTRIES is exceeded the least
+recently used entries are evicted.
+
+The database is a single file (EMBED_CACHE_PATH) in WAL mode, so every
+worker process on the box shares it. Set EMBED_CACHE_PATH to an empty
+string to disable the cache.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+EMBED_CACHE_PATH = os.getenv(
+    "EMBED_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "embedding_cache.sqlite3"),
+)
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "50000"))
+EMBED_CACHE_DTYPE = os.getenv("EMBED_CACHE_DTYPE", "float16")
+EVICT_EVERY = 256  # inserts between size checks
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class EmbeddingCache:
+    def __init__(self, path: str, namespace: str, max_entries: int, dtype: str):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.dtype = np.dtype(dtype)
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._inserts_since_evict = 0
+
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key BLOB PRIMARY KEY,"
+            " dtype TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)")
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def key(self, text: str) -> bytes:
+        return hashlib.sha256(f"{self.namespace}|{normalize_text(text)}".encode()).digest()
+
+    def get_many(self, texts: list[str]) -> list[np.ndarray | None]:
+        """Look up each text; returns a float32 vector or None per text."""
+        keys = [self.key(t) for t in texts]
+        conn = self._conn()
+        found = {}
+        for start in range(0, len(keys), 500):  # SQLite variable limit
+            chunk = keys[start : start + 500]
+            rows = conn.execute(
+                f"SELECT key, dtype, vector FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})",
+                chunk,
+            )
+            for key, dtype, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=dtype).astype(np.float32)
+
+        if found:
+            now = time.time()
+            conn.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(now, key) for key in found],
+            )
+            conn.commit()
+
+        results = [found.get(key) for key in keys]
+        hits = sum(r is not None for r in results)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(results) - hits
+        return results
+
+    def put_many(self, texts: list[str], vectors: np.ndarray):
+        now = time.time()
+        conn = self._conn()
+        conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (key, dtype, vector, last_used) VALUES (?, ?, ?, ?)",
+            [
+                (self.key(t), self.dtype.name, np.asarray(v, dtype=self.dtype).tobytes(), now)
+                for t, v in zip(texts, vectors)
+            ],
+        )
+        conn.commit()
+
+        with self._lock:
+            self._inserts_since_evict += len(texts)
+            if self._inserts_since_evict < EVICT_EVERY:
+                return
+            self._inserts_since_evict = 0
+        self._evict()
+
+    def _evict(self):
+        conn = self._conn()
+        (count,) = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            conn.execute(
+                "DELETE FROM embeddings WHERE key IN"
+                " (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            conn.commit()
+
+    def stats(self) -> dict:
+        (entries,) = self._conn().execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
@@ -0,0 +1,180 @@
+"""
+Ingest pipeline – stages connected by bounded queues.
+
+fetch_jobs (utils/job_fetcher.py) runs as
+
+    JSearch pages -> dedup/diff -> annotate -> embed -> store
+
+Each stage has its own worker threads and a bounded input queue
+(INGEST_QUEUE_SIZE items). A full queue blocks the stage feeding it, so
+a slow stage throttles everything upstream – down to the HTTP fetcher –
+and at most a few batches are in memory at once, whatever MAX_JOBS is.
+While spaCy or MiniLM is busy, the next pages are already downloading.
+
+A stage function takes one item and returns the item for the next stage,
+or None to drop it. An optional ``flush`` runs once after the stage's
+input is exhausted and may return a final item (the dedup stage uses it
+to emit its last partial batch).
+
+Per stage the pipeline records items and jobs processed, busy time,
+time spent blocked on the next queue and input queue depth;
+Pipeline.report() logs them at the end of a run so the bottleneck stage
+is visible.
+"""
+
+import os
+import queue
+import threading
+import time
+
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "4"))
+
+_DONE = object()
+
+
+class Stage:
+    def __init__(self, name: str, fn, workers: int = 1, flush=None,
+                 queue_size: int = INGEST_QUEUE_SIZE):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.flush = flush
+        self.queue = queue.Queue(maxsize=max(1, queue_size))
+
+        # Metrics
+        self.items = 0
+        self.jobs = 0
+        self.busy_s = 0.0
+        self.blocked_s = 0.0  # waiting for room in the next stage's queue
+        self.max_depth = 0
+        self._depth_sum = 0
+        self._depth_samples = 0
+        self._lock = threading.Lock()
+        self._running = self.workers
+
+    def _sample_depth(self):
+        depth = self.queue.qsize()
+        with self._lock:
+            self.max_depth = max(self.max_depth, depth)
+            self._depth_sum += depth
+            self._depth_samples += 1
+
+    @property
+    def mean_depth(self) -> float:
+        return self._depth_sum / self._depth_samples if self._depth_samples else 0.0
+
+
+class Pipeline:
+    def __init__(self, stages: list[Stage]):
+        self.stages = stages
+        self.error: BaseException | None = None
+        self._failed = threading.Event()
+        self._threads = []
+        self._started = time.perf_counter()
+        self.input_blocked_s = 0.0
+
+        for index, stage in enumerate(stages):
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._work, args=(index,), name=f"ingest-{stage.name}-{n}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    # ── Feeding ─────────────────────────────────────────────────────────
+
+    def put(self, item):
+        """Hand an item to the first stage; blocks while its queue is full."""
+        if self._failed.is_set():
+            raise RuntimeError(f"Ingest pipeline failed: {self.error}") from self.error
+        self.input_blocked_s += self._put(0, item)
+
+    def close(self):
+        """Signal end of input, wait for every stage to drain, and re-raise
+        the first stage error."""
+        first = self.stages[0]
+        for _ in range(first.workers):
+            self._put(0, _DONE)
+        for thread in self._threads:
+            thread.join()
+        self.wall_s = time.perf_counter() - self._started
+        if self.error is not None:
+            raise RuntimeError(f"Ingest pipeline failed: {self.error}") from self.error
+
+    def _put(self, index: int, item) -> float:
+        stage = self.stages[index]
+        started = time.perf_counter()
+        stage.queue.put(item)
+        if item is not _DONE:
+            stage._sample_depth()
+        return time.perf_counter() - started
+
+    # ── Workers ─────────────────────────────────────────────────────────
+
+    def _forward(self, index: int, stage: Stage, item):
+        if item is None or index + 1 >= len(self.stages):
+            return
+        blocked = self._put(index + 1, item)
+        with stage._lock:
+            stage.blocked_s += blocked
+
+    def _work(self, index: int):
+        stage = self.stages[index]
+        while True:
+            item = stage.queue.get()
+            if item is _DONE:
+                break
+            if self._failed.is_set():
+                continue  # drain so upstream never blocks forever
+            started = time.perf_counter()
+            try:
+                result = stage.fn(item)
+            except Exception as e:
+                self._fail(stage, e)
+                continue
+            with stage._lock:
+                stage.items += 1
+                stage.jobs += len(item) if hasattr(item, "__len__") else 1
+                stage.busy_s += time.perf_counter() - started
+            self._forward(index, stage, result)
+
+        with stage._lock:
+            stage._running -= 1
+            last = stage._running == 0
+        if not last:
+            return
+
+        # Last worker out: flush, then shut the next stage down
+        if stage.flush is not None and not self._failed.is_set():
+            try:
+                self._forward(index, stage, stage.flush())
+            except Exception as e:
+                self._fail(stage, e)
+        if index + 1 < len(self.stages):
+            for _ in range(self.stages[index + 1].workers):
+                self._put(index + 1, _DONE)
+
+    def _fail(self, stage: Stage, error: BaseException):
+        if self.error is None:
+            self.error = error
+            print(f"Ingest stage '{stage.name}' failed: {error}")
+        self._failed.set()
+
+    # ── Metrics ─────────────────────────────────────────────────────────
+
+    def report(self):
+        wall = getattr(self, "wall_s", time.perf_counter() - self._started)
+        print(f"Ingest pipeline: {wall:.1f}s wall, input blocked {self.input_blocked_s:.1f}s")
+        print(
+            f"  {'stage':<10}{'workers':>8}{'items':>7}{'jobs':>7}{'busy s':>8}"
+            f"{'jobs/s':>8}{'blocked s':>10}{'queue avg/max':>15}"
+        )
+        bottleneck = max(self.stages, key=lambda s: s.busy_s / s.workers)
+        for stage in self.stages:
+            rate = stage.jobs / stage.busy_s if stage.busy_s else 0.0
+            flag = "  <- busiest" if stage is bottleneck and stage.busy_s else ""
+            print(
+                f"  {stage.name:<10}{stage.workers:>8}{stage.items:>7}{stage.jobs:>7}"
+                f"{stage.busy_s:>8.2f}{rate:>8.0f}{stage.blocked_s:>10.2f}"
+                f"{stage.mean_depth:>9.1f}/{stage.max_depth:<5}{flag}"
+            )
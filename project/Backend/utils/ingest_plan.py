@@ -0,0 +1,129 @@
+"""
+Ingest plan – which countries and queries fetch_jobs pulls from JSearch.
+
+JOB_INGEST_PLAN holds a JSON list (inline, or the path of a .json file)
+of entries, fetched in order:
+
+    [
+      {"country": "in", "queries": ["software engineer fresher", ...], "pages": 5},
+      {"country": "us", "queries": ["junior data analyst"], "pages": 10,
+       "max_jobs": 5000, "date_posted": "week"},
+      {"country": "fr", "names": ["france", "république française"]}
+    ]
+
+``queries`` defaults to DEFAULT_QUERIES, ``pages`` to 5, ``date_posted``
+to "month"; ``max_jobs`` caps a single entry. JOB_MAX_JOBS caps the whole
+run. Without a plan, ingest fetches DEFAULT_QUERIES for India, capped at
+250 jobs, as it always has.
+
+``country`` is a two-letter ISO code. ``names`` adds country names users
+may type in their profile location, on top of COUNTRY_NAMES.
+
+Jobs keep JSearch's country code (``IN``, ``US``, ...) in MongoDB and in
+the Qdrant payload, where it is indexed, so /api/jobs can restrict a
+search to the user's country (country_for_location). The countries a
+search can be restricted to are the ones in the active plan
+(ingest_countries).
+"""
+
+import json
+import os
+
+JOB_INGEST_PLAN = os.getenv("JOB_INGEST_PLAN", "")
+JOB_MAX_JOBS = int(os.getenv("JOB_MAX_JOBS", "250"))
+
+DEFAULT_QUERIES = [
+    "software engineer fresher",
+    "junior software engineer",
+    "entry level software engineer",
+    "graduate software engineer",
+    "associate software engineer",
+]
+DEFAULT_PAGES = 5
+
+# Common names a user might type as the last part of their profile
+# location; plan entries add more with "names". Any two-letter code is
+# accepted as is.
+COUNTRY_NAMES = {
+    "IN": ("india", "bharat"),
+    "US": ("united states", "united states of america", "usa", "america"),
+    "GB": ("united kingdom", "uk", "england", "scotland", "wales", "great britain"),
+    "CA": ("canada",),
+    "AU": ("australia",),
+    "DE": ("germany", "deutschland"),
+    "SG": ("singapore",),
+    "AE": ("united arab emirates", "uae", "dubai"),
+    "IE": ("ireland",),
+    "NL": ("netherlands", "holland"),
+}
+_NAME_TO_CODE = {
+    name: code for code, names in COUNTRY_NAMES.items() for name in (*names, code.lower())
+}
+
+
+def plan_entry(country: str, queries: list[str] | None = None, pages: int = DEFAULT_PAGES,
+               date_posted: str = "month", max_jobs: int | None = None,
+               names: list[str] | None = None) -> dict:
+    if not country or len(country.strip()) != 2 or not country.strip().isalpha():
+        raise ValueError(f"Ingest plan entry needs a two-letter country code, got {country!r}")
+    return {
+        "country": country.strip().lower(),
+        "names": [name.strip().lower() for name in names or ()],
+        "queries": list(queries or DEFAULT_QUERIES),
+        "pages": int(pages),
+        "date_posted": date_posted,
+        "max_jobs": int(max_jobs) if max_jobs else JOB_MAX_JOBS,
+    }
+
+
+def load_ingest_plan(raw: str = JOB_INGEST_PLAN) -> list[dict]:
+    """Parse JOB_INGEST_PLAN into normalised entries."""
+    if not raw.strip():
+        return [plan_entry("in")]
+    if not raw.lstrip().startswith("["):
+        with open(raw) as f:
+            raw = f.read()
+    entries = json.loads(raw)
+    if not isinstance(entries, list) or not entries:
+        raise ValueError("JOB_INGEST_PLAN must be a non-empty JSON list")
+    return [plan_entry(**entry) for entry in entries]
+
+
+_plan: list[dict] | None = None
+
+
+def active_ingest_plan() -> list[dict]:
+    """JOB_INGEST_PLAN, parsed once per process."""
+    global _plan
+    if _plan is None:
+        _plan = load_ingest_plan()
+    return _plan
+
+
+def ingest_countries() -> set[str]:
+    """Upper-case codes of the countries the active plan fetches."""
+    return {entry["country"].upper() for entry in active_ingest_plan()}
+
+
+def normalize_country(country: str | None) -> str | None:
+    """JSearch-style upper-case code for a two-letter code or a country
+    name (COUNTRY_NAMES or the plan's ``names``), or None."""
+    if not country:
+        return None
+    value = country.strip().lower()
+    code = _NAME_TO_CODE.get(value)
+    if code is None:
+        for entry in active_ingest_plan():
+            if value in entry["names"]:
+                return entry["country"].upper()
+    if code is None and len(value) == 2 and value.isalpha():
+        code = value.upper()
+    return code
+
+
+def country_for_location(location: str | None) -> str | None:
+    """Best-effort country code from a free-text location like
+    "Pune, Maharashtra, India". None when it can't be told."""
+    if not location:
+        return None
+    return normalize_country(location.split(",")[-1])
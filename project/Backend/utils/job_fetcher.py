@@ -3,156 +3,420 @@ Job Fetcher – pulls job listings from JSearch API,
 generates embeddings, stores vectors in Qdrant
 and metadata in MongoDB.
 
-Each run flushes all old jobs and fetches fresh ones,
-capped at MAX_JOBS (250).
+Each run fetches the postings of the ingest plan (utils/ingest_plan.py –
+countries x queries x pages, capped at MAX_JOBS) and syncs them
+incrementally: postings are diffed against MongoDB by job_id and content
+hash, and only new or changed ones are annotated (batched NLP passes,
+utils/nlp.annotate_batch), embedded and upserted. Unchanged postings
+just get their last_seen_at bumped. Postings that have been missing from
+the feed for JOB_UNSEEN_TTL_DAYS, or were posted more than
+JOB_MAX_AGE_DAYS ago, are expired from both stores. Nothing is flushed,
+so /api/jobs keeps serving the previous set throughout a run.
+
+With JOB_SYNC_MODE=bluegreen every run instead rebuilds the whole set
+into a new job version (utils/job_versions.py) – fresh MongoDB and
+Qdrant collections – validates it (at least JOB_MIN_COUNT jobs, matching
+counts in both stores) and only then switches readers over. The old
+version is kept for rollback; a build that fails validation is dropped
+and the live version is left untouched.
+
+Either way the run is a streaming pipeline (utils/ingest_pipeline.py):
+
+    JSearch pages -> dedup/diff -> annotate -> embed -> store
+
+with bounded queues between the stages, INGEST_BATCH_SIZE jobs per batch
+and INGEST_*_WORKERS threads per stage. Per-stage metrics are logged at
+the end of the run. If the caller's ``abort`` event is set (the run lost
+its lease, utils/run_lock.py) the run raises FetchAborted at the next
+page or stage, and never expires, switches or invalidates anything.
 """
 
 import os
-import requests
-from database import get_db
-from utils.embedding import generate_embedding
-from utils.qdrant_store import upsert_job_vector, flush_all_jobs
-from utils.nlp import get_skill_extractor
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from models.job import (
+    count_jobs,
+    drop_job_version,
+    ensure_job_indexes,
+    expire_jobs,
+    get_job_hashes,
+    iter_job_listings,
+    job_content_hash,
+    listing_payload,
+    touch_jobs,
+    upsert_jobs,
+)
+from utils.embedding import generate_embeddings, embedding_cache_stats
+from utils.qdrant_store import (
+    VECTOR_BACKEND,
+    upsert_job_vectors,
+    delete_job_vectors,
+    rebuild_job_index,
+    set_job_payloads,
+    create_job_collection,
+    count_job_vectors,
+    point_jobs_alias,
+    drop_job_collection,
+)
+from utils.job_versions import (
+    active_job_version,
+    activate_job_version,
+    mark_job_set_changed,
+    new_job_version,
+    rollback_job_version,
+)
+from utils.ingest_pipeline import Pipeline, Stage
+from utils.ingest_plan import JOB_MAX_JOBS, load_ingest_plan, plan_entry
+from utils.jsearch_client import fetch_search_pages
+from utils.nlp import skills_by_id
+from utils.match_cache import invalidate_all
+from utils.skill_index import refresh_skill_index
 
 JSEARCH_API_KEY = os.getenv("JSEARCH_API_KEY")
-JSEARCH_URL = "https://jsearch.p.rapidapi.com/search"
 
-COLLECTION = "jobs"
-MAX_JOBS = 250
+MAX_JOBS = JOB_MAX_JOBS
 
+# Expiry: days a posting may be absent from the feed, and maximum age
+JOB_UNSEEN_TTL_DAYS = int(os.getenv("JOB_UNSEEN_TTL_DAYS", "3"))
+JOB_MAX_AGE_DAYS = int(os.getenv("JOB_MAX_AGE_DAYS", "30"))
 
-def _collection():
-    return get_db()[COLLECTION]
+# incremental | bluegreen
+JOB_SYNC_MODE = os.getenv("JOB_SYNC_MODE", "incremental").lower()
+# A blue/green build with fewer jobs than this is never switched live
+JOB_MIN_COUNT = int(os.getenv("JOB_MIN_COUNT", "50"))
 
+# Pipeline shape
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+INGEST_ANNOTATE_WORKERS = int(os.getenv("INGEST_ANNOTATE_WORKERS", "1"))
+INGEST_EMBED_WORKERS = int(os.getenv("INGEST_EMBED_WORKERS", "1"))
+INGEST_STORE_WORKERS = int(os.getenv("INGEST_STORE_WORKERS", "2"))
 
-def fetch_jobs(country="in"):
 
-    if not JSEARCH_API_KEY:
-        raise RuntimeError("JSEARCH_API_KEY missing")
-
-    col = _collection()
-    skill_extractor = get_skill_extractor()
-
-    # ── Flush old data from both stores ──────────────────────────────────
-    col.delete_many({})              # clear MongoDB jobs collection
-    print("Flushed MongoDB 'jobs' collection")
-    flush_all_jobs()                 # clear Qdrant jobs collection
-
-    FRESHER_QUERIES = [
-        "software engineer fresher",
-        "junior software engineer",
-        "entry level software engineer",
-        "graduate software engineer",
-        "associate software engineer",
-    ]
-
-    processed_job_ids = set()
-    stored_count = 0
+class FetchAborted(RuntimeError):
+    """The run was told to stop (its lease was lost)."""
 
-    headers = {
-        "X-RapidAPI-Key": JSEARCH_API_KEY,
-        "X-RapidAPI-Host": "jsearch.p.rapidapi.com",
-    }
-
-    for query in FRESHER_QUERIES:
-
-        if stored_count >= MAX_JOBS:
-            break
 
-        for page in range(1, 6):
+def _check(abort: threading.Event | None):
+    if abort is not None and abort.is_set():
+        raise FetchAborted("job fetch aborted - lock lost (another process may have started one)")
 
-            if stored_count >= MAX_JOBS:
-                break
 
-            params = {
-                "query": query,
-                "page": str(page),
-                "num_pages": "1",
-                "country": country,
-                "date_posted": "month",
-            }
+def fetch_jobs(country: str | None = None, mode: str = JOB_SYNC_MODE,
+               abort: threading.Event | None = None) -> dict:
+    """Run the ingest plan, or just the default queries for ``country``.
+    Returns the run's counts (recorded in job_runs by utils/scheduler.py).
+    Raises FetchAborted as soon as ``abort`` is set.
 
-            response = requests.get(
-                JSEARCH_URL,
-                headers=headers,
-                params=params,
-                timeout=60,
-            )
-
-            if response.status_code != 200:
-                print(response.text)
-                continue
+    Callers other than the CLI should go through
+    utils.scheduler.run_job_fetch, which holds the single-runner lock."""
 
-            jobs = response.json().get("data", [])
+    if not JSEARCH_API_KEY:
+        raise RuntimeError("JSEARCH_API_KEY missing")
 
-            if not jobs:
-                continue
+    plan = [plan_entry(country)] if country else load_ingest_plan()
+    cache_before = embedding_cache_stats()
+    if mode == "bluegreen":
+        counts = _rebuild_blue_green(plan, abort)
+    else:
+        counts = _sync_incremental(plan, abort)
+
+    cache_after = embedding_cache_stats()
+    print(
+        f"Embedding cache: {cache_after['hits'] - cache_before['hits']} hits, "
+        f"{cache_after['misses'] - cache_before['misses']} misses "
+        f"({cache_after['entries']} entries)"
+    )
+    return counts
+
+
+def _to_doc(job: dict) -> dict:
+    """A JSearch posting as a jobs-collection document."""
+    return {
+        "job_id": job.get("job_id"),
+        "title": job.get("job_title"),
+        "company": job.get("employer_name"),
+        "location": job.get("job_city"),
+        "country": (job.get("job_country") or "").upper() or None,
+        "description": job.get("job_description", ""),
+        "apply_link": job.get("job_apply_link"),
+        "employment_type": job.get("job_employment_type"),
+        "posted_at": job.get("job_posted_at_datetime_utc"),
+    }
 
-            for job in jobs:
 
-                if stored_count >= MAX_JOBS:
+class _Batch:
+    """Jobs travelling through the pipeline together."""
+
+    def __init__(self, docs: list[dict], unchanged_ids: list[str] = ()):
+        self.docs = docs                  # to annotate, embed and upsert
+        self.unchanged_ids = list(unchanged_ids)  # only last_seen_at is bumped
+        self.with_text = []
+        self.embeddings = None
+
+    def __len__(self):
+        return len(self.docs) + len(self.unchanged_ids)
+
+
+class _IngestRun:
+    """State and stage functions of one ingest run into ``version``."""
+
+    def __init__(self, version: str, diff: bool, abort: threading.Event | None = None):
+        self.version = version
+        self.diff = diff  # False: every posting is (re)written
+        self.abort = abort
+        self.seen_at = datetime.now(timezone.utc)
+        self.seen_ids = set()
+        self.buffer = []
+        self.new = self.changed = self.unchanged = 0
+        self.with_text = 0
+        self.written = 0
+        self.qdrant_s = self.mongo_s = 0.0
+        self._lock = threading.Lock()
+
+    def run(self, plan: list[dict]):
+        pipeline = Pipeline([
+            Stage("dedup", self.dedup, flush=self.flush),
+            Stage("annotate", self.annotate, INGEST_ANNOTATE_WORKERS),
+            Stage("embed", self.embed, INGEST_EMBED_WORKERS),
+            Stage("store", self.store, INGEST_STORE_WORKERS),
+        ])
+        try:
+            # Postings handed to the pipeline so far; dedup runs behind on
+            # its own thread, so self.fetched can't size the next request
+            queued = set()
+
+            def on_page(postings: list[dict]):
+                _check(self.abort)
+                queued.update(job.get("job_id") for job in postings if job.get("job_id"))
+                pipeline.put(postings)
+
+            for entry in plan:
+                _check(self.abort)
+                # Only what is left of the run's budget (dedup still caps
+                # the run at exactly MAX_JOBS)
+                remaining = MAX_JOBS - len(queued)
+                if remaining <= 0:
                     break
+                _, stats = fetch_search_pages(
+                    entry["queries"],
+                    pages=entry["pages"],
+                    params={"country": entry["country"], "date_posted": entry["date_posted"]},
+                    max_jobs=min(entry["max_jobs"], remaining),
+                    on_page=on_page,
+                )
+                print(f"JSearch {entry['country']}: {stats}")
+        finally:
+            try:
+                pipeline.close()
+            finally:
+                pipeline.report()
+                print(
+                    f"Writes: {self.with_text} vectors in {self.qdrant_s:.2f}s "
+                    f"({_rate(self.with_text, self.qdrant_s)}/s), "
+                    f"{self.written} jobs in {self.mongo_s:.2f}s "
+                    f"({_rate(self.written, self.mongo_s)}/s)"
+                )
 
-                job_id = job.get("job_id")
-
-                if not job_id:
-                    continue
+    @property
+    def fetched(self) -> int:
+        return len(self.seen_ids)
 
-                # Dedup within this run
-                if job_id in processed_job_ids:
-                    continue
+    # ── Stages ──────────────────────────────────────────────────────────
 
-                processed_job_ids.add(job_id)
+    def dedup(self, postings: list[dict]) -> _Batch | None:
+        _check(self.abort)
+        for job in postings:
+            job_id = job.get("job_id")
+            if not job_id or job_id in self.seen_ids or self.fetched >= MAX_JOBS:
+                continue
+            self.seen_ids.add(job_id)
+            doc = _to_doc(job)
+            doc["content_hash"] = job_content_hash(doc)
+            self.buffer.append(doc)
+        if len(self.buffer) < INGEST_BATCH_SIZE:
+            return None
+        return self.flush()
+
+    def flush(self) -> _Batch | None:
+        docs, self.buffer = self.buffer, []
+        if not docs:
+            return None
+        if not self.diff:
+            self.new += len(docs)
+            return _Batch(docs)
+
+        stored = get_job_hashes([doc["job_id"] for doc in docs], self.version)
+        changed = [doc for doc in docs if stored.get(doc["job_id"]) != doc["content_hash"]]
+        unchanged = [doc["job_id"] for doc in docs if stored.get(doc["job_id"]) == doc["content_hash"]]
+        new = sum(doc["job_id"] not in stored for doc in changed)
+        self.new += new
+        self.changed += len(changed) - new
+        self.unchanged += len(unchanged)
+        return _Batch(changed, unchanged)
+
+    def annotate(self, batch: _Batch) -> _Batch:
+        _check(self.abort)
+        try:
+            job_skills = skills_by_id(
+                {doc["job_id"]: doc["description"] for doc in batch.docs}, site="ingest"
+            )
+        except Exception as e:
+            # Stored without skills; the skill backfill picks them up later
+            print(f"Error extracting job skills: {e}")
+            job_skills = {}
+        for doc in batch.docs:
+            if doc["job_id"] in job_skills:
+                doc["skills"] = job_skills[doc["job_id"]]
+        return batch
+
+    def embed(self, batch: _Batch) -> _Batch:
+        _check(self.abort)
+        batch.with_text = [doc for doc in batch.docs if doc["description"]]
+        batch.embeddings = generate_embeddings([doc["description"] for doc in batch.with_text])
+        return batch
+
+    def store(self, batch: _Batch) -> None:
+        _check(self.abort)
+        # Vectors first: a job visible in MongoDB always has its vector
+        started = time.perf_counter()
+        upsert_job_vectors(
+            [
+                (doc["job_id"], embedding, listing_payload(doc))
+                for doc, embedding in zip(batch.with_text, batch.embeddings)
+            ],
+            version=self.version,
+        )
+        stored = time.perf_counter()
+        upsert_jobs(batch.docs, seen_at=self.seen_at, version=self.version)
+        touch_jobs(batch.unchanged_ids, seen_at=self.seen_at, version=self.version)
+        with self._lock:
+            self.with_text += len(batch.with_text)
+            self.written += len(batch)
+            self.qdrant_s += stored - started
+            self.mongo_s += time.perf_counter() - stored
+        return None
+
+
+def _rate(count: int, seconds: float) -> str:
+    return f"{count / seconds:.0f}" if seconds > 0 else "-"
+
+
+def _jobs_changed(version: str):
+    # Swap the in-process search index over to the new job set in one step
+    if VECTOR_BACKEND == "local":
+        rebuild_job_index(version=version)
+
+    # Cached per-user rankings and skill IDs point at the old job set.
+    # The new revision makes other processes drop their rankings too.
+    mark_job_set_changed()
+    invalidate_all()
+    refresh_skill_index()
+
+
+def _sync_incremental(plan: list[dict], abort: threading.Event | None = None) -> dict:
+    """Upsert new/changed postings into the live version, expire stale ones."""
+    run = _IngestRun(active_job_version(), diff=True, abort=abort)
+    run.run(plan)
+    _check(abort)
+
+    # ── Expire postings that left the feed or aged out ───────────────────
+    expired_ids = []
+    if run.fetched:
+        # An empty fetch (API outage) must not age out the whole set
+        posted_before = (run.seen_at - timedelta(days=JOB_MAX_AGE_DAYS)).strftime(
+            "%Y-%m-%dT%H:%M:%S"
+        )
+        expired_ids = expire_jobs(
+            unseen_since=run.seen_at - timedelta(days=JOB_UNSEEN_TTL_DAYS),
+            posted_before=posted_before,
+            version=run.version,
+        )
+        delete_job_vectors(expired_ids, version=run.version)
+
+    if run.new or run.changed or expired_ids:
+        _jobs_changed(run.version)
+
+    print(
+        f"Job sync complete - {run.fetched} fetched (max {MAX_JOBS}): "
+        f"{run.new} new, {run.changed} changed, "
+        f"{run.unchanged} unchanged, {len(expired_ids)} expired"
+    )
+    return {
+        "fetched": run.fetched,
+        "new": run.new,
+        "changed": run.changed,
+        "unchanged": run.unchanged,
+        "expired": len(expired_ids),
+    }
 
-                description = job.get(
-                    "job_description", ""
-                )
 
-                job_skills_set = set()
-                if skill_extractor and description:
-                    try:
-                        annotations = skill_extractor.annotate(description)
-                        full_matches = annotations.get("results", {}).get("full_matches", [])
-                        ngram_matches = annotations.get("results", {}).get("ngram_scored", [])
-                        job_skills_set = set(
-                            [s["doc_node_value"] for s in full_matches] +
-                            [s["doc_node_value"] for s in ngram_matches]
-                        )
-                    except Exception as e:
-                        print(f"Error extracting skills for job {job_id}: {e}")
-
-                # -------- MongoDB ----------
-                col.insert_one({
-                    "job_id": job_id,
-                    "title": job.get("job_title"),
-                    "company": job.get("employer_name"),
-                    "location": job.get("job_city"),
-                    "country": job.get("job_country"),
-                    "description": description,
-                    "apply_link": job.get(
-                        "job_apply_link"
-                    ),
-                    "employment_type":
-                        job.get("job_employment_type"),
-                    "posted_at":
-                        job.get(
-                            "job_posted_at_datetime_utc"
-                        ),
-                    "skills": list(job_skills_set),
-                })
-
-                # -------- Qdrant ----------
-                if description:
-                    embedding = generate_embedding(
-                        description
-                    )
-
-                    upsert_job_vector(
-                        job_id,
-                        embedding,
-                        title=job.get("job_title"),
-                    )
-
-                stored_count += 1
-
-    print(f"Job fetch complete - {stored_count} jobs stored (max {MAX_JOBS})")
+def _rebuild_blue_green(plan: list[dict], abort: threading.Event | None = None) -> dict:
+    """Build a complete new version next to the live one and switch to it.
+    Raises if the build is rejected (after dropping it)."""
+    version = new_job_version()
+    print(f"Building job version {version}")
+
+    # Outside the try: if the name is taken, there is nothing of ours to drop
+    create_job_collection(version)
+    try:
+        ensure_job_indexes(version)
+        # Unchanged descriptions are embedding-cache hits
+        run = _IngestRun(version, diff=False, abort=abort)
+        run.run(plan)
+
+        # ── Validate before anyone can see it ────────────────────────────
+        stored, vectors = count_jobs(version), count_job_vectors(version)
+        problems = []
+        if stored < JOB_MIN_COUNT:
+            problems.append(f"{stored} jobs < JOB_MIN_COUNT {JOB_MIN_COUNT}")
+        if stored != run.fetched:
+            problems.append(f"{stored} jobs stored, {run.fetched} fetched")
+        if vectors != run.with_text:
+            problems.append(f"{vectors} vectors for {run.with_text} descriptions")
+        if problems:
+            raise ValueError("; ".join(problems))
+        _check(abort)
+    except Exception as e:
+        print(f"Job version {version} rejected, keeping {active_job_version()}: {e}")
+        drop_job_version(version)
+        drop_job_collection(version)
+        raise
+
+    # ── Switch ───────────────────────────────────────────────────────────
+    point_jobs_alias(version)
+    retired = activate_job_version(version)
+    _jobs_changed(version)
+
+    for old in retired:
+        drop_job_version(old)
+        drop_job_collection(old)
+
+    print(f"Job rebuild complete - {stored} jobs in {version} (max {MAX_JOBS})")
+    return {"fetched": run.fetched, "stored": stored, "vectors": vectors, "version": version}
+
+
+def sync_job_payloads(batch_size: int = 500) -> int:
+    """Copy the listing fields of every live job from MongoDB into its
+    Qdrant payload (for points written before payloads carried them)."""
+    version = active_job_version()
+    synced, batch = 0, {}
+    for job_id, payload in iter_job_listings(version, batch_size):
+        batch[job_id] = payload
+        if len(batch) >= batch_size:
+            synced += set_job_payloads(batch, version=version)
+            batch = {}
+    synced += set_job_payloads(batch, version=version)
+    _jobs_changed(version)
+    print(f"Job payload sync complete - {synced} payloads in {version}")
+    return synced
+
+
+def rollback_jobs() -> str | None:
+    """Serve the previous job version again (kept by every blue/green switch)."""
+    version = rollback_job_version()
+    if version:
+        point_jobs_alias(version)
+        _jobs_changed(version)
+    return version
@@ -0,0 +1,147 @@
+"""
+Job versions – which generation of the job set readers are served.
+
+A blue/green rebuild (JOB_SYNC_MODE=bluegreen in utils/job_fetcher.py)
+writes a complete job set into a fresh MongoDB collection and a fresh
+Qdrant collection, both named after the version (``jobs_<timestamp>``).
+Once the build validates, activate_job_version() flips a single pointer
+document in the ingest_state collection:
+
+    {_id: "jobs_version", active: "jobs_...", previous: "jobs_...", ...}
+
+That one-document write is the switch. Readers call active_job_version()
+once per request and pass the result to both the vector search and the
+MongoDB hydration, so a page is always ranked and hydrated from the same
+snapshot. The previous version is kept for rollback_job_version(); older
+ones are returned to the caller to drop.
+
+The same document carries ``last_sync``, stamped by mark_job_set_changed()
+whenever a fetch changes the job set (including incremental syncs, which
+keep the version). Readers that cache anything derived from the job set
+(the per-user match lists) key it by active_job_state(), so every
+process notices a change made by another one.
+
+Before the first blue/green rebuild there is no pointer and everything
+reads the original ``jobs`` collections (LEGACY_JOB_VERSION).
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from database import get_db
+
+LEGACY_JOB_VERSION = "jobs"
+JOB_VERSION_CHECK_SECS = float(os.getenv("JOB_VERSION_CHECK_SECS", "5"))
+
+STATE_COLLECTION = "ingest_state"
+_POINTER_ID = "jobs_version"
+
+_active: str | None = None
+_revision = ""
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _state():
+    return get_db()[STATE_COLLECTION]
+
+
+def _pointer() -> dict:
+    return _state().find_one({"_id": _POINTER_ID}) or {}
+
+
+def active_job_state() -> tuple[str, str]:
+    """``(version, revision)`` of the job set readers should use; the
+    revision changes whenever the job set does. Checked against MongoDB
+    at most every JOB_VERSION_CHECK_SECS."""
+    global _active, _revision, _checked_at
+
+    now = time.monotonic()
+    with _lock:
+        if _active is None or now - _checked_at >= JOB_VERSION_CHECK_SECS:
+            pointer = _pointer()
+            _active = pointer.get("active") or LEGACY_JOB_VERSION
+            _revision = str(pointer.get("last_sync") or "")
+            _checked_at = now
+        return _active, _revision
+
+
+def active_job_version() -> str:
+    """Name of the job collections readers should use."""
+    return active_job_state()[0]
+
+
+def new_job_version() -> str:
+    """A fresh, sortable version name for a rebuild (unique to the
+    millisecond, so back-to-back rebuilds never share one)."""
+    return f"{LEGACY_JOB_VERSION}_{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')[:-3]}"
+
+
+def _set_active(version: str):
+    global _active, _checked_at
+    with _lock:
+        _active, _checked_at = version, time.monotonic()
+
+
+def mark_job_set_changed():
+    """Stamp a new job-set revision (jobs were added, changed or expired)."""
+    global _checked_at
+    _state().update_one(
+        {"_id": _POINTER_ID},
+        {"$set": {"last_sync": datetime.now(timezone.utc)}},
+        upsert=True,
+    )
+    with _lock:
+        _checked_at = 0.0  # re-read on next use
+
+
+def activate_job_version(version: str) -> list[str]:
+    """Make ``version`` current and keep the old current as the rollback
+    target. Returns the versions that are no longer referenced."""
+    pointer = _pointer()
+    current = pointer.get("active") or LEGACY_JOB_VERSION
+    retired = [
+        old for old in (pointer.get("previous"),)
+        if old and old not in (version, current)
+    ]
+
+    _state().update_one(
+        {"_id": _POINTER_ID},
+        {
+            "$set": {
+                "active": version,
+                "previous": current if current != version else pointer.get("previous"),
+                "switched_at": datetime.now(timezone.utc),
+            }
+        },
+        upsert=True,
+    )
+    _set_active(version)
+    print(f"Job version {version} is live (previous: {current})")
+    return retired
+
+
+def rollback_job_version() -> str | None:
+    """Swap back to the previous version. Returns it, or None if there is
+    nothing to roll back to."""
+    pointer = _pointer()
+    previous = pointer.get("previous")
+    if not previous:
+        print("No previous job version to roll back to")
+        return None
+
+    _state().update_one(
+        {"_id": _POINTER_ID},
+        {
+            "$set": {
+                "active": previous,
+                "previous": pointer.get("active") or LEGACY_JOB_VERSION,
+                "switched_at": datetime.now(timezone.utc),
+            }
+        },
+    )
+    _set_active(previous)
+    print(f"Rolled back to job version {previous}")
+    return previous
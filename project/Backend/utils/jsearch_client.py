@@ -0,0 +1,227 @@
+"""
+JSearch client – fetches search result pages concurrently.
+
+fetch_jobs used to request every (query, page) one after another, so a
+run took the sum of all API latencies. fetch_search_pages() keeps up to
+JSEARCH_CONCURRENCY requests in flight over one keep-alive session and:
+
+  - paces them with a token bucket (JSEARCH_RATE_PER_SEC, bursts of
+    JSEARCH_BURST) sized to the RapidAPI plan's quota,
+  - retries 429 and 5xx responses (and connection errors) up to
+    JSEARCH_MAX_RETRIES times with exponential backoff and jitter,
+    honouring Retry-After when the API sends it,
+  - stops scheduling pages once ``max_jobs`` unique job IDs are in,
+    and skips the remaining pages of a query that ran dry.
+
+Pages are returned (or streamed to ``on_page``) in (query, page) order,
+so which jobs make the MAX_JOBS cut does not depend on response timing.
+bench_jsearch_fetch.py runs it against a local fake JSearch server.
+"""
+
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+JSEARCH_API_KEY = os.getenv("JSEARCH_API_KEY")
+JSEARCH_URL = os.getenv("JSEARCH_URL", "https://jsearch.p.rapidapi.com/search")
+JSEARCH_TIMEOUT = float(os.getenv("JSEARCH_TIMEOUT", "60"))  # seconds per request
+JSEARCH_CONCURRENCY = int(os.getenv("JSEARCH_CONCURRENCY", "4"))
+JSEARCH_RATE_PER_SEC = float(os.getenv("JSEARCH_RATE_PER_SEC", "5"))
+JSEARCH_BURST = int(os.getenv("JSEARCH_BURST", "5"))
+JSEARCH_MAX_RETRIES = int(os.getenv("JSEARCH_MAX_RETRIES", "4"))
+JSEARCH_BACKOFF_SECS = float(os.getenv("JSEARCH_BACKOFF_SECS", "1"))
+JSEARCH_MAX_BACKOFF_SECS = float(os.getenv("JSEARCH_MAX_BACKOFF_SECS", "30"))
+
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, up to ``burst``."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_s = (1 - self._tokens) / self.rate
+            time.sleep(wait_s)
+
+
+class FetchStats:
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failed_pages = 0
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def __str__(self):
+        return (
+            f"{self.requests} requests, {self.retries} retries, "
+            f"{self.rate_limited} rate-limited, {self.failed_pages} failed pages"
+        )
+
+
+def _backoff(attempt: int, response=None) -> float:
+    retry_after = response.headers.get("Retry-After") if response is not None else None
+    if retry_after:
+        try:
+            return min(JSEARCH_MAX_BACKOFF_SECS, float(retry_after))
+        except ValueError:
+            pass
+    delay = JSEARCH_BACKOFF_SECS * (2 ** attempt)
+    return min(JSEARCH_MAX_BACKOFF_SECS, delay * random.uniform(0.5, 1.0))
+
+
+def _get_page(session, url, headers, params, bucket, stats, stop) -> list[dict] | None:
+    """One search page's ``data`` list, or None if it could not be fetched."""
+    for attempt in range(JSEARCH_MAX_RETRIES + 1):
+        if stop.is_set():
+            return None
+        bucket.acquire()
+        stats.add(requests=1)
+        response = None
+        try:
+            response = session.get(url, headers=headers, params=params, timeout=JSEARCH_TIMEOUT)
+        except requests.RequestException as e:
+            error = str(e)
+        else:
+            if response.status_code == 200:
+                try:
+                    return response.json().get("data", [])
+                except ValueError:
+                    error = "invalid JSON"
+                    break
+            error = f"HTTP {response.status_code}: {response.text[:200]}"
+            if response.status_code == 429:
+                stats.add(rate_limited=1)
+            if response.status_code not in _RETRY_STATUSES:
+                break
+
+        if attempt < JSEARCH_MAX_RETRIES:
+            stats.add(retries=1)
+            time.sleep(_backoff(attempt, response))
+
+    print(f"JSearch page failed ({params['query']!r} page {params['page']}): {error}")
+    stats.add(failed_pages=1)
+    return None
+
+
+def fetch_search_pages(
+    queries: list[str],
+    pages: int,
+    params: dict,
+    max_jobs: int,
+    url: str = JSEARCH_URL,
+    api_key: str | None = JSEARCH_API_KEY,
+    concurrency: int = JSEARCH_CONCURRENCY,
+    rate_per_sec: float = JSEARCH_RATE_PER_SEC,
+    burst: int = JSEARCH_BURST,
+    on_page=None,
+) -> tuple[list[dict], FetchStats]:
+    """Fetch pages 1..``pages`` of every query. Returns the raw JSearch
+    postings of all fetched pages in (query, page) order, and counters.
+
+    With ``on_page``, each page's postings are passed to it instead (still
+    in (query, page) order, as soon as every earlier page is done) and the
+    returned list is empty. A blocking ``on_page`` holds back new requests.
+    """
+    headers = {
+        "X-RapidAPI-Key": api_key,
+        "X-RapidAPI-Host": "jsearch.p.rapidapi.com",
+    }
+    order = [(q, p) for q in range(len(queries)) for p in range(1, pages + 1)]
+    pending = order[::-1]  # pop() from the front of the (query, page) order
+
+    collected = []
+    if on_page is None:
+        on_page = collected.extend
+
+    bucket = TokenBucket(rate_per_sec, burst)
+    stats = FetchStats()
+    stop = threading.Event()
+    finished = {}  # (query, page) -> postings; [] for failed or skipped pages
+    released = 0
+    seen_ids = set()
+    exhausted = set()  # queries that returned an empty page
+
+    def release():
+        nonlocal released
+        while released < len(order) and order[released] in finished:
+            jobs = finished.pop(order[released])
+            released += 1
+            if jobs:
+                on_page(jobs)
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, concurrency))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    with session, ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        in_flight = {}
+        try:
+            while pending or in_flight:
+                while pending and len(in_flight) < concurrency and len(seen_ids) < max_jobs:
+                    q, page = pending.pop()
+                    if q in exhausted:
+                        finished[(q, page)] = []
+                        continue
+                    page_params = dict(params, query=queries[q], page=str(page), num_pages="1")
+                    future = pool.submit(
+                        _get_page, session, url, headers, page_params, bucket, stats, stop
+                    )
+                    in_flight[future] = (q, page)
+                if not in_flight:
+                    break
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    q, page = in_flight.pop(future)
+                    jobs = future.result() or []
+                    if future.result() == []:
+                        exhausted.add(q)
+                    finished[(q, page)] = jobs
+                    seen_ids.update(job.get("job_id") for job in jobs if job.get("job_id"))
+
+                if len(seen_ids) >= max_jobs:
+                    # Schedule nothing new; in-flight pages finish but stop retrying
+                    pending.clear()
+                    stop.set()
+                release()
+
+            # Pages never requested (early stop) don't hold back later ones
+            for key in order[released:]:
+                finished.setdefault(key, [])
+            release()
+        except BaseException:
+            stop.set()
+            raise
+
+    return collected, stats
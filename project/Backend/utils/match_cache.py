@@ -0,0 +1,105 @@
+"""
+Match cache – keeps each user's full ranked job list in memory so that
+/api/jobs pages are sliced from a single vector search instead of
+re-ranking from the top on every page.
+
+Entries expire after MATCH_CACHE_TTL seconds and are dropped early when
+the user's resume vector changes (upsert_resume_vector) or when the jobs
+collection is refreshed (fetch_jobs). Entries are also keyed by the
+user's resume URL and the job set's version and revision
+(utils/job_versions.py), so a new upload or a job sync handled by
+another worker process is never served a stale list.
+
+Pages are addressed with an opaque cursor that encodes the list it was
+cut from and the offset of the next page. A cursor is only valid for its
+own list: if the ranking has changed since (new resume, job refresh)
+/api/jobs answers 409 and the client starts again from the first page,
+instead of slicing a different ranking. List IDs are a digest of the
+ranked job IDs, so a list re-ranked after expiry or by another worker
+process keeps its ID as long as the order is the same.
+
+Only the top MATCH_LIST_SIZE jobs are ranked per user, so paging stops
+there: has_more is false on the page that reaches the cap even if more
+jobs exist further down.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+MATCH_CACHE_TTL = int(os.getenv("MATCH_CACHE_TTL", "900"))  # seconds
+MATCH_CACHE_MAX_USERS = int(os.getenv("MATCH_CACHE_MAX_USERS", "1000"))
+MATCH_LIST_SIZE = int(os.getenv("MATCH_LIST_SIZE", "500"))  # jobs ranked per user
+
+# clerk_id -> (list_id, resume_key, expires_at, [(job_id, score), ...])
+_entries: OrderedDict = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_ranked_matches(clerk_id: str, resume_key, compute):
+    """Return ``(list_id, [(job_id, score), ...])`` for a user.
+
+    ``compute`` is called on a cache miss and must return the full ranked
+    list, or None when nothing can be ranked yet (the result is then not
+    cached).
+    """
+    now = time.monotonic()
+
+    with _lock:
+        entry = _entries.get(clerk_id)
+        if entry and entry[1] == resume_key and entry[2] > now:
+            _entries.move_to_end(clerk_id)
+            return entry[0], entry[3]
+
+    ranked = compute()
+    if ranked is None:
+        return None, []
+
+    list_id = hashlib.sha256(
+        "\n".join(job_id for job_id, _ in ranked).encode()
+    ).hexdigest()[:12]
+    with _lock:
+        _entries[clerk_id] = (list_id, resume_key, now + MATCH_CACHE_TTL, ranked)
+        _entries.move_to_end(clerk_id)
+        while len(_entries) > MATCH_CACHE_MAX_USERS:
+            _entries.popitem(last=False)
+
+    return list_id, ranked
+
+
+def invalidate_user(clerk_id: str):
+    """Drop a user's cached list (their resume vector changed)."""
+    with _lock:
+        _entries.pop(clerk_id, None)
+
+
+def invalidate_all():
+    """Drop every cached list (the jobs collection was refreshed)."""
+    with _lock:
+        _entries.clear()
+
+
+def encode_cursor(list_id: str, offset: int) -> str:
+    """Build the opaque cursor for the page starting at ``offset``."""
+    raw = json.dumps({"l": list_id, "o": offset}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, int] | None:
+    """Return ``(list_id, offset)`` or None if the cursor is malformed.
+
+    The caller must check ``list_id`` against the list it pages through.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        offset = int(data["o"])
+        if offset < 0:
+            return None
+        return str(data["l"]), offset
+    except (ValueError, KeyError, TypeError):
+        return None
@@ -0,0 +1,137 @@
+"""
+Model client – thin HTTP client for the model server sidecar
+(model_server.py).
+
+When MODEL_SERVER_URL is set (e.g. http://127.0.0.1:8765), utils/nlp.py,
+utils/embedding.py, utils/skill_index.py and utils/stt_service.py send
+their work here instead of loading spaCy, SkillNer, the
+SentenceTransformer or Whisper into every web worker. Leave it unset to
+keep the models in-process.
+
+Every call has a timeout; failures raise RuntimeError so callers keep
+their existing error handling. /annotate gets its own, longer timeout
+(MODEL_SERVER_ANNOTATE_TIMEOUT): ingest sends INGEST_BATCH_SIZE job
+descriptions per call, which takes far longer than one resume.
+
+embedding_model_id() reports which embedding model and backend the
+server runs (from /health, then from every /embed response), so caches
+of its vectors are keyed by what actually produced them.
+"""
+
+import os
+import threading
+
+import numpy as np
+import requests
+
+MODEL_SERVER_URL = os.getenv("MODEL_SERVER_URL", "").rstrip("/")
+MODEL_SERVER_TIMEOUT = float(os.getenv("MODEL_SERVER_TIMEOUT", "30"))  # seconds
+MODEL_SERVER_ANNOTATE_TIMEOUT = float(os.getenv("MODEL_SERVER_ANNOTATE_TIMEOUT", "300"))
+MODEL_SERVER_TRANSCRIBE_TIMEOUT = float(os.getenv("MODEL_SERVER_TRANSCRIBE_TIMEOUT", "120"))
+
+_local = threading.local()
+_embedding_model: str | None = None
+
+
+def model_server_enabled() -> bool:
+    return bool(MODEL_SERVER_URL)
+
+
+def _session() -> requests.Session:
+    # One keep-alive session per thread
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+    return session
+
+
+def _post(path: str, timeout: float, **kwargs) -> requests.Response:
+    try:
+        response = _session().post(f"{MODEL_SERVER_URL}{path}", timeout=timeout, **kwargs)
+    except requests.RequestException as e:
+        raise RuntimeError(f"Model server unavailable: {e}") from e
+    if response.status_code != 200:
+        try:
+            message = response.json().get("error", response.text)
+        except ValueError:
+            message = response.text
+        raise RuntimeError(f"Model server error ({response.status_code}): {message}")
+    return response
+
+
+def embed(texts: list[str], batch_size: int) -> np.ndarray:
+    """Embed texts on the server. Returns a (len(texts), dim) float32 array."""
+    response = _post(
+        "/embed",
+        MODEL_SERVER_TIMEOUT,
+        json={"texts": texts, "batch_size": batch_size},
+    )
+    rows = int(response.headers["X-Embedding-Rows"])
+    _note_embedding_model(response)
+    return np.frombuffer(response.content, dtype=np.float32).reshape(rows, -1)
+
+
+def _note_embedding_model(response: requests.Response):
+    global _embedding_model
+    model_id = response.headers.get("X-Embedding-Model")
+    if model_id:
+        _embedding_model = model_id
+
+
+def embedding_model_id() -> str:
+    """Identity of the server's embedding model (name and backend)."""
+    global _embedding_model
+    if _embedding_model is None:
+        try:
+            response = _session().get(f"{MODEL_SERVER_URL}/health", timeout=MODEL_SERVER_TIMEOUT)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise RuntimeError(f"Model server unavailable: {e}") from e
+        model_id = response.json().get("embedding_model")
+        if not model_id:
+            raise RuntimeError("Model server did not report its embedding model")
+        _embedding_model = model_id
+    return _embedding_model
+
+
+def annotate(texts: list[str], site: str | None = None) -> list[dict]:
+    """``annotate`` results for each text, from the call site's engine."""
+    response = _post(
+        "/annotate", MODEL_SERVER_ANNOTATE_TIMEOUT, json={"texts": texts, "site": site}
+    )
+    return response.json()["results"]
+
+
+def skill_surface_forms() -> set[str]:
+    try:
+        response = _session().get(
+            f"{MODEL_SERVER_URL}/skill-forms", timeout=MODEL_SERVER_TIMEOUT
+        )
+        response.raise_for_status()
+    except requests.RequestException as e:
+        raise RuntimeError(f"Model server unavailable: {e}") from e
+    return set(response.json()["forms"])
+
+
+def transcribe(audio_bytes: bytes, suffix: str) -> str:
+    response = _post(
+        "/transcribe",
+        MODEL_SERVER_TRANSCRIBE_TIMEOUT,
+        params={"suffix": suffix},
+        data=audio_bytes,
+        headers={"Content-Type": "application/octet-stream"},
+    )
+    return response.json()["text"]
+
+
+class RemoteSkillExtractor:
+    """Stands in for the skill extractor when the model server is used."""
+
+    def __init__(self, site: str | None = None):
+        self.site = site
+
+    def annotate(self, text: str) -> dict:
+        return annotate([text], self.site)[0]
+
+    def annotate_batch(self, texts: list[str]) -> list[dict]:
+        return annotate(list(texts), self.site)
@@ -1,28 +1,269 @@
-import spacy
-from spacy.matcher import PhraseMatcher
+"""
+Skill extraction engines.
+
+Two engines return the same ``annotate`` result shape:
+  skillner  SkillNer's SkillExtractor (the original, full spaCy pipeline)
+  trie      utils/skill_matcher.py – precompiled tries, lemmas only
+
+Each call site picks its engine: SKILL_ENGINE_RESUME for resume parsing,
+SKILL_ENGINE_INGEST for job ingest and the skill backfill. Anything else
+(the legacy callers) uses SkillNer. If the trie engine can't be built the
+call site falls back to SkillNer. Both engines share one loaded spaCy
+model. Keep resume and ingest on the same engine so user and job skills
+stay comparable.
+
+annotate_batch() is the bulk path for ingest: descriptions go through
+nlp.pipe in NLP_BATCH_SIZE batches (optionally on NLP_N_PROCESS worker
+processes) with the parser and NER disabled, and each engine then matches
+on the precomputed docs.
+
+When a snapshot built by setup_dependencies.py (utils/nlp_snapshot.py)
+matches the installed model and SKILL_DB, the pipeline and all matchers
+are restored from it instead of being rebuilt.
+"""
+
+import copy
+import os
+import threading
+from functools import lru_cache
+
+from utils import nlp_snapshot
+from utils.model_client import RemoteSkillExtractor, model_server_enabled
+
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_lg")
+SKILL_ENGINES = {
+    "resume": os.getenv("SKILL_ENGINE_RESUME", "skillner").lower(),
+    "ingest": os.getenv("SKILL_ENGINE_INGEST", "skillner").lower(),
+}
+
+NLP_BATCH_SIZE = int(os.getenv("NLP_BATCH_SIZE", "32"))
+NLP_N_PROCESS = int(os.getenv("NLP_N_PROCESS", "1"))
+# Skill matching only needs tokens, lemmas and stop words
+NLP_DISABLED_PIPES = ("parser", "ner", "senter")
 
 nlp = None
+_snapshot = None
 skill_extractor = None
+skill_matcher = None
+_skill_matcher_failed = False
+_lock = threading.Lock()
 
 
-def get_skill_extractor():
-    global nlp, skill_extractor
+def skill_engine(site: str | None) -> str:
+    return SKILL_ENGINES.get(site, "skillner")
+
+
+def _get_nlp():
+    global nlp, _snapshot
+    if nlp is None:
+        try:
+            _snapshot = nlp_snapshot.load_snapshot(SPACY_MODEL)
+        except Exception as e:
+            print(f"NLP snapshot unusable, building from scratch: {e}")
+            _snapshot = None
+        if _snapshot is not None:
+            nlp = _snapshot.nlp
+        else:
+            import spacy
+
+            nlp = spacy.load(SPACY_MODEL)
+    return nlp
+
+
+def _get_skillner():
+    global skill_extractor
 
     if skill_extractor is not None:
         return skill_extractor
 
-    SPACY_MODEL = "en_core_web_lg"
-
     try:
-        nlp = spacy.load(SPACY_MODEL)
+        from spacy.matcher import PhraseMatcher
 
         from skillNer.general_params import SKILL_DB
         from skillNer.skill_extractor_class import SkillExtractor
 
-        skill_extractor = SkillExtractor(nlp, SKILL_DB, PhraseMatcher)
+        pipeline = _get_nlp()
+        if _snapshot is not None and _snapshot.skillner_patterns:
+            try:
+                skill_extractor = nlp_snapshot.skillner_from_patterns(
+                    pipeline, SKILL_DB, _snapshot.skillner_patterns
+                )
+            except ValueError as e:
+                print(f"NLP snapshot patterns unusable, building SkillNer from scratch: {e}")
+        if skill_extractor is None:
+            skill_extractor = SkillExtractor(pipeline, SKILL_DB, PhraseMatcher)
         print("SkillNer initialized")
     except OSError:
         print(f"SpaCy model '{SPACY_MODEL}' not found. Run setup_dependencies.py first.")
         return None
 
-    return skill_extractor
\ No newline at end of file
+    return skill_extractor
+
+
+def _get_skill_matcher():
+    global skill_matcher, _skill_matcher_failed
+
+    if skill_matcher is not None or _skill_matcher_failed:
+        return skill_matcher
+
+    try:
+        from skillNer.general_params import SKILL_DB
+
+        from utils.skill_matcher import SkillMatcher
+
+        pipeline = _get_nlp()
+        state = _snapshot.trie_state if _snapshot is not None else None
+        skill_matcher = SkillMatcher(pipeline, SKILL_DB, state=state)
+        print("Skill matcher initialized")
+    except OSError:
+        print(f"SpaCy model '{SPACY_MODEL}' not found. Run setup_dependencies.py first.")
+        return None
+    except Exception as e:
+        print(f"Skill matcher unavailable, falling back to SkillNer: {e}")
+        _skill_matcher_failed = True
+        return None
+
+    return skill_matcher
+
+
+def build_nlp_snapshot():
+    """Build the pipeline and both engines from scratch and snapshot them."""
+    import spacy
+
+    from skillNer.general_params import SKILL_DB
+    from skillNer.skill_extractor_class import SkillExtractor
+    from spacy.matcher import PhraseMatcher
+
+    from utils.skill_matcher import SkillMatcher
+
+    cold_nlp = spacy.load(SPACY_MODEL)
+    nlp_snapshot.build_snapshot(
+        cold_nlp,
+        SPACY_MODEL,
+        skillner=SkillExtractor(cold_nlp, SKILL_DB, PhraseMatcher),
+        skill_matcher=SkillMatcher(cold_nlp, SKILL_DB),
+        disabled=NLP_DISABLED_PIPES,
+    )
+
+
+def get_skill_extractor(site: str | None = None):
+    """Return the skill extractor for a call site ("resume", "ingest" or
+    None for legacy callers), or None if no engine can be loaded."""
+
+    # spaCy and SkillNer live in the model server (model_server.py)
+    if model_server_enabled():
+        return RemoteSkillExtractor(site)
+
+    with _lock:
+        if skill_engine(site) == "trie":
+            matcher = _get_skill_matcher()
+            if matcher is not None:
+                return matcher
+        return _get_skillner()
+
+
+class _PipedNlp:
+    """Stands in for ``nlp`` inside SkillNer: the cleaned texts that were
+    already run through nlp.pipe come back as their precomputed docs, and
+    every other call (SkillNer re-parses lemmed/stemmed variants that it
+    only needs tokens of) gets just the tokenizer."""
+
+    def __init__(self, nlp, docs: dict):
+        self._nlp = nlp
+        self._docs = docs
+
+    def __call__(self, text):
+        doc = self._docs.get(text)
+        return doc if doc is not None else self._nlp.make_doc(text)
+
+    def __getattr__(self, name):
+        return getattr(self._nlp, name)
+
+
+def _skillner_over_docs(extractor, docs: dict):
+    """A shallow copy of the SkillExtractor wired to a _PipedNlp."""
+    from skillNer.matcher_class import SkillsGetter
+    from skillNer.utils import Utils
+
+    piped = _PipedNlp(extractor.nlp, docs)
+    clone = copy.copy(extractor)
+    clone.nlp = piped
+    clone.skill_getters = SkillsGetter(piped)
+    clone.utils = Utils(piped, extractor.skills_db)
+    return clone
+
+
+@lru_cache(maxsize=None)
+def _skillner_cleaner():
+    from skillNer.cleaner import Cleaner
+
+    return Cleaner(
+        include_cleaning_functions=["remove_punctuation", "remove_extra_space"],
+        to_lowercase=False,
+    )
+
+
+def _skillner_clean(text: str) -> str:
+    """The text SkillNer's Text object runs through nlp."""
+    return _skillner_cleaner()(text).lower()
+
+
+def annotate_batch(
+    texts: list[str],
+    site: str | None = "ingest",
+    batch_size: int = NLP_BATCH_SIZE,
+    n_process: int = NLP_N_PROCESS,
+) -> list[dict]:
+    """Annotate many texts at once; one result per text, in order.
+
+    A text that fails to annotate gets an empty dict. Raises RuntimeError
+    if no skill engine is available.
+    """
+    extractor = get_skill_extractor(site)
+    if extractor is None:
+        raise RuntimeError("Skill extraction is not available")
+    if isinstance(extractor, RemoteSkillExtractor):
+        return extractor.annotate_batch(texts)
+
+    from utils.skill_matcher import SkillMatcher
+
+    clean = extractor.clean if isinstance(extractor, SkillMatcher) else _skillner_clean
+    cleaned = [clean(text) for text in texts]
+    disabled = [name for name in NLP_DISABLED_PIPES if name in _get_nlp().pipe_names]
+    docs = _get_nlp().pipe(
+        cleaned, batch_size=batch_size, n_process=n_process, disable=disabled
+    )
+
+    results = []
+    for text, cleaned_text, doc in zip(texts, cleaned, docs):
+        try:
+            if isinstance(extractor, SkillMatcher):
+                results.append(extractor.annotate(text, doc=doc))
+            else:
+                results.append(
+                    _skillner_over_docs(extractor, {cleaned_text: doc}).annotate(text)
+                )
+        except Exception as e:
+            print(f"Error extracting skills: {e}")
+            results.append({})
+    return results
+
+
+def skills_by_id(texts_by_id: dict, site: str | None = "ingest") -> dict:
+    """Annotate ``{id: text}`` and return ``{id: sorted skills}``. Empty
+    texts map to an empty list without touching the model."""
+    ids = [key for key, text in texts_by_id.items() if text]
+    annotations = annotate_batch([texts_by_id[key] for key in ids], site) if ids else []
+    skills = {key: [] for key in texts_by_id}
+    for key, result in zip(ids, annotations):
+        skills[key] = sorted(skills_from_annotations(result))
+    return skills
+
+
+def skills_from_annotations(annotations: dict) -> set[str]:
+    """Collect the matched skill strings from a SkillNer ``annotate`` result."""
+    results = annotations.get("results", {})
+    return set(
+        [s["doc_node_value"] for s in results.get("full_matches", [])]
+        + [s["doc_node_value"] for s in results.get("ngram_scored", [])]
+    )
@@ -0,0 +1,207 @@
+"""
+NLP snapshot – everything get_skill_extractor() builds, saved to disk.
+
+A cold start loads en_core_web_lg and then rebuilds SkillNer's five
+PhraseMatchers (and the trie matcher) by tokenising every SKILL_DB
+surface form in Python. build_snapshot() (run by setup_dependencies.py)
+does that once and writes:
+
+  SKILL_SNAPSHOT_DIR/
+    manifest.json   format, versions, the SKILL_DB checksum and the
+                    pipes left out of nlp/
+    nlp/            the spaCy pipeline without parser and NER
+    matchers.pkl    PhraseMatcher patterns as token-hash arrays, plus the
+                    trie matcher's tries
+
+load_snapshot() restores the pipeline from nlp/ (excluding the pipes the
+manifest lists, which nlp/config.cfg still names but nlp/ has no data
+for) and re-adds the patterns from their hash arrays, which skips
+tokenisation. A snapshot is only used
+if its SKILL_DB checksum and the spaCy / model / SkillNer versions match
+the running environment; otherwise utils/nlp.py builds cold as before.
+
+The PhraseMatcher patterns are spaCy's private pickle state
+(``PhraseMatcher.__reduce__``), so they also record the exact spaCy
+version that produced them and are refused under any other version.
+The SKILL_DB checksum hashes the bytes of skill_db_relax_20.json, found
+the way skillNer.general_params finds it: relative to the working
+directory. Only if the file isn't there (the directory changed after
+SkillNer was imported) is the loaded SKILL_DB hashed instead, which is
+much slower.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+from importlib.metadata import PackageNotFoundError, version
+
+SNAPSHOT_FORMAT = 3
+SKILL_SNAPSHOT_DIR = os.getenv(
+    "SKILL_SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "nlp_snapshot"),
+)
+SKILL_DB_FILE = "skill_db_relax_20.json"  # opened relative to the CWD by SkillNer
+
+# SkillNer matcher names, in SkillExtractor's pipeline order
+SKILLNER_MATCHERS = (
+    "full_matcher",
+    "abv_matcher",
+    "full_uni_matcher",
+    "low_form_matcher",
+    "token_matcher",
+)
+
+
+class Snapshot:
+    def __init__(self, nlp, skillner_patterns: dict | None, trie_state: dict | None):
+        self.nlp = nlp
+        self.skillner_patterns = skillner_patterns
+        self.trie_state = trie_state
+
+
+def skill_db_checksum() -> str:
+    """SHA-256 of the SKILL_DB file SkillNer loads (or of its content)."""
+    if not os.path.exists(SKILL_DB_FILE):
+        # Make SkillNer fetch it (into the CWD, as it always does)
+        from skillNer.general_params import SKILL_DB
+
+        if not os.path.exists(SKILL_DB_FILE):
+            return hashlib.sha256(json.dumps(SKILL_DB, sort_keys=True).encode()).hexdigest()
+
+    digest = hashlib.sha256()
+    with open(SKILL_DB_FILE, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _package_version(name: str) -> str | None:
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
+
+def _environment(model_name: str) -> dict:
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "spacy": _package_version("spacy"),
+        "model": model_name,
+        "model_version": _package_version(model_name),
+        "skillner": _package_version("skillNer"),
+        "skill_db_sha256": skill_db_checksum(),
+    }
+
+
+def build_snapshot(nlp, model_name: str, skillner=None, skill_matcher=None,
+                   path: str = SKILL_SNAPSHOT_DIR, disabled=("parser", "ner")):
+    """Write a snapshot of an already-built pipeline and matchers."""
+    tmp = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    excluded = [p for p in disabled if p in nlp.pipe_names]
+    nlp.to_disk(os.path.join(tmp, "nlp"), exclude=excluded)
+
+    patterns = None
+    if skillner is not None:
+        import spacy
+        from spacy.matcher.phrasematcher import unpickle_matcher
+
+        matchers = {}
+        for name in SKILLNER_MATCHERS:
+            restore, state = skillner.matchers[name].__reduce__()[:2]
+            # (vocab, {key: {token-hash tuples}}, callbacks, attr) in the
+            # spaCy versions this was written against; refuse anything else
+            if restore is not unpickle_matcher or len(state) != 4:
+                raise RuntimeError(
+                    f"Unsupported PhraseMatcher pickle state in spaCy {spacy.__version__}"
+                )
+            _, docs, _, attr = state
+            matchers[name] = (attr, docs)
+        patterns = {"spacy": spacy.__version__, "matchers": matchers}
+    with open(os.path.join(tmp, "matchers.pkl"), "wb") as f:
+        pickle.dump(
+            {
+                "skillner": patterns,
+                "trie": skill_matcher.state() if skill_matcher is not None else None,
+            },
+            f,
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump(
+            dict(_environment(model_name), excluded=excluded, created_at=time.time()), f, indent=2
+        )
+
+    # Swap the new snapshot in; a reader sees either the old or the new one
+    old = f"{path}.old-{os.getpid()}"
+    if os.path.exists(path):
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    print(f"NLP snapshot written to {path}")
+
+
+def load_snapshot(model_name: str, path: str = SKILL_SNAPSHOT_DIR) -> Snapshot | None:
+    """Load a snapshot that matches this environment, or return None."""
+    if not path:
+        return None
+    manifest_path = os.path.join(path, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    expected = _environment(model_name)
+    stale = [key for key, value in expected.items() if manifest.get(key) != value]
+    if stale:
+        print(f"NLP snapshot is stale ({', '.join(stale)} changed) - building from scratch")
+        return None
+
+    import spacy
+
+    # config.cfg still lists the excluded pipes; loading them would fail
+    nlp = spacy.load(os.path.join(path, "nlp"), exclude=manifest.get("excluded", []))
+    with open(os.path.join(path, "matchers.pkl"), "rb") as f:
+        matchers = pickle.load(f)
+    print("NLP snapshot loaded")
+    return Snapshot(nlp, matchers["skillner"], matchers["trie"])
+
+
+def skillner_from_patterns(nlp, skills_db: dict, patterns: dict):
+    """A SkillExtractor whose PhraseMatchers come from snapshot patterns
+    instead of SkillExtractor.__init__ re-tokenising SKILL_DB.
+
+    Raises ValueError if the patterns were written by another spaCy version.
+    """
+    import spacy
+    from spacy.matcher import PhraseMatcher
+    from spacy.matcher.phrasematcher import unpickle_matcher
+
+    from skillNer.matcher_class import SkillsGetter
+    from skillNer.skill_extractor_class import SkillExtractor
+    from skillNer.utils import Utils
+
+    if patterns.get("spacy") != spacy.__version__:
+        raise ValueError(
+            f"SkillNer patterns were snapshotted with spaCy {patterns.get('spacy')}, "
+            f"running {spacy.__version__}"
+        )
+
+    extractor = SkillExtractor.__new__(SkillExtractor)
+    extractor.tranlsator_func = False
+    extractor.nlp = nlp
+    extractor.skills_db = skills_db
+    extractor.phraseMatcher = PhraseMatcher
+    extractor.matchers = {
+        name: unpickle_matcher(nlp.vocab, docs, {}, attr)
+        for name, (attr, docs) in patterns["matchers"].items()
+    }
+    extractor.skill_getters = SkillsGetter(nlp)
+    extractor.utils = Utils(nlp, skills_db)
+    return extractor
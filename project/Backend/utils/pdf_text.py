@@ -0,0 +1,144 @@
+"""
+PDF text extraction straight from memory, in processes owned by one upload.
+
+The upload is never written to disk, and only its first PDF_MAX_PAGES
+pages are read. The page count is read first (cheap – no content is
+parsed). Documents of up to PDF_INLINE_MAX_PAGES pages, i.e. most
+resumes, are extracted inline: starting an interpreter costs more than
+the extraction, and the page cap is their only bound. Longer ones are piped to ceil(pages /
+PDF_PAGES_PER_CHUNK) short-lived ``python -m utils.pdf_text`` processes
+(at most PDF_WORKERS), and pdfminer reads them from a BytesIO. Each
+process parses the document once and extracts its share of the chunks
+of PDF_PAGES_PER_CHUNK pages, so long documents use several cores. That
+extraction must finish within PDF_EXTRACT_TIMEOUT seconds; on timeout
+only that upload's processes are killed, so a malicious or huge PDF
+cannot affect anyone else's extraction. Concurrent extractions are
+bounded by the resume pipeline (RESUME_WORKERS).
+
+The workers are fresh interpreters that import only pdfminer. They are
+never forked from the multi-threaded Flask process with torch and spaCy
+loaded, and they don't re-import the app the way multiprocessing's
+spawn/forkserver do with ``__main__``. With PDF_WORKERS=0 every
+extraction runs inline, with the page cap only.
+"""
+
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+from pdfminer.converter import TextConverter
+from pdfminer.high_level import extract_text
+from pdfminer.layout import LAParams
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
+
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "20"))
+PDF_PAGES_PER_CHUNK = int(os.getenv("PDF_PAGES_PER_CHUNK", "2"))
+PDF_EXTRACT_TIMEOUT = float(os.getenv("PDF_EXTRACT_TIMEOUT", "20"))  # seconds
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_INLINE_MAX_PAGES = int(os.getenv("PDF_INLINE_MAX_PAGES", "4"))
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _extract_share(pdf_bytes: bytes, worker: int, workers: int) -> dict[int, str]:
+    """Parse the PDF once and extract this worker's chunks of pages."""
+    output = io.StringIO()
+    manager = PDFResourceManager()
+    device = TextConverter(manager, output, laparams=LAParams())
+    interpreter = PDFPageInterpreter(manager, device)
+    texts = {}
+    for number, page in enumerate(PDFPage.get_pages(io.BytesIO(pdf_bytes), maxpages=PDF_MAX_PAGES)):
+        if (number // PDF_PAGES_PER_CHUNK) % workers != worker:
+            continue
+        start = output.tell()
+        interpreter.process_page(page)
+        texts[number] = output.getvalue()[start:]
+    device.close()
+    return texts
+
+
+def _page_count(pdf_bytes: bytes) -> int:
+    """Pages in the document, from the page tree's /Count."""
+    document = PDFDocument(PDFParser(io.BytesIO(pdf_bytes)))
+    count = resolve1(resolve1(document.catalog.get("Pages") or {}).get("Count"))
+    if isinstance(count, int):
+        return count
+    # No usable /Count: walk the page tree (still no content parsing)
+    return sum(1 for _ in PDFPage.create_pages(document))
+
+
+def _kill(processes: list[subprocess.Popen]):
+    for process in processes:
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+
+
+def extract_pdf_text(pdf_bytes: bytes) -> str:
+    """Extract the text of (at most PDF_MAX_PAGES pages of) a PDF.
+
+    Raises RuntimeError if the PDF can't be read, or if a multi-process
+    extraction doesn't finish within PDF_EXTRACT_TIMEOUT.
+    """
+    pages = 0
+    if PDF_WORKERS > 0:
+        try:
+            pages = min(_page_count(pdf_bytes), PDF_MAX_PAGES)
+        except Exception as e:
+            raise RuntimeError(f"PDF text extraction failed: {e}") from None
+    if pages <= PDF_INLINE_MAX_PAGES:
+        return extract_text(io.BytesIO(pdf_bytes), maxpages=PDF_MAX_PAGES)
+
+    chunks = -(-pages // max(1, PDF_PAGES_PER_CHUNK))
+    workers = min(PDF_WORKERS, chunks)
+    deadline = time.monotonic() + PDF_EXTRACT_TIMEOUT
+
+    processes = []
+    try:
+        for worker in range(workers):
+            process = subprocess.Popen(
+                [sys.executable, "-m", "utils.pdf_text", str(worker), str(workers)],
+                cwd=_BACKEND_DIR,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            processes.append(process)
+            # Workers read all of stdin before parsing, so this doesn't stall;
+            # communicate() below must not touch the closed pipe again
+            process.stdin.write(pdf_bytes)
+            process.stdin.close()
+            process.stdin = None
+
+        texts = {}
+        for process in processes:
+            out, err = process.communicate(timeout=max(0.0, deadline - time.monotonic()))
+            if process.returncode != 0:
+                message = err.decode(errors="replace").strip().splitlines()
+                raise RuntimeError(
+                    f"PDF text extraction failed: {message[-1] if message else process.returncode}"
+                )
+            texts.update((int(page), text) for page, text in json.loads(out).items())
+        return "".join(texts[number] for number in sorted(texts))
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(
+            f"PDF text extraction took longer than {PDF_EXTRACT_TIMEOUT:.0f}s"
+        ) from None
+    except BrokenPipeError:
+        raise RuntimeError("PDF text extraction crashed") from None
+    finally:
+        # Only this upload's processes; a stuck one is killed here
+        _kill(processes)
+
+
+if __name__ == "__main__":
+    # Worker: python -m utils.pdf_text <worker> <workers> < file.pdf
+    pages = _extract_share(sys.stdin.buffer.read(), int(sys.argv[1]), int(sys.argv[2]))
+    json.dump(pages, sys.stdout)
@@ -0,0 +1,140 @@
+"""
+Qdrant collection profiles – how job and resume vectors are stored and
+searched.
+
+A profile chooses the quantization (none, scalar int8 or binary), the
+HNSW graph (``m``, ``ef_construct``), the search-time ``ef`` and whether
+the original float32 vectors live on disk or in RAM:
+
+    default    float32 in RAM, Qdrant's HNSW defaults (the original setup)
+    int8       int8 scalar quantization in RAM, originals in RAM, rescored
+    int8-disk  int8 in RAM, originals on disk (read only to rescore)
+    binary     1-bit binary quantization in RAM, 3x oversampled, rescored
+    hnsw-lite  smaller graph (m=8, ef_construct=64, ef=64)
+    accurate   larger graph and search beam (m=32, ef_construct=256, ef=256)
+
+QDRANT_JOB_PROFILE and QDRANT_RESUME_PROFILE pick a profile by name, or
+hold inline JSON for a custom one, e.g.
+``{"quantization": "int8", "m": 24, "ef": 128, "on_disk": true}``.
+
+Collection settings apply when a collection is created (new job versions,
+utils/job_versions.py), or when they are applied to an existing one with
+``run_fetch.py --apply-profile``. Search settings apply to every query.
+bench_qdrant_profiles.py measures recall and latency of each profile
+against exact search on our own embeddings. Binary quantization is
+designed for high-dimensional models, so check its recall on 384-dim
+MiniLM vectors before using it.
+"""
+
+import json
+import os
+
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Distance,
+    HnswConfigDiff,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
+
+from utils.embedding import EMBEDDING_DIM
+
+PROFILES = {
+    "default": {},
+    "int8": {"quantization": "int8", "oversampling": 2.0},
+    "int8-disk": {"quantization": "int8", "oversampling": 2.0, "on_disk": True},
+    "binary": {"quantization": "binary", "oversampling": 3.0},
+    "hnsw-lite": {"m": 8, "ef_construct": 64, "ef": 64},
+    "accurate": {"m": 32, "ef_construct": 256, "ef": 256},
+}
+
+_FIELDS = {
+    "quantization": None,   # None | "int8" | "binary"
+    "m": None,              # HNSW edges per node (Qdrant default 16)
+    "ef_construct": None,   # HNSW build beam (Qdrant default 100)
+    "ef": None,             # search beam (Qdrant default: ef_construct)
+    "on_disk": False,       # original vectors on disk
+    "oversampling": None,   # quantized candidates fetched per result
+    "rescore": True,        # re-rank quantized candidates with originals
+}
+
+
+def get_profile(spec: str | dict | None) -> dict:
+    """A complete profile from a name, inline JSON or a dict."""
+    if isinstance(spec, dict):
+        overrides = spec
+    elif not spec or not spec.strip():
+        overrides = {}
+    elif spec.lstrip().startswith("{"):
+        overrides = json.loads(spec)
+    elif spec in PROFILES:
+        overrides = PROFILES[spec]
+    else:
+        raise ValueError(f"Unknown Qdrant profile {spec!r} (known: {', '.join(PROFILES)})")
+
+    unknown = set(overrides) - set(_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown Qdrant profile fields: {', '.join(sorted(unknown))}")
+    if overrides.get("quantization") not in (None, "int8", "binary"):
+        raise ValueError("quantization must be int8, binary or null")
+    return {**_FIELDS, **overrides}
+
+
+JOB_PROFILE = get_profile(os.getenv("QDRANT_JOB_PROFILE", "default"))
+RESUME_PROFILE = get_profile(os.getenv("QDRANT_RESUME_PROFILE", "default"))
+
+
+def _quantization_config(profile: dict):
+    if profile["quantization"] == "int8":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    if profile["quantization"] == "binary":
+        return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+    return None
+
+
+def _hnsw_config(profile: dict) -> HnswConfigDiff | None:
+    if profile["m"] is None and profile["ef_construct"] is None:
+        return None
+    return HnswConfigDiff(m=profile["m"], ef_construct=profile["ef_construct"])
+
+
+def collection_params(profile: dict) -> dict:
+    """Keyword arguments for QdrantClient.create_collection."""
+    return {
+        "vectors_config": VectorParams(
+            size=EMBEDDING_DIM, distance=Distance.COSINE, on_disk=profile["on_disk"] or None
+        ),
+        "hnsw_config": _hnsw_config(profile),
+        "quantization_config": _quantization_config(profile),
+    }
+
+
+def search_params(profile: dict) -> SearchParams | None:
+    """``search_params`` for query_points, or None for Qdrant's defaults."""
+    quantization = None
+    if profile["quantization"]:
+        quantization = QuantizationSearchParams(
+            rescore=profile["rescore"], oversampling=profile["oversampling"]
+        )
+    if profile["ef"] is None and quantization is None:
+        return None
+    return SearchParams(hnsw_ef=profile["ef"], quantization=quantization)
+
+
+def estimated_ram_mb(profile: dict, vectors: int, dim: int = EMBEDDING_DIM) -> float:
+    """Rough resident size of a collection: vectors kept in RAM plus the
+    HNSW level-0 links (2m per node). Payloads are not counted."""
+    in_ram = 0 if profile["on_disk"] else vectors * dim * 4
+    if profile["quantization"] == "int8":
+        in_ram += vectors * dim
+    elif profile["quantization"] == "binary":
+        in_ram += vectors * dim / 8
+    links = vectors * 2 * (profile["m"] or 16) * 4
+    return (in_ram + links) / 2**20
@@ -1,13 +1,78 @@
 """
 Qdrant vector database client – manages collections and vector operations.
+
+Job search can be served by another backend, selected with VECTOR_BACKEND:
+  qdrant  (default) – query the Qdrant 'jobs' collection
+  local             – in-process NumPy index (utils/vector_index.py), rebuilt
+                      from Qdrant after every job fetch
+Qdrant stays the source of truth for job and resume vectors either way.
+
+With the local backend, a process whose index is missing or belongs to
+another job version serves searches from Qdrant meanwhile. It picks up
+an index published by the fetching process (JOB_INDEX_DIR), or, if none
+appears within JOB_INDEX_REBUILD_DELAY seconds of a version switch,
+rebuilds one itself from Qdrant in a background thread – one rebuild at
+a time per process, retried at most every JOB_INDEX_RETRY_SECS.
+
+Job vectors live in the collection named after the active job version
+(utils/job_versions.py). Job functions take an optional ``version`` to
+pin one snapshot; the QDRANT_JOBS_ALIAS alias follows the active version
+for tools outside the app.
+
+Job points carry the posting's ``country`` code in a keyword payload
+index (a tenant index, so Qdrant co-locates each country's points), and
+job searches can be restricted to one country.
+
+Job payloads also hold every field the /api/jobs listing shows
+(models.job.listing_payload), so with JOBS_READ_MODE=payload a page of
+matches is served from search results and get_job_payloads without a
+MongoDB round trip.
+
+Collections are created with the storage profile of QDRANT_JOB_PROFILE or
+QDRANT_RESUME_PROFILE (quantization, HNSW, on-disk vectors –
+utils/qdrant_profiles.py), and job searches use its search parameters.
 """
 
 import os
 import hashlib
+import threading
+import time
+import numpy as np
 from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
-
-EMBEDDING_DIM = 384  # all-MiniLM-L6-v2 output size
+from qdrant_client.models import (
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    Disabled,
+    FieldCondition,
+    Filter,
+    HnswConfigDiff,
+    KeywordIndexParams,
+    KeywordIndexType,
+    MatchValue,
+    PointIdsList,
+    PointStruct,
+    SetPayload,
+    SetPayloadOperation,
+    VectorParamsDiff,
+)
+from utils.bulk_writes import QDRANT_UPSERT_BATCH, QDRANT_UPSERT_WAIT, chunked, with_retries
+from utils.job_versions import active_job_version
+from utils.match_cache import invalidate_user
+from utils.qdrant_profiles import (
+    JOB_PROFILE,
+    RESUME_PROFILE,
+    collection_params,
+    search_params,
+)
+from utils.vector_index import JobVectorIndex, get_job_index, publish_job_index
+from utils.embedding import EMBEDDING_DIM
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "qdrant").lower()
+QDRANT_JOBS_ALIAS = os.getenv("QDRANT_JOBS_ALIAS", "jobs_current")
+JOB_SEARCH_PARAMS = search_params(JOB_PROFILE)
+JOB_INDEX_REBUILD_DELAY = float(os.getenv("JOB_INDEX_REBUILD_DELAY", "60"))  # seconds
+JOB_INDEX_RETRY_SECS = float(os.getenv("JOB_INDEX_RETRY_SECS", "60"))
 
 _client = None
 
@@ -33,16 +98,78 @@ def ensure_collections():
     """Create Qdrant collections if they don't already exist."""
     client = get_qdrant()
 
-    for name in ("resumes", "jobs"):
-        if not client.collection_exists(name):
-            client.create_collection(
-                collection_name=name,
-                vectors_config=VectorParams(
-                    size=EMBEDDING_DIM,
-                    distance=Distance.COSINE,
-                ),
-            )
-            print(f"Created Qdrant collection: {name}")
+    if not client.collection_exists("resumes"):
+        _create_collection("resumes", RESUME_PROFILE)
+
+    jobs = active_job_version()
+    if not client.collection_exists(jobs):
+        create_job_collection(jobs)
+    else:
+        _ensure_country_index(jobs)
+
+
+def _create_collection(name: str, profile: dict):
+    get_qdrant().create_collection(collection_name=name, **collection_params(profile))
+    print(f"Created Qdrant collection: {name}")
+
+
+def create_job_collection(name: str):
+    """Create an empty job collection with its payload indexes."""
+    _create_collection(name, JOB_PROFILE)
+    _ensure_country_index(name)
+
+
+def apply_collection_profile(name: str, profile: dict):
+    """Change an existing collection's storage to ``profile``. Qdrant
+    rebuilds its index and quantized vectors in the background; searches
+    keep working meanwhile."""
+    params = collection_params(profile)
+    get_qdrant().update_collection(
+        collection_name=name,
+        vectors_config={"": VectorParamsDiff(on_disk=profile["on_disk"])},
+        # Unset fields go back to Qdrant's defaults rather than staying as they were
+        hnsw_config=HnswConfigDiff(m=profile["m"] or 16, ef_construct=profile["ef_construct"] or 100),
+        quantization_config=params["quantization_config"] or Disabled.DISABLED,
+    )
+    print(f"Applied Qdrant profile to {name}: {profile}")
+
+
+def _ensure_country_index(name: str):
+    client = get_qdrant()
+    schema = client.get_collection(name).payload_schema or {}
+    if "country" not in schema:
+        client.create_payload_index(
+            collection_name=name,
+            field_name="country",
+            field_schema=KeywordIndexParams(type=KeywordIndexType.KEYWORD, is_tenant=True),
+        )
+
+
+def count_job_vectors(version: str | None = None) -> int:
+    return get_qdrant().count(collection_name=version or active_job_version(), exact=True).count
+
+
+def point_jobs_alias(version: str):
+    """Repoint QDRANT_JOBS_ALIAS at ``version`` in one atomic request."""
+    client = get_qdrant()
+    operations = [
+        CreateAliasOperation(
+            create_alias=CreateAlias(collection_name=version, alias_name=QDRANT_JOBS_ALIAS)
+        )
+    ]
+    if any(a.alias_name == QDRANT_JOBS_ALIAS for a in client.get_aliases().aliases):
+        operations.insert(
+            0, DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=QDRANT_JOBS_ALIAS))
+        )
+    client.update_collection_aliases(change_aliases_operations=operations)
+
+
+def drop_job_collection(version: str):
+    """Drop a retired (or failed) version's collection."""
+    client = get_qdrant()
+    if client.collection_exists(version):
+        client.delete_collection(version)
+        print(f"Dropped Qdrant collection: {version}")
 
 
 def upsert_resume_vector(clerk_id: str, embedding: list[float]):
@@ -53,28 +180,102 @@ def upsert_resume_vector(clerk_id: str, embedding: list[float]):
         points=[
             PointStruct(
                 id=_stable_int_id(clerk_id),
-                vector=embedding,
+                vector=_as_list(embedding),
                 payload={"clerk_id": clerk_id},
             )
         ],
     )
+    # The user's cached ranked job list was built from the old vector
+    invalidate_user(clerk_id)
 
 
-def upsert_job_vector(job_id: str, embedding: list[float], title: str = ""):
+def upsert_job_vector(job_id: str, embedding: list[float], title: str = "",
+                      version: str | None = None):
     """Store or update a job's embedding in Qdrant."""
     client = get_qdrant()
     client.upsert(
-        collection_name="jobs",
+        collection_name=version or active_job_version(),
         points=[
             PointStruct(
                 id=_stable_int_id(job_id),
-                vector=embedding,
+                vector=_as_list(embedding),
                 payload={"job_id": job_id, "title": title},
             )
         ],
     )
 
 
+def upsert_job_vectors(jobs: list[tuple], version: str | None = None,
+                       batch_size: int = QDRANT_UPSERT_BATCH,
+                       wait: bool = QDRANT_UPSERT_WAIT) -> int:
+    """Store ``(job_id, embedding, payload)`` triples in multi-point
+    upserts; ``payload`` is a dict of listing fields (listing_payload).
+
+    With ``wait=False`` batches are only acknowledged, and the last batch
+    is sent with ``wait=True``. Qdrant applies a collection's updates in
+    order, so when it returns every batch is searchable.
+    """
+    client = get_qdrant()
+    collection = version or active_job_version()
+    batches = list(chunked(jobs, batch_size))
+    for i, batch in enumerate(batches):
+        points = [
+            PointStruct(
+                id=_stable_int_id(job_id),
+                vector=_as_list(embedding),
+                payload={"job_id": job_id, **payload},
+            )
+            for job_id, embedding, payload in batch
+        ]
+        barrier = wait or i == len(batches) - 1
+        with_retries(
+            lambda: client.upsert(collection_name=collection, points=points, wait=barrier),
+            f"Qdrant upsert of {len(points)} points",
+        )
+    return len(jobs)
+
+
+def set_job_payloads(payloads: dict, version: str | None = None,
+                     batch_size: int = QDRANT_UPSERT_BATCH) -> int:
+    """Merge fields into the payloads of existing job points
+    (``{job_id: {field: value}}``), batch_size points per request."""
+    client = get_qdrant()
+    collection = version or active_job_version()
+    items = list(payloads.items())
+    for batch in chunked(items, batch_size):
+        operations = [
+            SetPayloadOperation(
+                set_payload=SetPayload(payload=fields, points=[_stable_int_id(job_id)])
+            )
+            for job_id, fields in batch
+        ]
+        with_retries(
+            lambda: client.batch_update_points(
+                collection_name=collection, update_operations=operations
+            ),
+            f"Qdrant payload update of {len(operations)} points",
+        )
+    return len(items)
+
+
+def get_job_payloads(job_ids: list[str], version: str | None = None) -> dict:
+    """Payloads of the given jobs by job_id – a lookup in the local index
+    when it holds this version, else one Qdrant retrieve."""
+    if not job_ids:
+        return {}
+    version = version or active_job_version()
+    if VECTOR_BACKEND == "local":
+        index = _local_job_index(version)
+        if index is not None:
+            return index.get_payloads(job_ids)
+    points = get_qdrant().retrieve(
+        collection_name=version,
+        ids=[_stable_int_id(job_id) for job_id in job_ids],
+        with_payload=True,
+    )
+    return {point.payload["job_id"]: point.payload for point in points if point.payload}
+
+
 def get_resume_embedding(clerk_id: str) -> list[float] | None:
     """Retrieve a user's resume embedding from Qdrant. Returns None if not found."""
     client = get_qdrant()
@@ -92,37 +293,146 @@ def get_resume_embedding(clerk_id: str) -> list[float] | None:
     return None
 
 
-def flush_all_jobs():
-    """Delete ALL points from the jobs collection (used before a fresh fetch)."""
-    client = get_qdrant()
-    # Recreate the collection to clear all points efficiently
-    if client.collection_exists("jobs"):
-        client.delete_collection("jobs")
-    client.create_collection(
-        collection_name="jobs",
-        vectors_config=VectorParams(
-            size=EMBEDDING_DIM,
-            distance=Distance.COSINE,
-        ),
+def delete_job_vectors(job_ids: list[str], version: str | None = None):
+    """Remove the vectors of expired jobs."""
+    if not job_ids:
+        return
+    get_qdrant().delete(
+        collection_name=version or active_job_version(),
+        points_selector=PointIdsList(points=[_stable_int_id(j) for j in job_ids]),
     )
-    print("Flushed Qdrant 'jobs' collection")
 
 
-def search_similar_jobs(embedding: list[float], limit: int = 10):
+def search_similar_jobs(embedding: list[float], limit: int = 10, version: str | None = None,
+                        country: str | None = None):
     """Find jobs most similar to the given embedding vector.
     
     Always searches from offset=0. Pagination is handled in the caller
     by slicing the returned list, which avoids Qdrant's offset-capping issue.
+    Returned points expose ``.payload`` and ``.score`` for every backend.
+    ``country`` (a code such as "IN") restricts the search to that country.
     """
+    return _JOB_SEARCH_BACKENDS[VECTOR_BACKEND](
+        embedding, limit, version or active_job_version(), country
+    )
+
+
+def _search_qdrant(embedding, limit, version, country=None):
     client = get_qdrant()
     results = client.query_points(
-        collection_name="jobs",
-        query=embedding,
+        collection_name=version,
+        query=_as_list(embedding),
+        query_filter=_country_filter(country),
+        search_params=JOB_SEARCH_PARAMS,
         limit=limit,
     )
     return results.points
 
 
+def _search_local(embedding, limit, version, country=None):
+    index = _local_job_index(version)
+    if index is None:
+        return _search_qdrant(embedding, limit, version, country)
+    return index.search(embedding, limit, country=country)
+
+
+def _country_filter(country: str | None) -> Filter | None:
+    if not country:
+        return None
+    return Filter(must=[FieldCondition(key="country", match=MatchValue(value=country))])
+
+
+_JOB_SEARCH_BACKENDS = {
+    "qdrant": _search_qdrant,
+    "local": _search_local,
+}
+
+
+_rebuild_lock = threading.Lock()
+_rebuilding = False
+_retry_at = 0.0
+_waiting_for = None     # version with no local index yet
+_waiting_since = 0.0
+
+
+def _local_job_index(version: str) -> JobVectorIndex | None:
+    """The local index of ``version``, or None while there is none (the
+    caller asks Qdrant instead). Never builds on the calling thread."""
+    index = get_job_index()
+    if index is not None and index.version == version:
+        return index
+    # No index at all: bootstrap now. Outdated: give the fetching process
+    # time to publish the new one first.
+    _schedule_rebuild(version, delay=0.0 if index is None else JOB_INDEX_REBUILD_DELAY)
+    return None
+
+
+def _schedule_rebuild(version: str, delay: float):
+    """Start a background rebuild of ``version`` unless one is running,
+    the last one failed recently, or ``version`` is not ``delay`` old."""
+    global _rebuilding, _waiting_for, _waiting_since
+    now = time.monotonic()
+    with _rebuild_lock:
+        if _waiting_for != version:
+            _waiting_for, _waiting_since = version, now
+        if _rebuilding or now < _retry_at or now - _waiting_since < delay:
+            return
+        _rebuilding = True
+    threading.Thread(
+        target=_rebuild_in_background, args=(version,), name="job-index-rebuild", daemon=True
+    ).start()
+
+
+def _rebuild_in_background(version: str):
+    global _rebuilding, _retry_at
+    try:
+        rebuild_job_index(version=version)
+    except Exception as e:
+        print(f"Could not build local job index: {e}")
+        _retry_at = time.monotonic() + JOB_INDEX_RETRY_SECS
+    finally:
+        with _rebuild_lock:
+            _rebuilding = False
+
+
+def rebuild_job_index(batch_size: int = 512, version: str | None = None) -> JobVectorIndex:
+    """Snapshot every job vector in Qdrant into a new local index and
+    publish it atomically (readers keep the old one until the swap)."""
+    client = get_qdrant()
+    version = version or active_job_version()
+    job_ids, vectors, payloads = [], [], []
+
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=version,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        for point in points:
+            job_ids.append(point.payload.get("job_id"))
+            vectors.append(point.vector)
+            payloads.append(point.payload)
+        if offset is None:
+            break
+
+    index = JobVectorIndex(
+        job_ids,
+        np.asarray(vectors, dtype=np.float32).reshape(len(job_ids), EMBEDDING_DIM),
+        payloads,
+        version=version,
+    )
+    publish_job_index(index)
+    return index
+
+
+def _as_list(embedding) -> list[float]:
+    """Qdrant's client wants plain lists; embeddings arrive as NumPy arrays."""
+    return np.asarray(embedding, dtype=np.float32).tolist()
+
+
 def _stable_int_id(string_id: str) -> int:
     """Convert a string ID to a stable positive integer for Qdrant point IDs."""
     return int(hashlib.sha256(string_id.encode()).hexdigest()[:15], 16)
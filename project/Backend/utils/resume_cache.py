@@ -0,0 +1,95 @@
+"""
+Resume cache – content-addressed store of resume parsing results.
+
+Re-uploading the same PDF skips text extraction, SkillNer annotation and
+embedding. Entries live in MongoDB (shared by every worker) and are keyed
+by a SHA-256 of the PDF bytes together with the embedding model and
+backend actually in use (the model server's, when one is), the resume
+skill engine and the SkillNer version, so changing any of them silently
+invalidates old entries. Once
+RESUME_CACHE_MAX_ENTRIES is exceeded the least recently used entries are
+evicted.
+
+Schema (resume_cache collection):
+  _id           str          sha256(model | backend | engine | skillNer version | pdf)
+  text          str          Extracted resume text
+  skills        list[str]    Extracted skills
+  embedding     list[float]  Resume embedding
+  created_at    datetime
+  last_used_at  datetime
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+
+import numpy as np
+
+from database import get_db
+from utils.embedding import embedding_model_id
+from utils.nlp import skill_engine
+
+COLLECTION = "resume_cache"
+RESUME_CACHE_MAX_ENTRIES = int(os.getenv("RESUME_CACHE_MAX_ENTRIES", "1000"))
+
+
+def _skillner_version() -> str:
+    try:
+        return version("skillNer")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def _key_prefix() -> str:
+    # Resolved per call: the embedding backend is only known once the
+    # model (or the model server) has been asked
+    return f"{embedding_model_id()}|{skill_engine('resume')}|{_skillner_version()}|"
+
+
+def _collection():
+    return get_db()[COLLECTION]
+
+
+def ensure_resume_cache_indexes():
+    """Create indexes on first startup."""
+    _collection().create_index("last_used_at")
+
+
+def resume_cache_key(pdf_bytes: bytes) -> str:
+    digest = hashlib.sha256(pdf_bytes).hexdigest()
+    return hashlib.sha256((_key_prefix() + digest).encode()).hexdigest()
+
+
+def get_cached_resume(key: str) -> dict | None:
+    """Return ``{text, skills, embedding}`` for a known PDF, or None."""
+    doc = _collection().find_one_and_update(
+        {"_id": key},
+        {"$set": {"last_used_at": datetime.now(timezone.utc)}},
+        projection={"_id": 0, "text": 1, "skills": 1, "embedding": 1},
+    )
+    return doc
+
+
+def store_cached_resume(key: str, text: str, skills: list[str], embedding):
+    """Cache the parsing results for a PDF and evict the oldest entries."""
+    now = datetime.now(timezone.utc)
+    col = _collection()
+    col.update_one(
+        {"_id": key},
+        {
+            "$set": {
+                "text": text,
+                "skills": skills,
+                "embedding": np.asarray(embedding, dtype=np.float32).tolist(),
+                "last_used_at": now,
+            },
+            "$setOnInsert": {"created_at": now},
+        },
+        upsert=True,
+    )
+
+    excess = col.estimated_document_count() - RESUME_CACHE_MAX_ENTRIES
+    if excess > 0:
+        stale = col.find({}, {"_id": 1}).sort("last_used_at", 1).limit(excess)
+        col.delete_many({"_id": {"$in": [doc["_id"] for doc in stale]}})
@@ -0,0 +1,252 @@
+"""
+Resume pipeline – processes uploaded resumes on a bounded background
+worker pool so /api/parse-resume can return 202 immediately.
+
+Stages: the Cloudinary upload runs concurrently with text extraction,
+after which skill annotation and embedding also run side by side; the
+commit waits for all of them, so latency is roughly max(upload, NLP)
+rather than their sum. A PDF that was parsed before
+(utils/resume_cache.py) skips extraction, annotation and embedding.
+Each finished stage is recorded on the job (models/resume_job.py) for
+status polling and a timing breakdown is logged per job. Nothing
+user-visible changes until the final commit stage, which writes the
+Qdrant vector and the MongoDB profile together and only then deletes the
+previous resume from Cloudinary.
+
+RESUME_WORKERS bounds concurrent jobs and RESUME_QUEUE_DEPTH bounds how
+many more may wait, so an upload burst cannot starve the rest of the API.
+"""
+
+import io
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import cloudinary.uploader
+
+from models.resume_job import (
+    create_resume_job,
+    mark_resume_job_running,
+    mark_resume_stage_done,
+    complete_resume_job,
+    fail_resume_job,
+)
+from models.user import get_user_resume_public_id, update_user_resume
+from utils.embedding import generate_embedding
+from utils.nlp import get_skill_extractor, skills_from_annotations
+from utils.pdf_text import extract_pdf_text
+from utils.qdrant_store import get_resume_embedding, upsert_resume_vector
+from utils.resume_cache import (
+    resume_cache_key,
+    get_cached_resume,
+    store_cached_resume,
+)
+
+RESUME_WORKERS = int(os.getenv("RESUME_WORKERS", "2"))
+RESUME_QUEUE_DEPTH = int(os.getenv("RESUME_QUEUE_DEPTH", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=RESUME_WORKERS, thread_name_prefix="resume")
+# Side stages (Cloudinary upload, skill annotation) run here, concurrently
+# with the work on the job's own thread
+_stage_pool = ThreadPoolExecutor(
+    max_workers=RESUME_WORKERS * 2, thread_name_prefix="resume-stage"
+)
+# One slot per running or waiting job
+_slots = threading.BoundedSemaphore(RESUME_WORKERS + RESUME_QUEUE_DEPTH)
+
+
+def submit_resume(clerk_id: str, pdf_bytes: bytes) -> str | None:
+    """Queue an uploaded PDF for processing and return the job ID.
+
+    Returns None when the queue is full.
+    """
+    if not _slots.acquire(blocking=False):
+        return None
+
+    try:
+        job_id = create_resume_job(clerk_id)
+        _executor.submit(_run, job_id, clerk_id, pdf_bytes)
+    except Exception:
+        _slots.release()
+        raise
+    return job_id
+
+
+def _run(job_id: str, clerk_id: str, pdf_bytes: bytes):
+    try:
+        mark_resume_job_running(job_id)
+        resume_url, skills = _process(job_id, clerk_id, pdf_bytes)
+        complete_resume_job(job_id, resume_url, skills)
+    except Exception as e:
+        print(f"Resume job {job_id} failed: {e}")
+        try:
+            fail_resume_job(job_id, str(e))
+        except Exception:
+            pass
+    finally:
+        _slots.release()
+
+
+class _Stage:
+    """Context manager that times a stage and records it on the job."""
+
+    def __init__(self, job_id: str, name: str, timings: dict):
+        self.job_id = job_id
+        self.name = name
+        self.timings = timings
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            elapsed = time.perf_counter() - self.start
+            self.timings[self.name] = elapsed
+            mark_resume_stage_done(self.job_id, self.name, elapsed)
+        return False
+
+
+def _in_stage(job_id, name, timings, fn, *args):
+    with _Stage(job_id, name, timings):
+        return fn(*args)
+
+
+def _process(job_id: str, clerk_id: str, pdf_bytes: bytes) -> tuple[str, list[str]]:
+    started = time.perf_counter()
+    timings = {}
+
+    cache_key = resume_cache_key(pdf_bytes)
+
+    # ── Upload new resume to Cloudinary (overlaps with the NLP below) ───
+    upload_future = _stage_pool.submit(
+        _in_stage, job_id, "upload", timings, _upload, pdf_bytes
+    )
+
+    try:
+        # ── Reuse results for a PDF we've already parsed ───────────────
+        cached = _cache_lookup(cache_key)
+        if cached:
+            mark_resume_stage_done(job_id, "cache_hit", 0)
+            text, skills = cached["text"], cached["skills"]
+            resume_embedding = cached["embedding"]
+        else:
+            text, skills, resume_embedding = _analyse(job_id, pdf_bytes, timings)
+            _cache_store(cache_key, text, skills, resume_embedding)
+
+        upload_result = upload_future.result()
+    except Exception:
+        _discard_upload(upload_future)
+        raise
+
+    resume_url = upload_result["secure_url"]
+    resume_public_id = upload_result["public_id"]
+
+    try:
+        with _Stage(job_id, "commit", timings):
+            old_public_id = get_user_resume_public_id(clerk_id)
+            _commit(clerk_id, resume_url, resume_public_id, skills, resume_embedding)
+    except Exception:
+        # Nothing points at the new upload yet – don't leave it orphaned
+        _destroy(resume_public_id)
+        raise
+
+    # ── Delete old resume from Cloudinary (if any) ──────────────────────
+    if old_public_id and old_public_id != resume_public_id:
+        _destroy(old_public_id)
+
+    breakdown = " ".join(f"{name}={secs:.2f}s" for name, secs in timings.items())
+    print(
+        f"Resume job {job_id} done in {time.perf_counter() - started:.2f}s ({breakdown})"
+    )
+    return resume_url, skills
+
+
+def _analyse(job_id: str, pdf_bytes: bytes, timings: dict):
+    """Extract text, then run skill annotation and embedding side by side."""
+    skill_extractor = get_skill_extractor("resume")
+    if skill_extractor is None:
+        raise RuntimeError(
+            "Resume parsing is not available. Run setup_dependencies.py first."
+        )
+
+    # ── Extract skills ──────────────────────────────────────────────────
+    with _Stage(job_id, "extract", timings):
+        text = extract_pdf_text(pdf_bytes)
+
+    annotate_future = _stage_pool.submit(
+        _in_stage,
+        job_id,
+        "annotate",
+        timings,
+        lambda: sorted(skills_from_annotations(skill_extractor.annotate(text))),
+    )
+    try:
+        with _Stage(job_id, "embed", timings):
+            resume_embedding = generate_embedding(text)
+    except Exception:
+        annotate_future.cancel()
+        raise
+
+    return text, annotate_future.result(), resume_embedding
+
+
+def _upload(pdf_bytes: bytes) -> dict:
+    return cloudinary.uploader.upload(
+        io.BytesIO(pdf_bytes),
+        resource_type="raw",
+        folder="skillsbridge/resumes",
+        public_id=str(uuid.uuid4()),
+        format="pdf",
+        access_mode="public",
+        type="upload",
+    )
+
+
+def _discard_upload(upload_future):
+    """Cancel the upload, or wait for it and delete what it uploaded."""
+    if upload_future.cancel():
+        return
+    if upload_future.exception() is None:
+        _destroy(upload_future.result()["public_id"])
+
+
+def _cache_lookup(cache_key: str) -> dict | None:
+    # The cache is an optimisation – never fail an upload because of it
+    try:
+        return get_cached_resume(cache_key)
+    except Exception as e:
+        print(f"Resume cache lookup failed: {e}")
+        return None
+
+
+def _cache_store(cache_key, text, skills, resume_embedding):
+    try:
+        store_cached_resume(cache_key, text, skills, resume_embedding)
+    except Exception as e:
+        print(f"Resume cache store failed: {e}")
+
+
+def _commit(clerk_id, resume_url, resume_public_id, skills, resume_embedding):
+    """Write the vector and the profile; restore the old vector if the
+    profile write fails so both stores keep describing the same resume."""
+    previous_embedding = get_resume_embedding(clerk_id)
+
+    # Store vector in Qdrant for similarity search
+    upsert_resume_vector(clerk_id, resume_embedding)
+    try:
+        update_user_resume(clerk_id, resume_url, resume_public_id, skills)
+    except Exception:
+        if previous_embedding:
+            upsert_resume_vector(clerk_id, previous_embedding)
+        raise
+
+
+def _destroy(public_id: str):
+    try:
+        cloudinary.uploader.destroy(public_id, resource_type="raw")
+    except Exception:
+        pass
+
@@ -0,0 +1,157 @@
+"""
+Run lock – a MongoDB lease so only one process runs a background task.
+
+app.py starts the scheduler in every gunicorn worker and every replica,
+so each of them fires the midnight job fetch. Before running, a task
+takes a lease: one document per task in the run_locks collection
+
+    {_id: "job_fetch", owner: "<host>:<pid>:<nonce>", expires_at: ...,
+     acquired_at: ..., heartbeat_at: ...}
+
+Acquiring is a single upsert that only matches a free lease (missing,
+expired, or already ours). A second process either matches nothing and
+collides on the _id (DuplicateKeyError), or finds a live lease, and
+skips the run. While the task runs, a heartbeat thread pushes
+expires_at forward every RUN_LOCK_TTL_SECS / 3. If the holder dies, the
+lease lapses after at most RUN_LOCK_TTL_SECS and the next run can take
+it. A TTL index removes abandoned lease documents. Correctness depends
+only on the expires_at comparison, not on the TTL monitor.
+
+Leases compare wall-clock times from different hosts. Keep clock skew
+well below RUN_LOCK_TTL_SECS (NTP does that easily).
+"""
+
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import DuplicateKeyError
+
+from database import get_db
+
+RUN_LOCK_TTL_SECS = int(os.getenv("RUN_LOCK_TTL_SECS", "300"))
+
+COLLECTION = "run_locks"
+
+_indexes_ready = False
+
+
+def _collection():
+    return get_db()[COLLECTION]
+
+
+def ensure_run_lock_indexes():
+    """Create indexes on first startup."""
+    global _indexes_ready
+    if _indexes_ready:
+        return
+    _collection().create_index("expires_at", expireAfterSeconds=0)
+    _indexes_ready = True
+
+
+def process_id() -> str:
+    """Identifies this process in lease documents and run history."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class RunLock:
+    """Lease on ``name``, renewed by a heartbeat thread while held.
+
+        with RunLock("job_fetch") as lock:
+            if not lock.acquired:
+                return
+            ...
+
+    ``lost`` is set if a heartbeat finds the lease taken over (the holder
+    stalled for longer than the TTL). The task should treat that as a
+    failed run.
+    """
+
+    def __init__(self, name: str, ttl_secs: int = RUN_LOCK_TTL_SECS):
+        self.name = name
+        self.ttl = timedelta(seconds=max(3, ttl_secs))
+        self.owner = f"{process_id()}:{uuid.uuid4().hex[:8]}"
+        self.acquired = False
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._heartbeat = None
+
+    # ── Lease ───────────────────────────────────────────────────────────
+
+    def acquire(self) -> bool:
+        """Take the lease if it is free. Returns whether we hold it."""
+        ensure_run_lock_indexes()
+        now = datetime.now(timezone.utc)
+        try:
+            _collection().find_one_and_update(
+                {
+                    "_id": self.name,
+                    "$or": [{"expires_at": {"$lt": now}}, {"owner": self.owner}],
+                },
+                {
+                    "$set": {
+                        "owner": self.owner,
+                        "acquired_at": now,
+                        "heartbeat_at": now,
+                        "expires_at": now + self.ttl,
+                    }
+                },
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # The lease document exists and is live: someone else holds it
+            return False
+
+        self.acquired = True
+        self._heartbeat = threading.Thread(
+            target=self._beat, name=f"run-lock-{self.name}", daemon=True
+        )
+        self._heartbeat.start()
+        return True
+
+    def holder(self) -> dict | None:
+        """The current lease document, if any."""
+        return _collection().find_one({"_id": self.name})
+
+    def release(self):
+        if not self.acquired:
+            return
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+        _collection().delete_one({"_id": self.name, "owner": self.owner})
+        self.acquired = False
+
+    def _renew(self) -> bool:
+        now = datetime.now(timezone.utc)
+        result = _collection().update_one(
+            {"_id": self.name, "owner": self.owner},
+            {"$set": {"heartbeat_at": now, "expires_at": now + self.ttl}},
+        )
+        return result.matched_count == 1
+
+    def _beat(self):
+        interval = self.ttl.total_seconds() / 3
+        while not self._stop.wait(interval):
+            try:
+                if self._renew():
+                    continue
+                print(f"Run lock '{self.name}' was taken over by another process")
+                self.lost.set()
+                return
+            except Exception as e:
+                # Transient MongoDB error: try again next beat; the lease
+                # only lapses if every beat in a TTL fails
+                print(f"Run lock '{self.name}' heartbeat failed: {e}")
+
+    # ── Context manager ─────────────────────────────────────────────────
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
@@ -1,27 +1,166 @@
 """
 Background scheduler – runs fetch_jobs() every day at midnight (00:00)
 in a separate daemon thread so the main Flask thread is never blocked.
+Also backfills skills for jobs stored without them every
+SKILL_BACKFILL_INTERVAL_MINUTES, and (re)builds this process's skill
+index at startup and every SKILL_INDEX_TTL seconds.
+
+Every gunicorn worker and replica runs this scheduler, so both tasks
+take a MongoDB lease first (utils/run_lock.py) and only the process
+that gets it does the work. The others log the skip and wait for the
+next trigger. The skill index is per process, so it is built
+everywhere.
+
+Job fetches are recorded in the job_runs collection (models/job_run.py).
+A scheduled fetch also records its slot – the cron fire time it belongs
+to – under a unique index, so a replica whose trigger fires after the
+first run has finished and released the lease skips that slot instead
+of running it again. A run whose lease is lost (utils/run_lock.py)
+aborts at the next pipeline stage. The admin trigger
+(/api/admin/jobs/fetch) and run_fetch.py take the same lease.
 """
 
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from pymongo.errors import DuplicateKeyError
+
+from models.job_run import finish_job_run, start_job_run
+from utils.run_lock import RunLock, process_id
+
+JOB_FETCH_LOCK = "job_fetch"
+SKILL_BACKFILL_LOCK = "skill_backfill"
 
 _scheduler = BackgroundScheduler(daemon=True)
+_job_fetch_trigger = CronTrigger(hour=0, minute=0)   # every day at 00:00
 
 
-def _run_job_fetcher():
-    """Wrapper that imports and calls fetch_jobs at runtime
-    (avoids circular imports)."""
+# ── Locked job fetch ─────────────────────────────────────────────────────────
+
+def _begin_job_fetch(trigger: str, mode: str | None, requested_by: str | None,
+                     slot: datetime | None = None):
+    """Take the job-fetch lease and record the run. Returns (lock, run_id,
+    mode), or None if another process holds the lease or ``slot`` has
+    already been run."""
+    from utils.job_fetcher import JOB_SYNC_MODE
+
+    lock = RunLock(JOB_FETCH_LOCK)
+    if not lock.acquire():
+        holder = lock.holder() or {}
+        print(f"Job fetch ({trigger}) skipped - already running in {holder.get('owner')}")
+        return None
+
+    mode = mode or JOB_SYNC_MODE
+    try:
+        run_id = start_job_run(trigger, mode, process_id(), requested_by, slot)
+    except DuplicateKeyError:
+        lock.release()
+        print(f"Job fetch ({trigger}) skipped - slot {slot.isoformat()} already ran")
+        return None
+    except Exception:
+        lock.release()
+        raise
+    print(f"Job fetch {run_id} started ({trigger}, {mode})")
+    return lock, run_id, mode
+
+
+def _finish_job_fetch(lock: RunLock, run_id: str, mode: str):
+    """Run fetch_jobs under the lease, then record the outcome and release it."""
+    counts, error = None, None
     try:
         from utils.job_fetcher import fetch_jobs
 
-        print("Scheduled job-fetch started")
-        fetch_jobs()
-        print("Scheduled job-fetch completed")
+        # Stops at the next stage once the lease is lost
+        counts = fetch_jobs(mode=mode, abort=lock.lost)
+        if lock.lost.is_set():
+            error = "lock lost during the run (another process may have started one)"
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    finally:
+        try:
+            finish_job_run(run_id, counts, error)
+        finally:
+            lock.release()
+
+    if error:
+        print(f"Job fetch {run_id} failed: {error}")
+    else:
+        print(f"Job fetch {run_id} completed: {counts}")
+
+
+def run_job_fetch(trigger: str = "schedule", mode: str | None = None,
+                  requested_by: str | None = None, slot: datetime | None = None) -> str | None:
+    """Run a job fetch in this thread if no other process is running one
+    (and, for a scheduled run, nobody has run ``slot`` yet). Returns the
+    run ID, or None if it was skipped."""
+    begun = _begin_job_fetch(trigger, mode, requested_by, slot)
+    if begun is None:
+        return None
+    _finish_job_fetch(*begun)
+    return begun[1]
+
+
+def start_job_fetch(trigger: str = "manual", mode: str | None = None,
+                    requested_by: str | None = None) -> str | None:
+    """Take the lease now and run the fetch in a background thread.
+    Returns the run ID, or None if a fetch is already running."""
+    begun = _begin_job_fetch(trigger, mode, requested_by)
+    if begun is None:
+        return None
+    threading.Thread(
+        target=_finish_job_fetch, args=begun, name=f"job-fetch-{begun[1][:8]}", daemon=True
+    ).start()
+    return begun[1]
+
+
+# ── Scheduled tasks ──────────────────────────────────────────────────────────
+
+def _scheduled_slot(trigger: CronTrigger, now: datetime | None = None) -> datetime:
+    """The latest fire time of ``trigger`` at or before ``now`` (in UTC):
+    the slot a scheduled run belongs to, however late its trigger fired.
+    The trigger must fire at least daily."""
+    now = now or datetime.now(trigger.timezone)
+    slot, fire = None, trigger.get_next_fire_time(None, now - timedelta(days=1))
+    while fire is not None and fire <= now:
+        slot, fire = fire, trigger.get_next_fire_time(fire, fire + timedelta(seconds=1))
+    return slot.astimezone(timezone.utc)
+
+
+def _run_job_fetcher():
+    """Scheduled job fetch; skipped if another process is running one or
+    has already run this slot."""
+    try:
+        run_job_fetch("schedule", slot=_scheduled_slot(_job_fetch_trigger))
     except Exception as e:
         print(f"Scheduled job-fetch failed: {e}")
 
 
+def _run_skill_backfill():
+    """Wrapper that imports and calls backfill_job_skills at runtime."""
+    try:
+        from utils.skill_backfill import backfill_job_skills
+
+        with RunLock(SKILL_BACKFILL_LOCK) as lock:
+            if lock.acquired:
+                backfill_job_skills()
+    except Exception as e:
+        print(f"Scheduled skill backfill failed: {e}")
+
+
+def _run_skill_index_build():
+    """Wrapper that imports and calls build_skill_index at runtime."""
+    try:
+        from utils.skill_index import build_skill_index
+
+        build_skill_index()
+    except Exception as e:
+        print(f"Scheduled skill index build failed: {e}")
+
+
 def start_scheduler():
     """Register the cron job and start the background scheduler.
     Safe to call multiple times – will not start twice."""
@@ -30,10 +169,37 @@ def start_scheduler():
 
     _scheduler.add_job(
         _run_job_fetcher,
-        trigger=CronTrigger(hour=0, minute=0),   # every day at 00:00
+        trigger=_job_fetch_trigger,
         id="daily_job_fetch",
         name="Fetch jobs from JSearch API",
         replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+
+    _scheduler.add_job(
+        _run_skill_backfill,
+        trigger=IntervalTrigger(
+            minutes=int(os.getenv("SKILL_BACKFILL_INTERVAL_MINUTES", "15"))
+        ),
+        id="skill_backfill",
+        name="Backfill skills for jobs stored without them",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+
+    from utils.skill_index import SKILL_INDEX_TTL
+
+    _scheduler.add_job(
+        _run_skill_index_build,
+        trigger=IntervalTrigger(seconds=SKILL_INDEX_TTL),
+        next_run_time=datetime.now(),   # first build right away
+        id="skill_index_build",
+        name="Build the job skill index",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
     )
 
     _scheduler.start()
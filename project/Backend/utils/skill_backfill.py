@@ -0,0 +1,77 @@
+"""
+Skill backfill – extracts skills for jobs stored without a 'skills' field,
+in batches and off the request path, so /api/jobs never runs SkillNer.
+
+Progress (the _id of the last annotated job) is kept in the ingest_state
+collection, so an interrupted run resumes where it stopped. The marker is
+cleared once a pass reaches the end of the collection.
+"""
+
+import os
+from datetime import datetime, timezone
+
+from database import get_db
+from models.job import get_jobs_without_skills, set_job_skills
+from utils.qdrant_store import set_job_payloads
+from utils.nlp import get_skill_extractor, skills_by_id
+from utils.skill_index import refresh_skill_index
+
+BACKFILL_BATCH_SIZE = int(os.getenv("SKILL_BACKFILL_BATCH_SIZE", "20"))
+
+STATE_COLLECTION = "ingest_state"
+_MARKER_ID = "skill_backfill"
+
+
+def _state():
+    return get_db()[STATE_COLLECTION]
+
+
+def backfill_job_skills(batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """Annotate every job missing skills. Returns the number of jobs updated."""
+    skill_extractor = get_skill_extractor("ingest")
+    if skill_extractor is None:
+        print("Skill backfill skipped - SkillNer is not available")
+        return 0
+
+    marker = _state().find_one({"_id": _MARKER_ID}) or {}
+    last_id = marker.get("last_id")
+    if last_id is not None:
+        print(f"Resuming skill backfill after {last_id}")
+
+    updated = 0
+    while True:
+        batch = get_jobs_without_skills(after_id=last_id, limit=batch_size)
+        if not batch:
+            break
+
+        # A description that fails to annotate gets an empty list, so it
+        # isn't retried forever
+        job_skills = skills_by_id(
+            {doc["_id"]: doc.get("description") or "" for doc in batch}, site="ingest"
+        )
+        updated += set_job_skills(job_skills)
+        try:
+            # Keep the listing payload in step (JOBS_READ_MODE=payload)
+            set_job_payloads({
+                doc["job_id"]: {"skills": job_skills[doc["_id"]]}
+                for doc in batch
+                if doc["_id"] in job_skills and doc.get("description")
+            })
+        except Exception as e:
+            print(f"Skill backfill could not update job payloads: {e}")
+        last_id = batch[-1]["_id"]
+        _state().update_one(
+            {"_id": _MARKER_ID},
+            {"$set": {"last_id": last_id, "updated_at": datetime.now(timezone.utc)}},
+            upsert=True,
+        )
+
+    _state().update_one(
+        {"_id": _MARKER_ID},
+        {"$set": {"last_id": None, "completed_at": datetime.now(timezone.utc)}},
+        upsert=True,
+    )
+    if updated:
+        refresh_skill_index()
+    print(f"Skill backfill complete - {updated} jobs annotated")
+    return updated
@@ -0,0 +1,176 @@
+"""
+Skill index – integer skill IDs for fast missing-skill and overlap maths.
+
+A vocabulary built from SkillNer's SKILL_DB surface forms plus every skill
+seen on an ingested job maps skill strings to integer IDs. IDs follow the
+alphabetical order of the skills, so a sorted ID array decodes straight to
+a sorted skill list.
+
+Job skills are stored once per process as sorted int arrays in CSR form
+(``indptr`` / ``indices``). A user's skills become a boolean mask over the
+vocabulary, after which "missing skills" and the skill-overlap score for
+a page are plain NumPy gathers – no per-request set building or string
+hashing. The overlap is only reported (skill_match); it does not re-rank
+the vector matches.
+
+The index is never built on the request path. The scheduler builds it at
+startup and every SKILL_INDEX_TTL seconds (utils/scheduler.py), and a
+process serving an index rebuilds it right after its own job fetch or
+skill backfill. Until the first build finishes, get_skill_index()
+returns None and /api/jobs compares the page's stored skills directly.
+SKILL_DB (imported from SkillNer, which may download it) is only loaded
+by these builds.
+"""
+
+import os
+import threading
+
+import numpy as np
+
+from models.job import get_all_job_skills
+from utils import model_client
+
+SKILL_INDEX_TTL = int(os.getenv("SKILL_INDEX_TTL", "600"))  # seconds
+
+_skill_db_forms: set[str] | None = None
+
+
+def skill_db_surface_forms() -> set[str]:
+    """Lower-cased surface forms from SkillNer's SKILL_DB."""
+    from skillNer.general_params import SKILL_DB
+
+    forms = set()
+    for entry in SKILL_DB.values():
+        forms.update(v.lower() for v in entry.get("high_surfce_forms", {}).values())
+        forms.update(f.lower() for f in entry.get("low_surface_forms", []))
+    return forms
+
+
+def _skill_db_surface_forms() -> set[str]:
+    """SKILL_DB surface forms, loaded once (from the model server if used)."""
+    global _skill_db_forms
+    if _skill_db_forms is None:
+        forms = set()
+        try:
+            if model_client.model_server_enabled():
+                forms = model_client.skill_surface_forms()
+            else:
+                forms = skill_db_surface_forms()
+        except Exception as e:
+            print(f"SKILL_DB unavailable, skill vocabulary uses job skills only: {e}")
+        _skill_db_forms = forms
+    return _skill_db_forms
+
+
+class SkillVocabulary:
+    """Bidirectional skill <-> integer ID mapping (IDs in sorted order)."""
+
+    def __init__(self, skills):
+        self.skills = sorted(set(skills))
+        self.ids = {skill: i for i, skill in enumerate(self.skills)}
+
+    def __len__(self):
+        return len(self.skills)
+
+    def encode(self, skills) -> np.ndarray:
+        """Sorted unique IDs of the known skills (unknown ones are dropped)."""
+        ids = {self.ids[s] for s in skills if s in self.ids}
+        return np.fromiter(sorted(ids), dtype=np.int32, count=len(ids))
+
+    def mask(self, skills) -> np.ndarray:
+        """Boolean membership mask over the whole vocabulary."""
+        mask = np.zeros(len(self.skills), dtype=bool)
+        mask[self.encode(skills)] = True
+        return mask
+
+    def decode(self, ids) -> list[str]:
+        return [self.skills[i] for i in ids]
+
+
+class JobSkillIndex:
+    """Per-job skill IDs in CSR layout, aligned with ``job_ids``."""
+
+    def __init__(self, jobs: dict[str, list[str]], extra_skills=()):
+        self.vocab = SkillVocabulary(
+            set(extra_skills).union(*jobs.values()) if jobs else set(extra_skills)
+        )
+        self.job_ids = list(jobs)
+        self.rows = {job_id: i for i, job_id in enumerate(self.job_ids)}
+
+        encoded = [self.vocab.encode(jobs[job_id]) for job_id in self.job_ids]
+        lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+        self.indptr = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.indptr[1:])
+        self.indices = (
+            np.concatenate(encoded) if encoded else np.zeros(0, dtype=np.int32)
+        )
+
+    def compare(self, job_ids, user_skills, limit: int | None = None):
+        """Missing skills and overlap score for a page of jobs at once.
+
+        Returns ``{job_id: (missing_skills, overlap)}`` for the jobs known to
+        the index; ``missing_skills`` is alphabetical and cut to ``limit``.
+        """
+        known = [job_id for job_id in job_ids if job_id in self.rows]
+        if not known:
+            return {}
+
+        rows = np.fromiter((self.rows[j] for j in known), dtype=np.int64, count=len(known))
+        starts, ends = self.indptr[rows], self.indptr[rows + 1]
+        lengths = ends - starts
+
+        # Gather the page's CSR segments into one flat array
+        page_offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        values = self.indices[page_offsets + np.arange(lengths.sum())]
+        page_rows = np.repeat(np.arange(len(known)), lengths)
+
+        has = self.vocab.mask(user_skills)[values]
+        matched = np.bincount(page_rows, weights=has, minlength=len(known))
+        overlap = np.divide(
+            matched, lengths, out=np.zeros(len(known)), where=lengths > 0
+        )
+
+        missing_values, missing_rows = values[~has], page_rows[~has]
+        bounds = np.searchsorted(missing_rows, np.arange(len(known) + 1))
+
+        result = {}
+        for i, job_id in enumerate(known):
+            ids = missing_values[bounds[i] : bounds[i + 1]]
+            if limit is not None:
+                ids = ids[:limit]
+            result[job_id] = (self.vocab.decode(ids), float(overlap[i]))
+        return result
+
+
+# ── Process-wide index ───────────────────────────────────────────────────────
+
+_index: JobSkillIndex | None = None
+_build_lock = threading.Lock()
+
+
+def get_skill_index() -> JobSkillIndex | None:
+    """Return the job skill index, or None if it hasn't been built yet."""
+    return _index
+
+
+def build_skill_index() -> JobSkillIndex:
+    """Build the index from the live jobs (plus SKILL_DB) and swap it in."""
+    global _index
+    with _build_lock:
+        jobs = {doc["job_id"]: doc.get("skills") or [] for doc in get_all_job_skills()}
+        _index = JobSkillIndex(jobs, extra_skills=_skill_db_surface_forms())
+        print(f"Skill index built ({len(jobs)} jobs, {len(_index.vocab)} skills)")
+        return _index
+
+
+def refresh_skill_index():
+    """Rebuild now if this process serves an index (the jobs changed).
+
+    Processes that never built one (run_fetch.py) skip the work."""
+    if _index is None:
+        return
+    try:
+        build_skill_index()
+    except Exception as e:
+        # The previous index keeps serving until the next scheduled build
+        print(f"Skill index rebuild failed: {e}")
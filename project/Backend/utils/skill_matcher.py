@@ -0,0 +1,310 @@
+"""
+Skill matcher – a fast replacement for SkillNer's ``annotate``.
+
+SkillNer runs the full spaCy pipeline (parser and NER included) five
+times per document – once per PhraseMatcher – and scores overlapping
+n-gram candidates with dense token x skill matrices. This matcher
+compiles every SKILL_DB surface form into token tries once, then per
+document:
+
+  1. cleans and lower-cases the text exactly like SkillNer,
+  2. runs spaCy once with only the components lemmas need
+     (tok2vec, tagger, attribute_ruler, lemmatizer) and Porter-stems each
+     token,
+  3. walks the tries from every token (linear in the text length – skill
+     names are at most a handful of tokens long),
+  4. resolves overlapping candidates with SkillNer's span/conflict rules.
+
+The result has the same shape as ``SkillExtractor.annotate``:
+``{"text": ..., "results": {"full_matches": [...], "ngram_scored": [...]}}``
+so callers (and skills_from_annotations) don't care which engine ran.
+bench_skill_matcher.py measures agreement with SkillNer.
+"""
+
+from functools import lru_cache
+
+# Components the lemmatizer depends on; parser/ner/senter are skipped
+LEMMA_PIPES = ("tok2vec", "tagger", "attribute_ruler", "lemmatizer")
+SCORE_THRESHOLD = 0.5
+LATE_MATCH_PENALTY = 0.1
+
+
+class _Trie:
+    """Token trie: each node is a dict, skill IDs sit under the None key."""
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, tokens: list[str], skill_id: str):
+        node = self.root
+        for token in tokens:
+            node = node.setdefault(token, {})
+        ids = node.setdefault(None, [])
+        if skill_id not in ids:
+            ids.append(skill_id)
+
+    def find_all(self, tokens: list[str]):
+        """Yield (skill_id, start, end) for every (overlapping) match."""
+        for start in range(len(tokens)):
+            node = self.root
+            for end in range(start, len(tokens)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                for skill_id in node.get(None, ()):
+                    yield skill_id, start, end + 1
+
+
+class _Doc:
+    """Per-document token views, mirroring skillNer.text_class.Text."""
+
+    def __init__(self, text: str, words: list[str], cased: list[str], lemmas: list[str],
+                 stems: list[str], matchable: list[bool]):
+        self.text = text
+        self.words = words
+        self.cased = cased  # original-case words, reported for abbreviations
+        self.lemmas = lemmas
+        self.stems = stems
+        self.matchable = matchable
+
+
+class SkillMatcher:
+    _TRIES = ("full", "abv", "full_uni", "low_form", "token")
+
+    def __init__(self, nlp, skills_db: dict, state: dict | None = None):
+        """Compile SKILL_DB, or restore the tries from ``state()`` output
+        (utils/nlp_snapshot.py) without re-tokenising every form."""
+        from nltk.stem import PorterStemmer
+        from skillNer.cleaner import Cleaner
+        from skillNer.general_params import S_GRAM_REDUNDANT
+
+        self.nlp = nlp
+        self.skills_db = skills_db
+        self._cleaner = Cleaner(
+            include_cleaning_functions=["remove_punctuation", "remove_extra_space"],
+            to_lowercase=False,
+        )
+        self._stem = lru_cache(maxsize=65536)(PorterStemmer().stem)
+        self._stop_words = nlp.Defaults.stop_words
+        self._redundant = [phrase.split(" ") for phrase in S_GRAM_REDUNDANT]
+        self._lemma_pipes = [
+            proc for name, proc in nlp.pipeline if name in LEMMA_PIPES
+        ]
+
+        self.full = _Trie()       # multi-token full names, on lemmas
+        self.abv = _Trie()        # abbreviations, on lower-cased words
+        self.full_uni = _Trie()   # single-token full names, on words
+        self.low_form = _Trie()   # low surface forms, on stems
+        self.token = _Trie()      # single tokens of match_on_tokens skills, on lemmas
+        self._skill_tokens = {}
+        if state is not None:
+            for name in self._TRIES:
+                getattr(self, name).root = state["tries"][name]
+            self._skill_tokens = state["skill_tokens"]
+            return
+        for skill_id, entry in skills_db.items():
+            self._add_skill(skill_id, entry)
+
+    def state(self) -> dict:
+        """The compiled tries, as plain picklable dicts."""
+        return {
+            "tries": {name: getattr(self, name).root for name in self._TRIES},
+            "skill_tokens": self._skill_tokens,
+        }
+
+    def _tokens(self, form: str) -> list[str]:
+        return [t.lower_ for t in self.nlp.make_doc(form)]
+
+    def _add_skill(self, skill_id: str, entry: dict):
+        forms = entry["high_surfce_forms"]
+        full = forms["full"]
+        self._skill_tokens[skill_id] = full.split(" ")
+        if entry["skill_len"] > 1:
+            self.full.add(self._tokens(full), skill_id)
+        elif entry["skill_len"] == 1:
+            self.full_uni.add(self._tokens(full), skill_id)
+        if "abv" in forms:
+            self.abv.add(self._tokens(forms["abv"]), skill_id)
+        for form in entry["low_surface_forms"]:
+            self.low_form.add(self._tokens(form), skill_id)
+        if entry["match_on_tokens"]:
+            for token in full.split(" "):
+                if not token.isdigit():
+                    self.token.add(self._tokens(token), skill_id)
+
+    # ── Document preparation ────────────────────────────────────────────
+
+    def clean(self, text: str) -> str:
+        return self._cleaner(text).lower()
+
+    def _prepare(self, text: str, doc=None) -> _Doc:
+        """Build the token views; ``doc`` is an already-lemmatised spaCy Doc
+        of ``clean(text)`` (from nlp.pipe), otherwise one is made here."""
+        raw = self._cleaner(text)
+        cleaned = raw.lower()
+        if doc is None:
+            doc = self.nlp.make_doc(cleaned)
+            for proc in self._lemma_pipes:
+                doc = proc(doc)
+
+        words = [t.text for t in doc]
+        if len(raw) == len(cleaned):
+            cased = [raw[t.idx : t.idx + len(t.text)] for t in doc]
+        else:
+            cased = words
+        lemmas = [t.lemma_ or t.text for t in doc]
+        stems = [self._stem(w) for w in words]
+        matchable = [w not in self._stop_words for w in words]
+
+        # Frequent filler phrases ("years of", "ability to") – first hit only,
+        # like skillNer.cleaner.find_index_phrase
+        for phrase in self._redundant:
+            n = len(phrase)
+            for i in range(len(words) - n + 1):
+                if words[i : i + n] == phrase:
+                    for k in range(i, i + n):
+                        matchable[k] = False
+                    break
+
+        return _Doc(cleaned, words, cased, lemmas, stems, matchable)
+
+    # ── Matching ────────────────────────────────────────────────────────
+
+    def annotate(self, text: str, tresh: float = SCORE_THRESHOLD, doc=None) -> dict:
+        d = self._prepare(text, doc)
+        lowered_lemmas = [l.lower() for l in d.lemmas]
+        lowered_words = [w.lower() for w in d.words]
+
+        full_matches = []
+        for skill_id, start, end in self.full.find_all(lowered_lemmas):
+            full_matches.append({
+                "skill_id": skill_id,
+                "doc_node_value": " ".join(d.lemmas[start:end]),
+                "score": 1,
+                "doc_node_id": list(range(start, end)),
+            })
+            for k in range(start, end):
+                d.matchable[k] = False
+
+        for skill_id, start, end in self.abv.find_all(lowered_words):
+            if d.matchable[start]:
+                full_matches.append({
+                    "skill_id": skill_id,
+                    "score": 1,
+                    "doc_node_value": " ".join(d.cased[start:end]),
+                    "doc_node_id": [start],
+                })
+                for k in range(start, end):
+                    d.matchable[k] = False
+
+        candidates = []
+        for skill_id, start, end in self.token.find_all(lowered_lemmas):
+            if d.matchable[start]:
+                candidates.append((skill_id, "oneToken", [start]))
+        for skill_id, start, end in self.low_form.find_all(d.stems):
+            if d.matchable[start]:
+                candidates.append((skill_id, "lowSurf", list(range(start, end))))
+        for skill_id, start, end in self.full_uni.find_all(lowered_words):
+            if d.matchable[start]:
+                candidates.append((skill_id, "fullUni", [start]))
+
+        scored = self._resolve(candidates, d)
+        return {
+            "text": d.text,
+            "results": {
+                "full_matches": full_matches,
+                "ngram_scored": [m for m in scored if m["score"] >= tresh],
+            },
+        }
+
+    # ── Conflict resolution (skillNer.utils.Utils.process_n_gram) ──────
+
+    def _resolve(self, candidates, d: _Doc) -> list[dict]:
+        if not candidates:
+            return []
+
+        # Token positions per (skill, type) across the whole document
+        positions = {}
+        for skill_id, type_, ids in candidates:
+            positions.setdefault((skill_id, type_), set()).update(ids)
+
+        by_token = {}
+        for key, tokens in positions.items():
+            for t in tokens:
+                by_token.setdefault(t, []).append(key)
+
+        # A span is the run of consecutive tokens around t that co-occur
+        # with t in some candidate
+        spans = []
+        seen = set()
+        for t in sorted(by_token):
+            co_occurring = set()
+            for key in by_token[t]:
+                co_occurring |= positions[key]
+            lo = hi = t
+            while lo - 1 in co_occurring:
+                lo -= 1
+            while hi + 1 in co_occurring:
+                hi += 1
+            span = (lo, hi)
+            if span not in seen:
+                seen.add(span)
+                spans.append(span)
+
+        results = []
+        for lo, hi in spans:
+            keys = {key for t in range(lo, hi + 1) for key in by_token.get(t, ())}
+            options = [
+                self._score(skill_id, type_, sorted(t for t in positions[(skill_id, type_)] if lo <= t <= hi), d)
+                for skill_id, type_ in sorted(keys)
+            ]
+            results.append(self._pick(options))
+        return results
+
+    def _score(self, skill_id: str, type_: str, tokens: list[int], d: _Doc) -> dict:
+        skill_len = self.skills_db[skill_id]["skill_len"]
+        if type_ == "oneToken":
+            name = self._skill_tokens[skill_id]
+            score = sum(
+                1 - LATE_MATCH_PENALTY * name.index(d.lemmas[t])
+                for t in tokens
+                if d.lemmas[t] in name
+            ) / skill_len
+        elif type_ == "fullUni":
+            score = 1
+        elif skill_len > 1:
+            score = len(tokens)
+        else:
+            score = self._one_gram_sim(
+                " ".join(d.words[t] for t in tokens),
+                self.skills_db[skill_id]["high_surfce_forms"]["full"],
+            )
+        return {
+            "skill_id": skill_id,
+            "doc_node_id": tokens,
+            "doc_node_value": " ".join(d.words[t] for t in tokens),
+            "type": type_,
+            "score": score,
+            "len": len(tokens),
+        }
+
+    @staticmethod
+    def _pick(options: list[dict]) -> dict:
+        types = {o["type"] for o in options}
+        best = max(range(len(options)), key=lambda i: options[i]["score"])
+        if "oneToken" in types and len(types) > 1:
+            # Prefer an n-gram skill matched on several tokens
+            for i, o in enumerate(options):
+                if o["len"] > 1 and o["type"] == "oneToken" and o["score"] >= SCORE_THRESHOLD:
+                    best = i
+        return options[best]
+
+    def _one_gram_sim(self, text_str: str, skill_str: str) -> float:
+        a = self.nlp.vocab[text_str.split(" ")[0]]
+        b = self.nlp.vocab[skill_str.split(" ")[0]]
+        if a.has_vector and b.has_vector:
+            return float(a.similarity(b))
+        import jellyfish
+
+        jaro = getattr(jellyfish, "jaro_similarity", None) or jellyfish.jaro_distance
+        return jaro(text_str.lower(), skill_str.lower())
@@ -1,7 +1,8 @@
 """
 STT Service using Faster-Whisper (local, no Google/network dependency).
 
-The model is lazy-loaded on first use.
+The model is lazy-loaded on first use – or, when MODEL_SERVER_URL is set,
+lives in the model server (model_server.py) and is never loaded here.
 Model size is controlled by the WHISPER_MODEL env var (default: tiny.en).
   tiny.en  ~75 MB  — fastest, English-only
   base     ~145 MB — slightly better accuracy, multilingual
@@ -11,18 +12,20 @@ import os
 import tempfile
 import threading
 
-from faster_whisper import WhisperModel
+from utils import model_client
 
-_model: WhisperModel | None = None
+_model = None
 _lock = threading.Lock()
 
 
-def _get_model() -> WhisperModel:
+def _get_model():
     """Lazy-load and cache the Whisper model (thread-safe)."""
     global _model
     if _model is None:
         with _lock:
             if _model is None:
+                from faster_whisper import WhisperModel
+
                 model_size = os.getenv("WHISPER_MODEL", "tiny.en")
                 # Use CPU with int8 quantisation for low memory usage.
                 # Change to "cuda" if a GPU is available.
@@ -47,6 +50,9 @@ def transcribe_audio(audio_bytes: bytes, suffix: str = ".webm") -> str:
         Transcribed text, stripped of leading/trailing whitespace.
         Returns an empty string if no speech was detected.
     """
+    if model_client.model_server_enabled():
+        return model_client.transcribe(audio_bytes, suffix)
+
     model = _get_model()
 
     # Faster-Whisper requires a file path, not a buffer.
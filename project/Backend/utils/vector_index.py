@@ -0,0 +1,227 @@
+"""
+In-process job vector index – a NumPy alternative to asking Qdrant for
+every job search.
+
+All job embeddings live in one contiguous, L2-normalised float32 matrix,
+so cosine similarity is a single matrix-vector product and the top-k is
+picked with argpartition. At MAX_JOBS (and far beyond) the matrix is a
+few MB, so this is much cheaper than a network round trip.
+
+The index is published to JOB_INDEX_DIR as a versioned ``.npy`` matrix
+plus a JSON sidecar (job IDs and payloads). A small ``CURRENT`` pointer
+file is swapped with os.replace, so readers – including other worker
+processes – always load a complete snapshot. Set JOB_INDEX_MMAP=1 to
+memory-map the matrix instead of copying it into each process.
+
+Rows are kept grouped by the payload's ``country``, so a search restricted
+to one country scores a contiguous slice (a view, not a copy) of the
+matrix instead of every job.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+import numpy as np
+
+JOB_INDEX_DIR = os.getenv(
+    "JOB_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "job_index"),
+)
+JOB_INDEX_MMAP = os.getenv("JOB_INDEX_MMAP", "0") == "1"
+JOB_INDEX_CHECK_SECS = float(os.getenv("JOB_INDEX_CHECK_SECS", "5"))
+
+_POINTER = "CURRENT"
+
+# Mirrors the attributes callers use on Qdrant's ScoredPoint
+ScoredJob = namedtuple("ScoredJob", ["id", "score", "payload"])
+
+
+class JobVectorIndex:
+    """Normalised job-vector matrix with vectorised cosine top-k search."""
+
+    def __init__(self, job_ids, vectors, payloads=None, normalized=False, version=None):
+        self.job_ids = list(job_ids)
+        self.version = version  # job version (utils/job_versions.py) it was built from
+        self.payloads = list(payloads) if payloads is not None else [
+            {"job_id": job_id} for job_id in self.job_ids
+        ]
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if matrix.ndim != 2:
+            matrix = matrix.reshape(len(self.job_ids), -1)
+        if not normalized:
+            matrix = _normalize(matrix)
+        # Memory-mapped matrices are already contiguous; don't copy them
+        self.vectors = matrix if matrix.flags.c_contiguous else np.ascontiguousarray(matrix)
+
+        if len(self.job_ids) != self.vectors.shape[0]:
+            raise ValueError("job_ids and vectors have different lengths")
+
+        # Group rows by country; saved indexes are already grouped, so a
+        # loaded (possibly memory-mapped) matrix is never copied here
+        countries = [p.get("country") or "" for p in self.payloads]
+        order = sorted(range(len(countries)), key=countries.__getitem__)
+        if order != list(range(len(countries))):
+            self.vectors = np.ascontiguousarray(self.vectors[order])
+            self.job_ids = [self.job_ids[i] for i in order]
+            self.payloads = [self.payloads[i] for i in order]
+            countries = [countries[i] for i in order]
+        self._country_rows = {}
+        for i, country in enumerate(countries):
+            start, _ = self._country_rows.get(country, (i, i))
+            self._country_rows[country] = (start, i + 1)
+        self._rows = {job_id: i for i, job_id in enumerate(self.job_ids)}
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    def get_payloads(self, job_ids) -> dict:
+        """Payloads of the given jobs that are in the index, by job_id."""
+        return {
+            job_id: self.payloads[self._rows[job_id]] for job_id in job_ids if job_id in self._rows
+        }
+
+    def search(self, query, limit: int = 10, country: str | None = None) -> list[ScoredJob]:
+        """Return the ``limit`` most similar jobs, best first."""
+        return self.search_batch([query], limit, country)[0]
+
+    def search_batch(self, queries, limit: int = 10,
+                     country: str | None = None) -> list[list[ScoredJob]]:
+        """Top-k search for several query vectors with one matrix product,
+        optionally only over one country's jobs."""
+        q = _normalize(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        start, end = (0, len(self.job_ids))
+        if country:
+            start, end = self._country_rows.get(country, (0, 0))
+        n = end - start
+        if n == 0 or limit <= 0:
+            return [[] for _ in range(q.shape[0])]
+
+        scores = q @ self.vectors[start:end].T  # (queries, jobs)
+        k = min(limit, n)
+        if k < n:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(n), (q.shape[0], n))
+
+        results = []
+        for row, candidates in zip(scores, top):
+            ordered = candidates[np.argsort(-row[candidates], kind="stable")]
+            results.append(
+                [
+                    ScoredJob(self.job_ids[start + i], float(row[i]), self.payloads[start + i])
+                    for i in ordered
+                ]
+            )
+        return results
+
+    def save(self, directory: str = JOB_INDEX_DIR) -> str:
+        """Write this index as a new version and atomically make it current."""
+        os.makedirs(directory, exist_ok=True)
+        tag = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+        np.save(os.path.join(directory, f"{tag}.npy"), self.vectors)
+        with open(os.path.join(directory, f"{tag}.json"), "w") as fp:
+            json.dump(
+                {"job_ids": self.job_ids, "payloads": self.payloads, "version": self.version}, fp
+            )
+
+        pointer_tmp = os.path.join(directory, f"{_POINTER}.{tag}")
+        with open(pointer_tmp, "w") as fp:
+            fp.write(tag)
+        os.replace(pointer_tmp, os.path.join(directory, _POINTER))
+
+        _prune_versions(directory, keep=tag)
+        return tag
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _read_pointer(directory: str) -> str | None:
+    try:
+        with open(os.path.join(directory, _POINTER)) as fp:
+            return fp.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _prune_versions(directory: str, keep: str):
+    """Delete old versions, keeping the current and the one before it."""
+    tags = sorted(
+        (name[: -len(".npy")] for name in os.listdir(directory) if name.endswith(".npy")),
+        key=lambda tag: os.path.getmtime(os.path.join(directory, f"{tag}.npy")),
+    )
+    for tag in tags[:-2]:
+        if tag == keep:
+            continue
+        for ext in (".npy", ".json"):
+            try:
+                os.remove(os.path.join(directory, tag + ext))
+            except OSError:
+                pass
+
+
+def load_job_index(directory: str = JOB_INDEX_DIR, mmap: bool = JOB_INDEX_MMAP):
+    """Return ``(index, tag)`` for the current published index,
+    or ``(None, None)`` if nothing was published yet."""
+    tag = _read_pointer(directory)
+    if tag is None:
+        return None, None
+
+    vectors = np.load(
+        os.path.join(directory, f"{tag}.npy"), mmap_mode="r" if mmap else None
+    )
+    with open(os.path.join(directory, f"{tag}.json")) as fp:
+        meta = json.load(fp)
+
+    index = JobVectorIndex(
+        meta["job_ids"], vectors, meta["payloads"], normalized=True, version=meta.get("version")
+    )
+    return index, tag
+
+
+# ── Process-wide current index ───────────────────────────────────────────────
+
+_index: JobVectorIndex | None = None
+_index_tag: str | None = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_job_index() -> JobVectorIndex | None:
+    """Return the current index, picking up versions published by other
+    processes (checked at most every JOB_INDEX_CHECK_SECS)."""
+    global _index, _index_tag, _checked_at
+
+    now = time.monotonic()
+    if _index is not None and now - _checked_at < JOB_INDEX_CHECK_SECS:
+        return _index
+
+    with _lock:
+        _checked_at = now
+        tag = _read_pointer(JOB_INDEX_DIR)
+        if tag is not None and tag != _index_tag:
+            try:
+                index, tag = load_job_index()
+                _index, _index_tag = index, tag
+                print(f"Loaded job index {tag} ({len(index)} jobs)")
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Failed to load job index {tag}: {e}")
+    return _index
+
+
+def publish_job_index(index: JobVectorIndex):
+    """Persist a freshly built index and swap it in for this process."""
+    global _index, _index_tag, _checked_at
+    tag = index.save()
+    with _lock:
+        _index, _index_tag, _checked_at = index, tag, time.monotonic()
+    print(f"Published job index {tag} ({len(index)} jobs)")
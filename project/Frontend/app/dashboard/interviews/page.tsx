@@ -44,6 +44,7 @@ export default function InterviewsPage() {
   const [error, setError] = useState<string | null>(null)
   const [page, setPage] = useState(1)
   const [hasMore, setHasMore] = useState(false)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
   const [loadingMore, setLoadingMore] = useState(false)
 
   const fetchJobs = async (pageNum = 1) => {
@@ -52,9 +53,18 @@ export default function InterviewsPage() {
       else setLoadingMore(true)
 
       const token = await getToken()
-      const res = await fetch(`${API_BASE}/api/jobs?page=${pageNum}&limit=10`, {
+      const query =
+        pageNum > 1 && nextCursor
+          ? `cursor=${encodeURIComponent(nextCursor)}&limit=10`
+          : `page=${pageNum}&limit=10`
+      const res = await fetch(`${API_BASE}/api/jobs?${query}`, {
         headers: { Authorization: `Bearer ${token}` },
       })
+      if (res.status === 409 && pageNum > 1) {
+        // The ranking changed since the cursor was issued – start over
+        setNextCursor(null)
+        return fetchJobs(1)
+      }
       if (!res.ok) throw new Error("Failed to load jobs")
       const data = await res.json()
 
@@ -65,6 +75,7 @@ export default function InterviewsPage() {
         setJobs((prev) => [...prev, ...(data.jobs || [])])
       }
       setHasMore(data.has_more || false)
+      setNextCursor(data.next_cursor || null)
       setPage(pageNum)
     } catch {
       setError("Could not load interviews")
@@ -31,6 +31,27 @@ interface UserProfile {
   skills?: string[]
 }
 
+const RESUME_POLL_INTERVAL_MS = 1000
+const RESUME_POLL_TIMEOUT_MS = 120_000
+
+async function pollResumeJob(statusUrl: string, getToken: () => Promise<string | null>) {
+  const deadline = Date.now() + RESUME_POLL_TIMEOUT_MS
+  while (Date.now() < deadline) {
+    await new Promise((resolve) => setTimeout(resolve, RESUME_POLL_INTERVAL_MS))
+    // Session tokens are short-lived; Clerk refreshes them as needed
+    const token = await getToken()
+    const res = await fetch(`${API_BASE}${statusUrl}`, {
+      headers: { Authorization: `Bearer ${token}` },
+    })
+    const job = await res.json()
+    if (!res.ok || job.status === "error") {
+      throw new Error(job.message || job.error || "Resume parsing failed")
+    }
+    if (job.status === "success") return job
+  }
+  throw new Error("Resume parsing is taking too long. Please try again.")
+}
+
 interface ResumeUploadCardProps {
   resumeUrl: string
   savedSkills: string[]
@@ -70,12 +91,17 @@ function ResumeUploadCard({ resumeUrl, savedSkills, onUploaded }: ResumeUploadCa
         body: formData,
       })
 
-      const json = await res.json()
+      let json = await res.json()
 
       if (!res.ok || json.status === "error") {
         throw new Error(json.message || json.error || "Upload failed")
       }
 
+      // Parsing runs in the background – poll until the job finishes
+      if (res.status === 202) {
+        json = await pollResumeJob(json.status_url, getToken)
+      }
+
       const newSkills = json.skills || []
       setSkills(newSkills)
       onUploaded(json.resume_url, newSkills)